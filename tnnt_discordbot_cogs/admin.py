@@ -30,12 +30,22 @@ class SettingAdmin(SingletonModelAdmin):
         ),
         (
             _("Locator Cog Settings"),
-            {"fields": ["locate_channels"]},
+            {"fields": ["locate_channels", "location_dashboard_channels"]},
         ),
         (
             _("Lookup Cog Settings"),
             {"fields": ["lookup_channels"]},
         ),
+        (
+            _("Price Check Cog Settings"),
+            {
+                "fields": [
+                    "price_cache_ttl",
+                    "price_history_items",
+                    "price_history_markets",
+                ]
+            },
+        ),
         (
             _("Recruitment Cog Settings"),
             {
@@ -64,5 +74,6 @@ class SettingAdmin(SingletonModelAdmin):
         "admin_gods",
         "honeypot_channels",
         "locate_channels",
+        "location_dashboard_channels",
         "lookup_channels",
     ]
@@ -12,3 +12,14 @@ class TnntDiscordbotCogsConfig(AppConfig):
     name = "tnnt_discordbot_cogs"
     label = "tnnt_discordbot_cogs"
     verbose_name = f"TN-NT Discordbot Cogs v{__version__}"
+
+    def ready(self) -> None:
+        """
+        Connect the signals when the app is ready.
+
+        :return:
+        :rtype:
+        """
+
+        # Terra Nanotech Discordbot Cogs
+        import tnnt_discordbot_cogs.signals  # noqa: F401 pylint: disable=unused-import
@@ -0,0 +1,68 @@
+"""
+Cache keys and invalidation for the TNNT Discord bot.
+"""
+
+# Standard Library
+from collections.abc import Iterable
+
+# Django
+from django.core.cache import cache
+
+# Terra Nanotech Discordbot Cogs
+from tnnt_discordbot_cogs import __app_name__
+
+# Lookup data is invalidated by signals, the timeout only catches what they don't see
+# (e.g. corporation changes of alts or updated zKillboard statistics)
+LOOKUP_CACHE_TIMEOUT = 60 * 60
+
+# Market prices are served stale while they are refreshed, up to this age
+# (when they are fresh is configured in the settings)
+PRICE_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def get_lookup_cache_key(user_id: int) -> str:
+    """
+    Get the cache key for the lookup data of an Auth user.
+
+    :param user_id: The ID of the Auth user.
+    :type user_id: int
+    :return: The cache key.
+    :rtype: str
+    """
+
+    return f"{__app_name__}:lookup:user:{user_id}"
+
+
+def invalidate_lookup_cache(user_ids: Iterable[int]) -> None:
+    """
+    Remove the cached lookup data of the given Auth users.
+
+    :param user_ids: The IDs of the Auth users.
+    :type user_ids: Iterable[int]
+    :return: None
+    :rtype: None
+    """
+
+    cache_keys = [
+        get_lookup_cache_key(user_id=user_id)
+        for user_id in user_ids
+        if user_id is not None
+    ]
+
+    if cache_keys:
+        cache.delete_many(keys=cache_keys)
+
+
+def get_price_cache_key(market_id: int, eve_type_id: int | str) -> str:
+    """
+    Get the cache key for the market data of an item type on a market.
+
+    :param market_id: The ID of the market system, station or region.
+    :type market_id: int
+    :param eve_type_id: The EVE type ID.
+    :type eve_type_id: int | str
+    :return: The cache key.
+    :rtype: str
+    """
+
+    return f"{__app_name__}:price:{market_id}:{eve_type_id}"
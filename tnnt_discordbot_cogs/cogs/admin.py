@@ -17,9 +17,6 @@ from discord.commands import SlashCommandGroup
 from discord.ext import commands
 from discord.ext.commands import Paginator
 
-# Django
-from django.core.exceptions import ObjectDoesNotExist
-
 # Alliance Auth
 from allianceauth.eveonline.models import EveCharacter
 from allianceauth.eveonline.tasks import update_character
@@ -35,6 +32,7 @@ from aadiscordbot.utils import auth
 
 # Terra Nanotech Discordbot Cogs
 from tnnt_discordbot_cogs.helper import unload_cog
+from tnnt_discordbot_cogs.models.directory import CharacterDirectoryEntry
 from tnnt_discordbot_cogs.models.setting import Setting
 from tnnt_discordbot_cogs.providers.applogger import AppLogger
 
@@ -669,31 +667,33 @@ class Admin(commands.Cog):
         :rtype:
         """
 
-        try:
-            char = EveCharacter.objects.get(character_name=character)
-            alts = (
-                char.character_ownership.user.character_ownerships.all()
-                .select_related("character")
-                .values_list("character__character_id", flat=True)
-            )
-
-            for c in alts:
-                update_character.delay(c)
+        entry = CharacterDirectoryEntry.get_by_name(character_name=character)
 
-            return await ctx.respond(
-                f"Sent tasks to update **{character}**'s characters", ephemeral=True
-            )
-        except EveCharacter.DoesNotExist:
+        if entry is None:
             return await ctx.respond(
                 f"Character **{character}** does not exist in our Auth system",
                 ephemeral=True,
             )
-        except ObjectDoesNotExist:
+
+        if entry.user_id is None:
             return await ctx.respond(
                 f"**{character}** is unlinked unable to update characters",
                 ephemeral=True,
             )
 
+        CharacterDirectoryEntry.ensure_user(user_id=entry.user_id)
+
+        alts = CharacterDirectoryEntry.objects.of_user(
+            user_id=entry.user_id
+        ).values_list("character_id", flat=True)
+
+        for c in alts:
+            update_character.delay(c)
+
+        return await ctx.respond(
+            f"Sent tasks to update **{character}**'s characters", ephemeral=True
+        )
+
     @admin_commands.command(
         name="sync_commands",
         description="Sync the bot's commands with Discord",
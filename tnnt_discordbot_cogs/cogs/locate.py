@@ -2,14 +2,35 @@
 "Locator" cog for discordbot - https://github.com/Solar-Helix-Independent-Transport/allianceauth-discordbot
 """
 
+# Standard Library
+import asyncio
+import csv
+import hashlib
+import io
+import json
+from datetime import timedelta
+
 # Third Party
-from discord import Colour, Embed, EmbedField, option
-from discord.ext import commands
-from eve_sde.models import ItemType, SolarSystem
+from discord import (
+    AutocompleteContext,
+    Colour,
+    Embed,
+    EmbedField,
+    File,
+    NotFound,
+    SlashCommandGroup,
+    option,
+)
+from discord.ext import commands, tasks
+from eve_sde.models import ItemType, NPCStation, SolarSystem, Stargate
 from pendulum.datetime import DateTime
 
 # Django
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import close_old_connections
+from django.db.models import Count, F, OuterRef, Subquery
+from django.utils import timezone
+from django.utils.text import slugify
 
 # Alliance Auth
 from allianceauth.eveonline.evelinks import dotlan, evewho
@@ -19,17 +40,57 @@ from esi.models import Token
 
 # Alliance Auth Discord Bot
 from aadiscordbot.app_settings import get_all_servers
-from aadiscordbot.cogs.utils.autocompletes import search_characters
+from aadiscordbot.cogs.utils.autocompletes import (
+    search_characters,
+    search_corporations_on_characters,
+)
 from aadiscordbot.cogs.utils.decorators import message_in_channels, sender_has_perm
 
 # Terra Nanotech Discordbot Cogs
-from tnnt_discordbot_cogs.helper import unload_cog
+from tnnt_discordbot_cogs.helper import (
+    respond_with_embeds,
+    search_alliances_on_characters,
+    search_states,
+    unload_cog,
+)
+from tnnt_discordbot_cogs.models.directory import CharacterDirectoryEntry
+from tnnt_discordbot_cogs.models.location import (
+    LOCATION_SCOPES,
+    CharacterLocation,
+    LocationDashboardMessage,
+    StructureInfo,
+)
 from tnnt_discordbot_cogs.models.setting import Setting
 from tnnt_discordbot_cogs.providers.applogger import AppLogger
 from tnnt_discordbot_cogs.providers.esi_handler import ESIHandler
 
 logger = AppLogger(my_logger=get_extension_logger(name=__name__))
 
+# ESI scopes needed to resolve the names of player-owned structures
+STRUCTURE_SCOPES = ["esi-universe.read_structures.v1"]
+
+# Structure names are cached, inaccessible structures are retried less often
+STRUCTURE_CACHE_TTL = timedelta(days=7)
+STRUCTURE_NEGATIVE_CACHE_TTL = timedelta(days=1)
+
+# Snapshots older than this are not considered for `/locate system`
+LOCATION_SNAPSHOT_MAX_AGE = timedelta(hours=1)
+
+# Location snapshots are refreshed in batches of the least recently attempted
+# characters, large enough to get through all tracked characters within the max age
+LOCATION_SNAPSHOT_REFRESH_MINUTES = 5
+LOCATION_SNAPSHOT_MIN_BATCH_SIZE = 50
+
+# Maximum number of jumps for `/locate system`
+LOCATE_SYSTEM_MAX_JUMPS = 5
+
+# The location dashboard is rendered from the snapshots and only edited when it changed
+LOCATION_DASHBOARD_REFRESH_MINUTES = 5
+LOCATION_DASHBOARD_MAX_ROWS = 20
+
+# Maximum number of mains listed in the `/locate coverage` embed, the CSV has all of them
+LOCATE_COVERAGE_MAX_MAINS = 50
+
 
 class Locator(commands.Cog):
     """
@@ -46,6 +107,26 @@ class Locator(commands.Cog):
 
         self.bot = bot
 
+        self.refresh_location_snapshots.start()
+        self.refresh_location_dashboards.start()
+
+    def cog_unload(self):
+        """
+        Stop the background tasks when the cog is unloaded.
+
+        :return:
+        :rtype:
+        """
+
+        self.refresh_location_snapshots.cancel()
+        self.refresh_location_dashboards.cancel()
+
+    locate_commands = SlashCommandGroup(
+        name="locate",
+        description="Locate characters",
+        guild_ids=get_all_servers(),
+    )
+
     @staticmethod
     def _get_locate_channels() -> list:
         """
@@ -63,6 +144,830 @@ class Locator(commands.Cog):
             else []
         )
 
+    @staticmethod
+    def _fetch_location(character_id: int, token: Token) -> tuple:
+        """
+        Fetch online status, location and ship of a character from ESI.
+
+        :param character_id: The character ID.
+        :type character_id: int
+        :param token: A token of the character with the location scopes.
+        :type token: esi.models.Token
+        :return: A tuple of online status, location and ship as returned by ESI.
+        :rtype: tuple
+        """
+
+        online = ESIHandler.get_characters_character_id_online(
+            character_id=character_id, token=token, use_etag=False
+        )
+        location_esi = ESIHandler.get_characters_character_id_location(
+            character_id=character_id, token=token, use_etag=False
+        )
+        ship_esi = ESIHandler.get_characters_character_id_ship(
+            character_id=character_id, token=token, use_etag=False
+        )
+
+        logger.debug(f"Online Status from ESI: {online}")
+        logger.debug(f"Location from ESI: {location_esi}")
+        logger.debug(f"Ship from ESI: {ship_esi}")
+
+        return online, location_esi, ship_esi
+
+    @staticmethod
+    def _get_location_snapshot_batch_size(tracked: int) -> int:
+        """
+        Get the number of characters to refresh per run, so all tracked characters
+        are refreshed within the max age of a snapshot.
+
+        :param tracked: The number of tracked characters.
+        :type tracked: int
+        :return: The batch size.
+        :rtype: int
+        """
+
+        runs_per_max_age = LOCATION_SNAPSHOT_MAX_AGE // timedelta(
+            minutes=LOCATION_SNAPSHOT_REFRESH_MINUTES
+        )
+
+        return max(LOCATION_SNAPSHOT_MIN_BATCH_SIZE, -(-tracked // runs_per_max_age))
+
+    @staticmethod
+    def _refresh_location_snapshot_batch() -> int:
+        """
+        Refresh the location snapshots of the tracked characters that were attempted the longest ago.
+
+        Tracked characters are all linked characters with a token that has the location scopes.
+        Failed attempts are recorded as well, so characters that can't be located
+        don't hold up the others.
+
+        :return: The number of refreshed snapshots.
+        :rtype: int
+        """
+
+        close_old_connections()
+
+        tracked_character_ids = (
+            Token.objects.all().require_scopes(LOCATION_SCOPES).values("character_id")
+        )
+        tracked = EveCharacter.objects.filter(
+            character_id__in=tracked_character_ids,
+            character_ownership__isnull=False,
+        )
+        batch_size = Locator._get_location_snapshot_batch_size(tracked=tracked.count())
+        characters = tracked.annotate(
+            snapshot_attempted_at=Subquery(
+                CharacterLocation.objects.filter(character=OuterRef("pk")).values(
+                    "attempted_at"
+                )[:1]
+            )
+        ).order_by(F("snapshot_attempted_at").asc(nulls_first=True))[:batch_size]
+
+        snapshots = []
+        failed = []
+
+        for character in characters:
+            token = Token.get_token(
+                character_id=character.character_id, scopes=LOCATION_SCOPES
+            )
+
+            if not token:
+                failed.append(character.pk)
+
+                continue
+
+            online, location_esi, ship_esi = Locator._fetch_location(
+                character_id=character.character_id, token=token
+            )
+
+            if online is None or location_esi is None or ship_esi is None:
+                failed.append(character.pk)
+
+                continue
+
+            snapshots.append(
+                CharacterLocation(
+                    character=character,
+                    solar_system_id=location_esi.solar_system_id,
+                    ship_type_id=ship_esi.ship_type_id,
+                    online=bool(online.online),
+                    updated_at=timezone.now(),
+                )
+            )
+
+        CharacterLocation.update_snapshots(snapshots=snapshots)
+        CharacterLocation.update_attempts(
+            character_ids=failed, attempted_at=timezone.now()
+        )
+
+        close_old_connections()
+
+        if failed:
+            logger.debug(f"Could not locate {len(failed)} characters")
+
+        return len(snapshots)
+
+    @tasks.loop(minutes=LOCATION_SNAPSHOT_REFRESH_MINUTES)
+    async def refresh_location_snapshots(self):
+        """
+        Periodically refresh a batch of location snapshots in the background.
+
+        :return:
+        :rtype:
+        """
+
+        try:
+            refreshed = await asyncio.to_thread(self._refresh_location_snapshot_batch)
+
+            logger.debug(f"Refreshed {refreshed} location snapshots")
+        except Exception:
+            logger.exception("Failed to refresh location snapshots")
+
+    @refresh_location_snapshots.before_loop
+    async def before_refresh_location_snapshots(self):
+        """
+        Wait for the bot to be ready before refreshing location snapshots.
+
+        :return:
+        :rtype:
+        """
+
+        await self.bot.wait_until_ready()
+
+    @staticmethod
+    def _get_location_dashboard_embed() -> Embed:
+        """
+        Render the location dashboard from the location snapshots.
+
+        Shows the number of online characters per solar system and per ship class.
+
+        :return: The dashboard embed.
+        :rtype: discord.Embed
+        """
+
+        online_snapshots = CharacterLocation.objects.filter(
+            online=True, updated_at__gte=timezone.now() - LOCATION_SNAPSHOT_MAX_AGE
+        )
+        per_system = list(
+            online_snapshots.values("solar_system_id")
+            .annotate(count=Count("pk"))
+            .order_by("-count", "solar_system_id")
+        )
+        per_ship_type = list(
+            online_snapshots.values("ship_type_id").annotate(count=Count("pk"))
+        )
+
+        system_names = dict(
+            SolarSystem.objects.filter(
+                id__in=[row["solar_system_id"] for row in per_system]
+            ).values_list("id", "name")
+        )
+        ship_classes = dict(
+            ItemType.objects.filter(
+                id__in=[row["ship_type_id"] for row in per_ship_type]
+            ).values_list("id", "group__name")
+        )
+
+        per_ship_class = {}
+
+        for row in per_ship_type:
+            ship_class = ship_classes.get(row["ship_type_id"]) or "Unknown"
+            per_ship_class[ship_class] = (
+                per_ship_class.get(ship_class, 0) + row["count"]
+            )
+
+        total = sum(row["count"] for row in per_system)
+
+        embed = Embed(title="Online Characters", colour=Colour.blue())
+        embed.description = (
+            f"**{total}** tracked characters are online.\n"
+            "This message is updated automatically."
+        )
+
+        if per_system:
+            embed.add_field(
+                name="Solar Systems",
+                value="\n".join(
+                    f"{system_names.get(row['solar_system_id'], row['solar_system_id'])}: {row['count']}"
+                    for row in per_system[:LOCATION_DASHBOARD_MAX_ROWS]
+                )[:1024],
+                inline=True,
+            )
+
+        if per_ship_class:
+            embed.add_field(
+                name="Ship Classes",
+                value="\n".join(
+                    f"{ship_class}: {count}"
+                    for ship_class, count in sorted(
+                        per_ship_class.items(), key=lambda x: (-x[1], x[0])
+                    )[:LOCATION_DASHBOARD_MAX_ROWS]
+                )[:1024],
+                inline=True,
+            )
+
+        return embed
+
+    @staticmethod
+    def _prepare_location_dashboards() -> tuple:
+        """
+        Render the location dashboard and load the dashboard messages of the configured channels.
+
+        Runs all database queries of a dashboard refresh, so it can run in a thread.
+
+        :return: The dashboard embed (None if no channel is configured), its content hash
+                 and the dashboard message by channel ID (None if there is none yet)
+        :rtype: tuple[discord.Embed | None, str, dict[int, LocationDashboardMessage | None]]
+        """
+
+        close_old_connections()
+
+        channel_ids = list(
+            Setting.get_setting(
+                Setting.Field.LOCATION_DASHBOARD_CHANNELS.value
+            ).values_list("channel", flat=True)
+        )
+
+        if not channel_ids:
+            return None, "", {}
+
+        embed = Locator._get_location_dashboard_embed()
+        content_hash = hashlib.sha256(
+            json.dumps(embed.to_dict(), sort_keys=True).encode()
+        ).hexdigest()
+        dashboards = dict.fromkeys(channel_ids)
+        dashboards.update(
+            {
+                dashboard.channel_id: dashboard
+                for dashboard in LocationDashboardMessage.objects.filter(
+                    channel_id__in=channel_ids
+                )
+            }
+        )
+
+        close_old_connections()
+
+        return embed, content_hash, dashboards
+
+    @staticmethod
+    def _save_location_dashboard(
+        channel_id: int, message_id: int, content_hash: str
+    ) -> None:
+        """
+        Store the dashboard message of a channel and the hash of its content.
+
+        :param channel_id: The channel ID.
+        :type channel_id: int
+        :param message_id: The message ID.
+        :type message_id: int
+        :param content_hash: The hash of the rendered dashboard.
+        :type content_hash: str
+        :return: None
+        :rtype: None
+        """
+
+        close_old_connections()
+
+        LocationDashboardMessage.objects.update_or_create(
+            channel_id=channel_id,
+            defaults={"message_id": message_id, "content_hash": content_hash},
+        )
+
+        close_old_connections()
+
+    async def _update_location_dashboard(
+        self,
+        channel_id: int,
+        dashboard: LocationDashboardMessage | None,
+        embed: Embed,
+        content_hash: str,
+    ) -> None:
+        """
+        Update the location dashboard message in a channel.
+
+        The message is only edited when the content hash changed. A new message
+        is sent and pinned when there is none yet, or it was deleted, even when the
+        content did not change. An unpinned message is pinned again.
+
+        :param channel_id: The channel ID.
+        :type channel_id: int
+        :param dashboard: The dashboard message of the channel, None if there is none yet.
+        :type dashboard: LocationDashboardMessage | None
+        :param embed: The rendered dashboard embed.
+        :type embed: discord.Embed
+        :param content_hash: The hash of the rendered dashboard.
+        :type content_hash: str
+        :return: None
+        :rtype: None
+        """
+
+        channel = self.bot.get_channel(channel_id)
+
+        if channel is None:
+            logger.warning(f"Location dashboard channel {channel_id} not found")
+
+            return
+
+        if dashboard and dashboard.content_hash == content_hash:
+            # Unchanged, but the message may have been deleted or unpinned
+            try:
+                message = await channel.fetch_message(dashboard.message_id)
+            except NotFound:
+                logger.info(
+                    f"Location dashboard message in channel {channel_id} is gone, sending a new one"
+                )
+
+                dashboard = None
+            else:
+                if not message.pinned:
+                    await message.pin()
+
+                return
+
+        embed.timestamp = timezone.now()
+
+        if dashboard:
+            try:
+                message = await channel.get_partial_message(dashboard.message_id).edit(
+                    embed=embed
+                )
+
+                if message and not message.pinned:
+                    await message.pin()
+
+                await asyncio.to_thread(
+                    self._save_location_dashboard,
+                    channel_id=channel_id,
+                    message_id=dashboard.message_id,
+                    content_hash=content_hash,
+                )
+
+                return
+            except NotFound:
+                logger.info(
+                    f"Location dashboard message in channel {channel_id} is gone, sending a new one"
+                )
+
+        message = await channel.send(embed=embed)
+        await message.pin()
+
+        await asyncio.to_thread(
+            self._save_location_dashboard,
+            channel_id=channel_id,
+            message_id=message.id,
+            content_hash=content_hash,
+        )
+
+    @tasks.loop(minutes=LOCATION_DASHBOARD_REFRESH_MINUTES)
+    async def refresh_location_dashboards(self):
+        """
+        Periodically refresh the location dashboards in the configured channels.
+
+        :return:
+        :rtype:
+        """
+
+        try:
+            embed, content_hash, dashboards = await asyncio.to_thread(
+                self._prepare_location_dashboards
+            )
+
+            for channel_id, dashboard in dashboards.items():
+                try:
+                    await self._update_location_dashboard(
+                        channel_id=channel_id,
+                        dashboard=dashboard,
+                        embed=embed,
+                        content_hash=content_hash,
+                    )
+                except Exception:
+                    logger.exception(
+                        f"Failed to update the location dashboard in channel {channel_id}"
+                    )
+        except Exception:
+            logger.exception("Failed to refresh location dashboards")
+
+    @refresh_location_dashboards.before_loop
+    async def before_refresh_location_dashboards(self):
+        """
+        Wait for the bot to be ready before refreshing the location dashboards.
+
+        :return:
+        :rtype:
+        """
+
+        await self.bot.wait_until_ready()
+
+    @staticmethod
+    def _get_systems_within_jumps(solar_system_id: int, jumps: int) -> dict[int, int]:
+        """
+        Get all solar systems within the given number of jumps.
+
+        Walks the stargate graph ring by ring, one query per jump.
+
+        :param solar_system_id: The solar system to start from.
+        :type solar_system_id: int
+        :param jumps: The maximum number of jumps.
+        :type jumps: int
+        :return: A mapping of solar system ID to its distance in jumps.
+        :rtype: dict[int, int]
+        """
+
+        distances = {solar_system_id: 0}
+        frontier = {solar_system_id}
+
+        for distance in range(1, jumps + 1):
+            frontier = (
+                set(
+                    Stargate.objects.filter(solar_system_id__in=frontier)
+                    .exclude(destination_id__isnull=True)
+                    .values_list("destination_id", flat=True)
+                )
+                - distances.keys()
+            )
+
+            if not frontier:
+                break
+
+            for system_id in frontier:
+                distances[system_id] = distance
+
+        return distances
+
+    @staticmethod
+    def _get_locate_system_embeds(solar_system: SolarSystem, jumps: int) -> list[Embed]:
+        """
+        Generates embeds listing the characters in or around a solar system.
+
+        The characters are served from the location snapshots, no ESI calls are made.
+
+        :param solar_system: The solar system to look at.
+        :type solar_system: eve_sde.models.SolarSystem
+        :param jumps: The number of jumps around the solar system to include.
+        :type jumps: int
+        :return: A list of Discord embeds listing the characters per solar system.
+        :rtype: list[discord.Embed]
+        """
+
+        distances = Locator._get_systems_within_jumps(
+            solar_system_id=solar_system.id, jumps=jumps
+        )
+        snapshots = list(
+            CharacterLocation.objects.filter(
+                solar_system_id__in=distances.keys(),
+                updated_at__gte=timezone.now() - LOCATION_SNAPSHOT_MAX_AGE,
+            )
+            .select_related(
+                "character",
+                "character__character_ownership__user__profile__main_character",
+            )
+            .order_by("-online", "character__character_name")
+        )
+
+        title = (
+            f"Characters within {jumps} jump{'s' if jumps != 1 else ''} of {solar_system.name}"
+            if jumps
+            else f"Characters in {solar_system.name}"
+        )
+
+        if not snapshots:
+            return [
+                Embed(
+                    title=title,
+                    description="No known characters found.",
+                    colour=Colour.orange(),
+                )
+            ]
+
+        system_names = dict(
+            SolarSystem.objects.filter(
+                id__in={s.solar_system_id for s in snapshots}
+            ).values_list("id", "name")
+        )
+        ship_names = dict(
+            ItemType.objects.filter(
+                id__in={s.ship_type_id for s in snapshots if s.ship_type_id}
+            ).values_list("id", "name")
+        )
+
+        characters_per_system = {}
+
+        for snapshot in snapshots:
+            character = snapshot.character
+
+            try:
+                main = character.character_ownership.user.profile.main_character
+            except ObjectDoesNotExist:
+                main = None
+
+            evewho_character = evewho.character_url(eve_id=character.character_id)
+            main_string = (
+                f" ({main.character_name})" if main and main != character else ""
+            )
+            online_status = "Online" if snapshot.online else "Offline"
+            line = (
+                f"[{character.character_name}]({evewho_character}) "
+                f"[{character.corporation_ticker}]{main_string} - "
+                f"{ship_names.get(snapshot.ship_type_id, 'Unknown Ship')} "
+                f"(**{online_status}**, "
+                f"{snapshot.updated_at.strftime('%H:%M')} EVE Time)"
+            )
+
+            characters_per_system.setdefault(snapshot.solar_system_id, []).append(line)
+
+        lines = []
+
+        for system_id in sorted(
+            characters_per_system, key=lambda x: (distances[x], system_names.get(x, ""))
+        ):
+            system_name = system_names.get(system_id, str(system_id))
+            dotlan_system = dotlan.solar_system_url(name=system_name)
+            distance = distances[system_id]
+            distance_string = (
+                f" ({distance} jump{'s' if distance != 1 else ''})" if distance else ""
+            )
+
+            lines.append(f"**[{system_name}]({dotlan_system})**{distance_string}")
+            lines += characters_per_system[system_id]
+            lines.append("")
+
+        embeds = []
+        description = ""
+
+        for line in lines:
+            if len(description) + len(line) + 1 > 4000:
+                embeds.append(
+                    Embed(title=title, description=description, colour=Colour.blue())
+                )
+                description = ""
+
+            description += f"{line}\n"
+
+        if description.strip():
+            embeds.append(
+                Embed(title=title, description=description, colour=Colour.blue())
+            )
+
+        return embeds
+
+    @staticmethod
+    def _get_location_token_coverage(
+        corporation: str | None = None,
+        alliance: str | None = None,
+        state: str | None = None,
+    ) -> list[tuple]:
+        """
+        Get the location token coverage of all linked characters in a corporation,
+        alliance or Auth state.
+
+        Read from the character directory, which already knows who has a location token.
+
+        :param corporation: The corporation name to filter on.
+        :type corporation: str | None
+        :param alliance: The alliance name to filter on.
+        :type alliance: str | None
+        :param state: The Auth state name to filter on.
+        :type state: str | None
+        :return: A list of (main name, character ID, character name, corporation name, alliance name, has location token) tuples.
+        :rtype: list[tuple]
+        """
+
+        characters = CharacterDirectoryEntry.objects.linked()
+
+        if corporation:
+            characters = characters.filter(corporation_name=corporation)
+
+        if alliance:
+            characters = characters.filter(alliance_name=alliance)
+
+        if state:
+            characters = characters.filter(state_name=state)
+
+        return list(
+            characters.values_list(
+                "main_character_name",
+                "character_id",
+                "character_name",
+                "corporation_name",
+                "alliance_name",
+                "has_location_token",
+            ).order_by("main_character_name", "character_name")
+        )
+
+    @staticmethod
+    def _get_location_token_coverage_csv(coverage: list[tuple], name: str) -> File:
+        """
+        Generates a CSV file of all characters without location tokens.
+
+        :param coverage: The coverage rows as returned by `_get_location_token_coverage`.
+        :type coverage: list[tuple]
+        :param name: The name of the audited corporation, alliance or state.
+        :type name: str
+        :return: A CSV file listing the characters without location tokens.
+        :rtype: File
+        """
+
+        csv_file_basename = slugify(f"{name} location token coverage")
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        header = [
+            "Main Character",
+            "Character ID",
+            "Character Name",
+            "Corporation Name",
+            "Alliance Name",
+        ]
+        writer.writerow(header)
+
+        for row in coverage:
+            if not row[5]:
+                writer.writerow(row[:5])
+
+        buffer.seek(0)
+
+        return File(fp=buffer, filename=f"{csv_file_basename}.csv")
+
+    @staticmethod
+    def _get_location_token_coverage_embed(coverage: list[tuple], name: str) -> Embed:
+        """
+        Generates an embed with the per-main location token coverage.
+
+        :param coverage: The coverage rows as returned by `_get_location_token_coverage`.
+        :type coverage: list[tuple]
+        :param name: The name of the audited corporation, alliance or state.
+        :type name: str
+        :return: An embed with the number of characters without location tokens per main.
+        :rtype: Embed
+        """
+
+        mains = {}
+
+        for main_name, _, _, _, _, has_location_token in coverage:
+            main_name = main_name or "No Main Character"
+
+            if main_name not in mains:
+                mains[main_name] = [0, 0]
+
+            mains[main_name][1] += 1
+
+            if not has_location_token:
+                mains[main_name][0] += 1
+
+        missing_total = sum(m[0] for m in mains.values())
+        mains_missing = sorted(
+            ((k, m) for k, m in mains.items() if m[0]),
+            key=lambda x: (-x[1][0], x[0]),
+        )
+
+        embed = Embed(
+            title=f"Location Token Coverage: {name}",
+            colour=Colour.green() if missing_total == 0 else Colour.orange(),
+        )
+        embed.description = (
+            f"**{missing_total}** of **{len(coverage)}** characters of "
+            f"**{len(mains)}** mains lack location tokens.\n"
+            f"**{len(mains_missing)}** mains are affected.\n\n"
+        )
+
+        lines = [
+            f"{main_name}: {missing} of {total} characters"
+            for main_name, (missing, total) in mains_missing[:LOCATE_COVERAGE_MAX_MAINS]
+        ]
+
+        if len(mains_missing) > LOCATE_COVERAGE_MAX_MAINS:
+            lines.append(
+                f"… and {len(mains_missing) - LOCATE_COVERAGE_MAX_MAINS} more, see the CSV"
+            )
+
+        embed.description += "\n".join(lines)[:3500]
+
+        return embed
+
+    @staticmethod
+    async def _search_systems(ctx: AutocompleteContext) -> list:
+        """
+        Autocomplete function for solar system name input
+
+        :param ctx:
+        :type ctx:
+        :return:
+        :rtype:
+        """
+
+        query = ctx.value.strip()
+
+        if not query:
+            return []
+
+        return [
+            name
+            async for name in SolarSystem.objects.filter(
+                name__icontains=query
+            ).values_list("name", flat=True)[:10]
+        ]
+
+    @staticmethod
+    def _resolve_docking_locations(
+        station_ids: set[int], structure_characters: dict[int, set[int]]
+    ) -> dict[int, str]:
+        """
+        Resolve the names of stations and structures in one go.
+
+        Stations are resolved from the SDE, structures from the structure cache.
+        Only structures missing from the cache, or with an expired cache entry,
+        are looked up on ESI, using the tokens of the characters docked in them.
+
+        :param station_ids: The station IDs to resolve.
+        :type station_ids: set[int]
+        :param structure_characters: Mapping of structure ID to the IDs of the characters docked in it.
+        :type structure_characters: dict[int, set[int]]
+        :return: Mapping of station/structure ID to its name, unresolvable IDs are omitted.
+        :rtype: dict[int, str]
+        """
+
+        names = dict(
+            NPCStation.objects.filter(id__in=station_ids).values_list("id", "name")
+        )
+
+        if not structure_characters:
+            return names
+
+        now = timezone.now()
+        cached_structures = StructureInfo.objects.in_bulk(
+            id_list=list(structure_characters)
+        )
+        updated_structures = []
+
+        for structure_id, character_ids in structure_characters.items():
+            structure = cached_structures.get(structure_id)
+
+            if structure:
+                cache_ttl = (
+                    STRUCTURE_CACHE_TTL
+                    if structure.is_accessible
+                    else STRUCTURE_NEGATIVE_CACHE_TTL
+                )
+
+                if structure.updated_at >= now - cache_ttl:
+                    if structure.name:
+                        names[structure_id] = structure.name
+
+                    continue
+
+            structure_esi = None
+
+            for character_id in character_ids:
+                token = Token.get_token(
+                    character_id=character_id, scopes=STRUCTURE_SCOPES
+                )
+
+                if not token:
+                    continue
+
+                structure_esi = ESIHandler.get_universe_structures_structure_id(
+                    structure_id=structure_id, token=token
+                )
+
+                if structure_esi:
+                    break
+
+            if structure_esi:
+                structure = StructureInfo(
+                    structure_id=structure_id,
+                    name=structure_esi.name,
+                    solar_system_id=structure_esi.solar_system_id,
+                    is_accessible=True,
+                    updated_at=now,
+                )
+            else:
+                # Keep a previously known name, but do not ask again for a while
+                structure = StructureInfo(
+                    structure_id=structure_id,
+                    name=structure.name if structure else "",
+                    solar_system_id=structure.solar_system_id if structure else None,
+                    is_accessible=False,
+                    updated_at=now,
+                )
+
+            if structure.name:
+                names[structure_id] = structure.name
+
+            updated_structures.append(structure)
+
+        if updated_structures:
+            StructureInfo.objects.bulk_create(
+                objs=updated_structures,
+                update_conflicts=True,
+                unique_fields=["structure_id"],
+                update_fields=[
+                    "name",
+                    "solar_system_id",
+                    "is_accessible",
+                    "updated_at",
+                ],
+            )
+
+        return names
+
     @staticmethod
     def _get_locate_embeds(char: EveCharacter) -> list[Embed]:
         """
@@ -81,6 +986,9 @@ class Locator(commands.Cog):
         alt_online = []
         alt_offline = []
         alt_no_token = []
+        snapshots = []
+        station_ids = set()
+        structure_characters = {}
 
         for alt in alts:
             _alt = {
@@ -94,31 +1002,15 @@ class Locator(commands.Cog):
                 "system": None,
                 "lookup": False,
             }
-            scopes = [
-                # Locations
-                "esi-location.read_location.v1",
-                "esi-location.read_online.v1",
-                "esi-location.read_ship_type.v1",
-            ]
 
             token = Token.get_token(
-                character_id=alt.character.character_id, scopes=scopes
+                character_id=alt.character.character_id, scopes=LOCATION_SCOPES
             )
 
             if token:
-                online = ESIHandler.get_characters_character_id_online(
-                    character_id=alt.character.character_id, token=token, use_etag=False
-                )
-                location_esi = ESIHandler.get_characters_character_id_location(
-                    character_id=alt.character.character_id, token=token, use_etag=False
+                online, location_esi, ship_esi = Locator._fetch_location(
+                    character_id=alt.character.character_id, token=token
                 )
-                ship_esi = ESIHandler.get_characters_character_id_ship(
-                    character_id=alt.character.character_id, token=token, use_etag=False
-                )
-
-                logger.debug(f"Online Status from ESI: {online}")
-                logger.debug(f"Location from ESI: {location_esi}")
-                logger.debug(f"Ship from ESI: {ship_esi}")
 
                 try:
                     _alt["online_status"] = "Online" if online.online else "Offline"
@@ -140,6 +1032,25 @@ class Locator(commands.Cog):
                 _alt["system"] = location_sde.name
                 _alt["ship"] = ship_sde.name
                 _alt["lookup"] = True
+                _alt["station_id"] = getattr(location_esi, "station_id", None)
+                _alt["structure_id"] = getattr(location_esi, "structure_id", None)
+
+                if _alt["station_id"]:
+                    station_ids.add(_alt["station_id"])
+                elif _alt["structure_id"]:
+                    structure_characters.setdefault(_alt["structure_id"], set()).add(
+                        alt.character.character_id
+                    )
+
+                snapshots.append(
+                    CharacterLocation(
+                        character=alt.character,
+                        solar_system_id=location_esi.solar_system_id,
+                        ship_type_id=ship_esi.ship_type_id,
+                        online=bool(online.online),
+                        updated_at=timezone.now(),
+                    )
+                )
 
                 if online.online:
                     alt_online.append(_alt)
@@ -148,6 +1059,23 @@ class Locator(commands.Cog):
             else:
                 alt_no_token.append(_alt)
 
+        # Every lookup doubles as a fresh location snapshot for the reverse index
+        CharacterLocation.update_snapshots(snapshots=snapshots)
+
+        # Resolve all docking locations of all alts at once
+        docking_location_names = Locator._resolve_docking_locations(
+            station_ids=station_ids, structure_characters=structure_characters
+        )
+
+        for _alt in alt_online + alt_offline:
+            docking_location_id = _alt["station_id"] or _alt["structure_id"]
+
+            if docking_location_id:
+                _alt["docked"] = docking_location_names.get(
+                    docking_location_id,
+                    "Unknown Station" if _alt["station_id"] else "Unknown Structure",
+                )
+
         out_embeds = []
 
         def _process_character_list(
@@ -198,6 +1126,12 @@ class Locator(commands.Cog):
                             f"(**{alt_character['online_status']}**)"
                         )
 
+                        docked_line = (
+                            f"**Docked In:** {alt_character['docked']}\n"
+                            if alt_character.get("docked")
+                            else ""
+                        )
+
                         login_time_line = (
                             f"**Offline Since:** {alt_character['last_logout'].strftime('%Y-%m-%d %H:%M')}"
                             if alt_character["online_status"] == "Offline"
@@ -210,6 +1144,7 @@ class Locator(commands.Cog):
                                 value=(
                                     f"**EVE Who:** {character_line}\n"
                                     f"**Current Location:** {current_location_line}\n"
+                                    f"{docked_line}"
                                     f"**Currently Flying:** {alt_character['ship']}\n"
                                     f"{login_time_line} EVE Time"
                                 ),
@@ -244,9 +1179,13 @@ class Locator(commands.Cog):
 
         return out_embeds
 
-    @message_in_channels(channels=_get_locate_channels())
+    @locate_commands.command(
+        name="character",
+        description="Locate a character and all its alts",
+        guild_ids=get_all_servers(),
+    )
     @sender_has_perm("tnnt_discordbot_cogs.locate")
-    @commands.slash_command(name="locate", guild_ids=get_all_servers())
+    @message_in_channels(channels=_get_locate_channels())
     @option(
         name="character",
         description="Search for a Character!",
@@ -293,10 +1232,129 @@ class Locator(commands.Cog):
             ephemeral=True,
         )
 
-        embeds = self._get_locate_embeds(char)
+        await respond_with_embeds(
+            ctx=ctx, embeds=self._get_locate_embeds(char), ephemeral=True
+        )
+
+    @locate_commands.command(
+        name="system",
+        description="List our characters in or around a solar system",
+        guild_ids=get_all_servers(),
+    )
+    @sender_has_perm("tnnt_discordbot_cogs.locate")
+    @message_in_channels(channels=_get_locate_channels())
+    @option(
+        name="system",
+        description="Search for a solar system…",
+        autocomplete=_search_systems,
+    )
+    @option(
+        name="jumps",
+        description="Include solar systems within this number of jumps",
+        min_value=0,
+        max_value=LOCATE_SYSTEM_MAX_JUMPS,
+    )
+    async def locate_system(self, ctx, system: str, jumps: int = 0):
+        """
+        Slash command to list our characters in or around a solar system.
+
+        :param ctx:
+        :type ctx:
+        :param system:
+        :type system:
+        :param jumps:
+        :type jumps:
+        :return:
+        :rtype:
+        """
+
+        try:
+            solar_system = SolarSystem.objects.get(name__iexact=system)
+        except SolarSystem.DoesNotExist:
+            return await ctx.respond(
+                f"Solar system **{system}** does not exist", ephemeral=True
+            )
+
+        await ctx.defer(ephemeral=True)
+
+        await respond_with_embeds(
+            ctx=ctx,
+            embeds=self._get_locate_system_embeds(
+                solar_system=solar_system, jumps=jumps
+            ),
+            ephemeral=True,
+        )
+
+    @locate_commands.command(
+        name="coverage",
+        description="Find characters without location tokens in a corporation, alliance or state",
+        guild_ids=get_all_servers(),
+    )
+    @sender_has_perm("tnnt_discordbot_cogs.locate_coverage")
+    @message_in_channels(channels=_get_locate_channels())
+    @option(
+        name="corporation",
+        description="Search for a corporation",
+        autocomplete=search_corporations_on_characters,
+        required=False,
+    )
+    @option(
+        name="alliance",
+        description="Search for an alliance",
+        autocomplete=search_alliances_on_characters,
+        required=False,
+    )
+    @option(
+        name="state",
+        description="Search for an Auth state",
+        autocomplete=search_states,
+        required=False,
+    )
+    async def locate_coverage(
+        self,
+        ctx,
+        corporation: str = None,
+        alliance: str = None,
+        state: str = None,
+    ):
+        """
+        Slash command to audit the location token coverage of a corporation, alliance or state.
+
+        :param ctx:
+        :type ctx:
+        :param corporation:
+        :type corporation:
+        :param alliance:
+        :type alliance:
+        :param state:
+        :type state:
+        :return:
+        :rtype:
+        """
+
+        if len([x for x in (corporation, alliance, state) if x]) != 1:
+            return await ctx.respond(
+                "Please select exactly one corporation, alliance or state",
+                ephemeral=True,
+            )
+
+        await ctx.defer(ephemeral=True)
+
+        name = corporation or alliance or state
+        coverage = self._get_location_token_coverage(
+            corporation=corporation, alliance=alliance, state=state
+        )
+
+        if not coverage:
+            return await ctx.respond(
+                f"No linked characters found for **{name}**", ephemeral=True
+            )
 
-        for e in embeds:
-            await ctx.respond(embed=e, ephemeral=True)
+        return await ctx.respond(
+            embed=self._get_location_token_coverage_embed(coverage=coverage, name=name),
+            file=self._get_location_token_coverage_csv(coverage=coverage, name=name),
+            ephemeral=True,
+        )
 
 
 def setup(bot):
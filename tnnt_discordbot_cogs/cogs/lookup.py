@@ -3,32 +3,45 @@
 """
 
 # Standard Library
+import asyncio
 import csv
+import gzip
 import io
+import shutil
+import tempfile
 from collections.abc import Coroutine
-from typing import Any
+from datetime import date, datetime, time, timedelta
+from datetime import timezone as dt_timezone
+from typing import IO, Any
 
 # Third Party
 from discord import (
+    ButtonStyle,
     Color,
     Embed,
     File,
+    InputTextStyle,
     Interaction,
     SlashCommandGroup,
     WebhookMessage,
     option,
+    ui,
 )
-from discord.ext import commands
+from discord.ext import commands, tasks
 
 # Django
 from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import close_old_connections
+from django.db.models import Count, F, Min, Q
+from django.utils import timezone
 from django.utils.text import slugify
 
 # Alliance Auth
-from allianceauth.authentication.models import User
+from allianceauth.authentication.models import OwnershipRecord, User
 from allianceauth.eveonline.evelinks import evewho
-from allianceauth.eveonline.models import EveCharacter, EveCorporationInfo
+from allianceauth.eveonline.models import EveCharacter
 from allianceauth.services.hooks import get_extension_logger
 
 # Alliance Auth Discord Bot
@@ -45,12 +58,223 @@ from aadiscordbot.cogs.utils.decorators import (
 )
 
 # Terra Nanotech Discordbot Cogs
-from tnnt_discordbot_cogs.helper import unload_cog
+from tnnt_discordbot_cogs.cache import LOOKUP_CACHE_TIMEOUT, get_lookup_cache_key
+from tnnt_discordbot_cogs.helper import (
+    DISCORD_DEFAULT_FILESIZE_LIMIT,
+    DISCORD_MAX_EMBED_CHARACTERS_PER_MESSAGE,
+    respond_with_embeds,
+    search_alliances_on_characters,
+    unload_cog,
+)
+from tnnt_discordbot_cogs.models.directory import CharacterDirectoryEntry
+from tnnt_discordbot_cogs.models.lookup import (
+    USER_STATISTICS_FIELDS,
+    CorporationInfo,
+    CorporationMembership,
+    CorporationMembershipChange,
+    UserStatistics,
+)
 from tnnt_discordbot_cogs.models.setting import Setting
 from tnnt_discordbot_cogs.providers.applogger import AppLogger
+from tnnt_discordbot_cogs.providers.esi_handler import ESIHandler
 
 logger = AppLogger(my_logger=get_extension_logger(name=__name__))
 
+# Cached corporation information is served stale and refreshed in the background
+CORPORATION_INFO_CACHE_TTL = timedelta(hours=1)
+CORPORATION_INFO_REFRESH_MINUTES = 10
+CORPORATION_INFO_REFRESH_BATCH_SIZE = 25
+
+# `/lookup character` shows the linked characters in pages of fields
+LOOKUP_ALTS_PER_FIELD = 6
+LOOKUP_ALT_FIELDS_PER_PAGE = 5
+LOOKUP_MAX_GROUPS_EMBED_CHARACTERS = DISCORD_MAX_EMBED_CHARACTERS_PER_MESSAGE - 750
+
+# Maximum number of former owners shown for an unlinked character
+LOOKUP_UNLINKED_MAX_USERS = 25
+
+# Number of users ranked by `/lookup activity`
+LOOKUP_ACTIVITY_MAX_USERS = 25
+
+# `/lookup corporation_changes` looks back this many days, unless a date is given
+LOOKUP_CORPORATION_CHANGES_DEFAULT_DAYS = 7
+
+# Number of corporations listed per embed by `/lookup alliance`
+LOOKUP_ALLIANCE_CORPORATIONS_PER_EMBED = 20
+
+# `/lookup local` accepts pasted names in up to 5 text inputs of 4000 characters each
+LOOKUP_LOCAL_MAX_NAMES = 1000
+LOOKUP_LOCAL_TEXT_INPUTS = 5
+LOOKUP_LOCAL_TEXT_INPUT_MAX_LENGTH = 4000
+LOOKUP_LOCAL_MAX_LINE_LENGTH = 1000
+
+# `/lookup export` reads the characters in chunks and writes them to a temporary file
+LOOKUP_EXPORT_CHUNK_SIZE = 2000
+
+
+class LookupPaginationView(ui.View):
+    """
+    Persistent view to browse the linked characters of a character lookup.
+
+    The view keeps no state of its own, the character and the current page
+    are read from the title and footer of the lookup embed it is attached to,
+    so the buttons keep working after a restart of the bot.
+    """
+
+    def __init__(self, page: int = 1, pages: int = 1):
+        """
+        Initialize the LookupPaginationView
+
+        :param page: The page currently shown.
+        :type page: int
+        :param pages: The number of pages.
+        :type pages: int
+        """
+
+        super().__init__(timeout=None)  # No timeout
+
+        self.previous_button_callback.disabled = page <= 1
+        self.next_button_callback.disabled = page >= pages
+
+    @staticmethod
+    def _get_page(embed: Embed) -> tuple[int, int]:
+        """
+        Read the current page and the number of pages from the footer of a lookup embed.
+
+        :param embed: The lookup embed.
+        :type embed: Embed
+        :return: The current page and the number of pages.
+        :rtype: tuple[int, int]
+        """
+
+        if not embed.footer or not embed.footer.text:
+            return 1, 1
+
+        page, pages = embed.footer.text.removeprefix("Page ").split("/")
+
+        return int(page), int(pages)
+
+    @classmethod
+    async def _show_page(cls, interaction: Interaction, offset: int) -> None:
+        """
+        Replace the lookup embed with the page before or after the current one.
+
+        :param interaction: The button interaction.
+        :type interaction: Interaction
+        :param offset: -1 for the previous, 1 for the next page.
+        :type offset: int
+        :return: None
+        :rtype: None
+        """
+
+        embed = interaction.message.embeds[0]
+        current_page, _ = cls._get_page(embed=embed)
+
+        new_embed = Lookup.get_lookup_embed(
+            character_name=embed.title.removeprefix("Character Lookup: "),
+            page=current_page + offset,
+        )
+        new_page, pages = cls._get_page(embed=new_embed)
+
+        await interaction.response.edit_message(
+            embed=new_embed, view=cls(page=new_page, pages=pages)
+        )
+
+    @ui.button(
+        label="Previous",
+        row=0,
+        style=ButtonStyle.secondary,
+        custom_id="tnnt_cogs:lookup:pagination_view:button:previous",
+    )
+    async def previous_button_callback(self, button, interaction):
+        """
+        Previous button callback
+
+        :param button:
+        :type button:
+        :param interaction:
+        :type interaction:
+        :return:
+        :rtype:
+        """
+
+        await self._show_page(interaction=interaction, offset=-1)
+
+    @ui.button(
+        label="Next",
+        row=0,
+        style=ButtonStyle.secondary,
+        custom_id="tnnt_cogs:lookup:pagination_view:button:next",
+    )
+    async def next_button_callback(self, button, interaction):
+        """
+        Next button callback
+
+        :param button:
+        :type button:
+        :param interaction:
+        :type interaction:
+        :return:
+        :rtype:
+        """
+
+        await self._show_page(interaction=interaction, offset=1)
+
+
+class LookupLocalModal(ui.Modal):
+    """
+    Modal to paste a list of character names from local chat or a fleet window.
+    """
+
+    def __init__(self):
+        """
+        Initialize the LookupLocalModal
+        """
+
+        super().__init__(title="Local Lookup")
+
+        for idx in range(LOOKUP_LOCAL_TEXT_INPUTS):
+            self.add_item(
+                ui.InputText(
+                    label=(
+                        "Character names, one per line"
+                        if idx == 0
+                        else f"More character names ({idx + 1})"
+                    ),
+                    style=InputTextStyle.long,
+                    max_length=LOOKUP_LOCAL_TEXT_INPUT_MAX_LENGTH,
+                    required=idx == 0,
+                )
+            )
+
+    async def callback(self, interaction: Interaction):
+        """
+        Classify the pasted names and respond with the result
+
+        :param interaction:
+        :type interaction:
+        :return:
+        :rtype:
+        """
+
+        await interaction.response.defer(ephemeral=True)
+
+        names = Lookup._parse_local_names(
+            text="\n".join(child.value or "" for child in self.children)
+        )
+        ignored = max(len(names) - LOOKUP_LOCAL_MAX_NAMES, 0)
+        classification = Lookup._classify_local_names(
+            names=names[:LOOKUP_LOCAL_MAX_NAMES]
+        )
+
+        await respond_with_embeds(
+            ctx=interaction,
+            embeds=Lookup._get_local_embeds(
+                classification=classification, ignored=ignored
+            ),
+            ephemeral=True,
+        )
+
 
 class Lookup(commands.Cog):
     """
@@ -66,6 +290,41 @@ class Lookup(commands.Cog):
         """
 
         self.bot = bot
+        self._on_ready_done = False
+
+        self.refresh_corporation_info.start()
+
+    def cog_unload(self):
+        """
+        Stop the background tasks when the cog is unloaded.
+
+        :return:
+        :rtype:
+        """
+
+        self.refresh_corporation_info.cancel()
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        """
+        Register the persistent views once the bot is ready.
+
+        :return:
+        :rtype:
+        """
+
+        # `on_ready` can fire multiple times; run initialization once
+        if self._on_ready_done:
+            return
+
+        try:
+            self.bot.add_view(LookupPaginationView())
+
+            logger.info("LookupPaginationView view added successfully")
+        except Exception:
+            logger.exception("Failed to add LookupPaginationView view")
+
+        self._on_ready_done = True
 
     lookup_commands = SlashCommandGroup(
         name="lookup",
@@ -93,21 +352,315 @@ class Lookup(commands.Cog):
         )
 
     @staticmethod
-    def get_csv(character_name: str) -> File:
+    def _fetch_corporation_info(corporation_id: int) -> CorporationInfo | None:
+        """
+        Fetch the public information of a corporation from ESI and cache it.
+
+        :param corporation_id: The corporation ID.
+        :type corporation_id: int
+        :return: The cached corporation information or None if ESI failed.
+        :rtype: CorporationInfo | None
+        """
+
+        corporation = ESIHandler.get_corporations_corporation_id(
+            corporation_id=corporation_id, use_etag=False
+        )
+
+        if corporation is None:
+            return None
+
+        corporation_info, _ = CorporationInfo.objects.update_or_create(
+            corporation_id=corporation_id,
+            defaults={
+                "ticker": corporation.ticker,
+                "member_count": corporation.member_count,
+                "updated_at": timezone.now(),
+            },
+        )
+
+        return corporation_info
+
+    @staticmethod
+    def _refresh_corporation_info_batch() -> int:
+        """
+        Refresh the oldest outdated corporation information from ESI.
+
+        Runs in a worker thread, so it takes care of its own database connections.
+
+        :return: The number of refreshed corporations.
+        :rtype: int
+        """
+
+        close_old_connections()
+
+        corporation_ids = list(
+            CorporationInfo.objects.filter(
+                updated_at__lt=timezone.now() - CORPORATION_INFO_CACHE_TTL
+            )
+            .order_by("updated_at")
+            .values_list("corporation_id", flat=True)[
+                :CORPORATION_INFO_REFRESH_BATCH_SIZE
+            ]
+        )
+
+        failed_ids = [
+            corporation_id
+            for corporation_id in corporation_ids
+            if Lookup._fetch_corporation_info(corporation_id=corporation_id) is None
+        ]
+
+        # Keep serving the old information of corporations ESI failed on,
+        # but move them to the back of the queue
+        CorporationInfo.objects.filter(corporation_id__in=failed_ids).update(
+            updated_at=timezone.now()
+        )
+
+        close_old_connections()
+
+        return len(corporation_ids) - len(failed_ids)
+
+    @tasks.loop(minutes=CORPORATION_INFO_REFRESH_MINUTES)
+    async def refresh_corporation_info(self):
+        """
+        Periodically refresh outdated corporation information in the background.
+
+        :return:
+        :rtype:
+        """
+
+        try:
+            refreshed = await asyncio.to_thread(self._refresh_corporation_info_batch)
+
+            logger.debug(f"Refreshed {refreshed} corporations")
+        except Exception:
+            logger.exception("Failed to refresh corporation information")
+
+    @refresh_corporation_info.before_loop
+    async def before_refresh_corporation_info(self):
+        """
+        Wait for the bot to be ready before refreshing corporation information.
+
+        :return:
+        :rtype:
+        """
+
+        await self.bot.wait_until_ready()
+
+    @staticmethod
+    def _get_character(character_name: str) -> EveCharacter:
+        """
+        Get a character together with its ownership in one query.
+
+        :param character_name: The name of the character.
+        :type character_name: str
+        :return: The character.
+        :rtype: EveCharacter
+        :raises EveCharacter.DoesNotExist: If the character does not exist.
+        """
+
+        return EveCharacter.objects.select_related("character_ownership").get(
+            character_name=character_name
+        )
+
+    @staticmethod
+    def _get_alts(user_id: int) -> list[dict]:
+        """
+        Get all characters of an Auth user in one query.
+
+        :param user_id: The ID of the Auth user.
+        :type user_id: int
+        :return: A list of dicts with the character, corporation and alliance of each alt.
+        :rtype: list[dict]
+        """
+
+        return list(
+            EveCharacter.objects.filter(character_ownership__user_id=user_id)
+            .order_by("character_name")
+            .values(
+                "character_id",
+                "character_name",
+                "corporation_id",
+                "corporation_name",
+                "corporation_ticker",
+                "alliance_id",
+                "alliance_name",
+            )
+        )
+
+    @staticmethod
+    def _get_statistics(user_id: int) -> dict:
+        """
+        Get the summed up zKillboard statistics of an Auth user.
+
+        Read from the per-user statistics, which are summed up when they are
+        missing (e.g. before the first rebuild).
+
+        :param user_id: The ID of the Auth user.
+        :type user_id: int
+        :return: A dict with the summed up statistics.
+        :rtype: dict
+        """
+
+        statistics = (
+            UserStatistics.objects.filter(user_id=user_id)
+            .values(*USER_STATISTICS_FIELDS)
+            .first()
+        )
+
+        if statistics is None:
+            UserStatistics.refresh(user_ids=[user_id])
+
+            statistics = UserStatistics.objects.filter(user_id=user_id).values(
+                *USER_STATISTICS_FIELDS
+            ).first() or dict.fromkeys(USER_STATISTICS_FIELDS, 0)
+
+        return statistics
+
+    @staticmethod
+    def _build_lookup_data(user_id: int) -> dict:
+        """
+        Collect everything the character lookup shows about an Auth user.
+
+        The result only contains plain data, so it can be cached.
+
+        :param user_id: The ID of the Auth user.
+        :type user_id: int
+        :return: A dict with main, state, Discord ID, groups, alts and statistics of the user.
+        :rtype: dict
+        """
+
+        user = User.objects.select_related(
+            "profile__main_character", "profile__state", "discord"
+        ).get(pk=user_id)
+        main = user.profile.main_character
+
+        try:
+            discord_uid = user.discord.uid
+        except ObjectDoesNotExist:
+            logger.debug(f"User {user} has no Discord account linked")
+
+            discord_uid = None
+
+        return {
+            "main_name": main.character_name if main else None,
+            "main_corporation_ticker": main.corporation_ticker if main else None,
+            "state": user.profile.state.name,
+            "discord_uid": discord_uid,
+            "groups": list(user.groups.order_by("name").values_list("name", flat=True)),
+            "alts": Lookup._get_alts(user_id=user_id),
+            "statistics": (
+                Lookup._get_statistics(user_id=user_id)
+                if aastatistics_active()
+                else None
+            ),
+        }
+
+    @staticmethod
+    def get_lookup_data(user_id: int) -> dict:
+        """
+        Get the lookup data of an Auth user from the cache, or build and cache it.
+
+        All alts of a user share the same cache entry, it is invalidated
+        by signals when ownerships, main, state, groups or the Discord
+        account of the user change (see `tnnt_discordbot_cogs.signals`).
+
+        :param user_id: The ID of the Auth user.
+        :type user_id: int
+        :return: The lookup data, see `_build_lookup_data`.
+        :rtype: dict
+        """
+
+        cache_key = get_lookup_cache_key(user_id=user_id)
+        lookup_data = cache.get(key=cache_key)
+
+        if lookup_data is None:
+            lookup_data = Lookup._build_lookup_data(user_id=user_id)
+
+            cache.set(key=cache_key, value=lookup_data, timeout=LOOKUP_CACHE_TIMEOUT)
+
+        return lookup_data
+
+    @staticmethod
+    def _get_unlinked_lookup_data(char: EveCharacter) -> dict:
+        """
+        Collect the former owners of an unlinked character and all characters they have been linked to.
+
+        Only as many users and characters as the embed can show are fetched,
+        the totals are counted separately in one aggregate query.
+
+        :param char: The unlinked character.
+        :type char: EveCharacter
+        :return: A dict with the user names, the characters and the total numbers of both.
+        :rtype: dict
+        """
+
+        totals = OwnershipRecord.objects.filter(character=char).aggregate(
+            user_count=Count("user", distinct=True),
+            character_count=Count("user__ownership_records__character", distinct=True),
+        )
+        user_names = list(
+            User.objects.filter(ownership_records__character=char)
+            .order_by("username")
+            .values_list("username", flat=True)
+            .distinct()[:LOOKUP_UNLINKED_MAX_USERS]
+        )
+        characters = list(
+            EveCharacter.objects.filter(
+                ownership_records__user__ownership_records__character=char
+            )
+            .order_by("character_name")
+            .values(
+                "character_id",
+                "character_name",
+                "corporation_id",
+                "corporation_ticker",
+            )
+            .distinct()[: LOOKUP_ALTS_PER_FIELD * LOOKUP_ALT_FIELDS_PER_PAGE]
+        )
+
+        return {
+            "user_names": user_names,
+            "user_count": totals["user_count"],
+            "characters": characters,
+            "character_count": totals["character_count"],
+        }
+
+    @staticmethod
+    def _get_alt_pages(alts: list) -> int:
+        """
+        Get the number of pages needed to show all linked characters.
+
+        :param alts: The linked characters.
+        :type alts: list
+        :return: The number of pages, at least 1.
+        :rtype: int
+        """
+
+        alts_per_page = LOOKUP_ALTS_PER_FIELD * LOOKUP_ALT_FIELDS_PER_PAGE
+
+        return max(1, -(-len(alts) // alts_per_page))
+
+    @staticmethod
+    def get_csv(character_name: str, alts: list[dict] | None = None) -> File:
         """
         Generates a CSV file of all known alts for a given character name.
 
         :param character_name: The name of the character to look up.
         :type character_name: str
+        :param alts: The already fetched alts of the character, fetched when not given.
+        :type alts: list[dict] | None
         :return: A CSV file containing the character's alts.
         :rtype: File
         """
 
         csv_file_basename = slugify(f"{character_name} known alts")
-        char = EveCharacter.objects.get(character_name=character_name)
-        alts = char.character_ownership.user.character_ownerships.all().select_related(
-            "character"
-        )
+
+        if alts is None:
+            char = Lookup._get_character(character_name=character_name)
+            alts = Lookup.get_lookup_data(user_id=char.character_ownership.user_id)[
+                "alts"
+            ]
+
         buffer = io.StringIO()
         writer = csv.writer(buffer)
         header = [
@@ -123,12 +676,12 @@ class Lookup(commands.Cog):
         for a in alts:
             writer.writerow(
                 [
-                    a.character.character_id,
-                    a.character.character_name,
-                    a.character.corporation_id,
-                    a.character.corporation_name,
-                    a.character.alliance_id,
-                    a.character.alliance_name,
+                    a["character_id"],
+                    a["character_name"],
+                    a["corporation_id"],
+                    a["corporation_name"],
+                    a["alliance_id"],
+                    a["alliance_name"],
                 ]
             )
 
@@ -137,12 +690,23 @@ class Lookup(commands.Cog):
         return File(fp=buffer, filename=f"{csv_file_basename}.csv")
 
     @staticmethod
-    def get_lookup_embed(character_name: str) -> Embed:
+    def get_lookup_embed(
+        character_name: str,
+        char: EveCharacter | None = None,
+        lookup_data: dict | None = None,
+        page: int = 1,
+    ) -> Embed:
         """
         Generates an embed with information about a character.
 
         :param character_name: The name of the character to look up.
         :type character_name: str
+        :param char: The already fetched character (see `_get_character`), fetched when not given.
+        :type char: EveCharacter | None
+        :param lookup_data: The lookup data of the character's owner (see `get_lookup_data`), fetched when not given.
+        :type lookup_data: dict | None
+        :param page: The page of linked characters to show, groups and statistics are only shown on the first page.
+        :type page: int
         :return: An embed containing the character's information, including linked characters, groups, and statistics.
         :rtype: Embed
         """
@@ -150,117 +714,104 @@ class Lookup(commands.Cog):
         embed = Embed(title=f"Character Lookup: {character_name}")
 
         try:
-            char = EveCharacter.objects.get(character_name=character_name)
+            if char is None:
+                char = Lookup._get_character(character_name=character_name)
 
             try:
-                main = char.character_ownership.user.profile.main_character
-                state = char.character_ownership.user.profile.state.name
-                groups = char.character_ownership.user.groups.all().values_list(
-                    "name", flat=True
-                )
-
-                try:
-                    discord_string = f"<@{char.character_ownership.user.discord.uid}>"
-                except Exception as e:
-                    logger.error(e)
-
-                    discord_string = "unknown"
-
-                if aastatistics_active():
-                    alts = (
-                        char.character_ownership.user.character_ownerships.all()
-                        .select_related("character", "character_stats")
-                        .values_list(
-                            "character__character_name",
-                            "character__corporation_ticker",
-                            "character__character_id",
-                            "character__corporation_id",
-                            "character__character_stats__zk_12m",
-                            "character__character_stats__zk_3m",
-                            "character__character_stats__ships_destroyed",
-                            "character__character_stats__ships_lost",
-                            "character__character_stats__isk_destroyed",
-                            "character__character_stats__isk_lost",
-                        )
-                    )
-                    zk12 = 0
-                    zk3 = 0
-                    zk_ships_destroyed = 0
-                    zk_ships_lost = 0
-                    zk_isk_destroyed = 0
-                    zk_isk_lost = 0
-                else:
-                    alts = (
-                        char.character_ownership.user.character_ownerships.all()
-                        .select_related("character")
-                        .values_list(
-                            "character__character_name",
-                            "character__corporation_ticker",
-                            "character__character_id",
-                            "character__corporation_id",
-                        )
+                if lookup_data is None:
+                    lookup_data = Lookup.get_lookup_data(
+                        user_id=char.character_ownership.user_id
                     )
-                    zk12 = "Not Installed"
-                    zk3 = "Not Installed"
-                    zk_ships_destroyed = "Not Installed"
-                    zk_ships_lost = "Not Installed"
-                    zk_isk_destroyed = "Not Installed"
-                    zk_isk_lost = "Not Installed"
-
-                if aastatistics_active():
-                    for alt in alts:
-                        if alt[4]:
-                            zk12 += alt[4]
-                            zk3 += alt[5]
-
-                        if alt[6]:
-                            zk_ships_destroyed += alt[6]
-                            zk_ships_lost += alt[7]
-                            zk_isk_destroyed += alt[8]
-                            zk_isk_lost += alt[9]
+
+                main_name = lookup_data["main_name"]
+                state = lookup_data["state"]
+                groups = lookup_data["groups"]
+                statistics = lookup_data["statistics"]
+
+                discord_string = (
+                    f"<@{lookup_data['discord_uid']}>"
+                    if lookup_data["discord_uid"]
+                    else "unknown"
+                )
 
                 embed.colour = Color.blue()
-                embed.description = f"**{char}** is linked to **{main} [{main.corporation_ticker}]** (State: {state})"
 
+                if main_name:
+                    embed.description = f"**{char}** is linked to **{main_name} [{lookup_data['main_corporation_ticker']}]** (State: {state})"
+                else:
+                    embed.description = f"**{char}** is linked to an account without a main character (State: {state})"
+
+                alts = lookup_data["alts"]
+                pages = Lookup._get_alt_pages(alts=alts)
+                page = min(max(page, 1), pages)
+                first_field = (page - 1) * LOOKUP_ALT_FIELDS_PER_PAGE
+                first_alt = first_field * LOOKUP_ALTS_PER_FIELD
+                last_alt = (
+                    first_alt + LOOKUP_ALT_FIELDS_PER_PAGE * LOOKUP_ALTS_PER_FIELD
+                )
                 alt_list = [
-                    f"[{a[0]}]({evewho.character_url(a[2])}) [[{a[1]}]({evewho.corporation_url(a[3])})]"
-                    for a in alts
+                    f"[{a['character_name']}]({evewho.character_url(a['character_id'])}) "
+                    f"[[{a['corporation_ticker']}]({evewho.corporation_url(a['corporation_id'])})]"
+                    for a in alts[first_alt:last_alt]
                 ]
 
                 for idx, names in enumerate(
-                    [alt_list[i : i + 6] for i in range(0, len(alt_list), 6)]
+                    [
+                        alt_list[i : i + LOOKUP_ALTS_PER_FIELD]
+                        for i in range(0, len(alt_list), LOOKUP_ALTS_PER_FIELD)
+                    ],
+                    start=first_field + 1,
                 ):
-                    if idx < 6:
-                        embed.add_field(
-                            name=f"Linked Characters {idx + 1}",
-                            value="\n".join(names),
-                            inline=False,
-                        )
-                    else:
+                    embed.add_field(
+                        name=f"Linked Characters {idx}",
+                        value="\n".join(names),
+                        inline=False,
+                    )
+
+                if pages > 1:
+                    embed.set_footer(text=f"Page {page}/{pages}")
+
+                # Groups, statistics and the Discord link are only shown on the first page
+                if page > 1:
+                    return embed
+
+                group_fields = [[]]
+
+                for group in groups:
+                    # Embed field values are limited to 1024 characters
+                    if len("\n".join(group_fields[-1] + [group])) > 1024:
+                        group_fields.append([])
+
+                    group_fields[-1].append(group)
+
+                for group_names in group_fields:
+                    value = "\n".join(group_names)
+
+                    # Leave room for the statistics and the Discord link
+                    if len(embed) + len(value) > LOOKUP_MAX_GROUPS_EMBED_CHARACTERS:
                         embed.add_field(
-                            name=f"Linked Characters {idx} **(Discord Limited. There are More)**",
-                            value="\n".join(names),
+                            name="Groups **(Discord Limited. There are More)**",
+                            value="",
                             inline=False,
                         )
+
                         break
 
-                if len(groups) > 0:
-                    embed.add_field(
-                        name="Groups", value="\n".join(groups), inline=False
-                    )
+                    if group_names:
+                        embed.add_field(name="Groups", value=value, inline=False)
 
-                if aastatistics_active():
+                if statistics is not None:
                     embed.add_field(
                         name="Recent zKillboard Statistics", value="", inline=False
                     )
                     embed.add_field(
                         name="Kills (last 12 months)",
-                        value=f"{zk12:,}",
+                        value=f"{statistics['zk_12m']:,}",
                         inline=True,
                     )
                     embed.add_field(
                         name="Kills (last 3 months)",
-                        value=f"{zk3:,}",
+                        value=f"{statistics['zk_3m']:,}",
                         inline=True,
                     )
 
@@ -269,12 +820,12 @@ class Lookup(commands.Cog):
                     )
                     embed.add_field(
                         name="Ships Destroyed",
-                        value=f"{zk_ships_destroyed:,}",
+                        value=f"{statistics['ships_destroyed']:,}",
                         inline=True,
                     )
                     embed.add_field(
                         name="Ships Lost",
-                        value=f"{zk_ships_lost:,}",
+                        value=f"{statistics['ships_lost']:,}",
                         inline=True,
                     )
 
@@ -283,59 +834,64 @@ class Lookup(commands.Cog):
                     )
                     embed.add_field(
                         name="ISK Destroyed",
-                        value=f"{zk_isk_destroyed:,}",
+                        value=f"{statistics['isk_destroyed']:,}",
                         inline=True,
                     )
                     embed.add_field(
-                        name="ISK Lost", value=f"{zk_isk_lost:,}", inline=True
+                        name="ISK Lost",
+                        value=f"{statistics['isk_lost']:,}",
+                        inline=True,
                     )
 
                 embed.add_field(name="Discord Link", value=discord_string, inline=False)
 
                 return embed
             except ObjectDoesNotExist:
-                users = char.ownership_records.values("user")
-                users = User.objects.filter(id__in=users)
-                characters = EveCharacter.objects.filter(
-                    ownership_records__user__in=users
-                ).distinct()
+                unlinked_data = Lookup._get_unlinked_lookup_data(char=char)
                 embed = Embed(title="Character Lookup")
                 embed.colour = Color.blue()
 
                 embed.description = f"**{char}** is unlinked. Searching for any characters linked to known users"
-                user_names = [f"{user.username}" for user in users]
+                user_names = unlinked_data["user_names"]
+                more_users = unlinked_data["user_count"] - len(user_names)
 
                 if len(user_names) == 0:
                     user_names = "No user links found"
                 else:
                     user_names = ", ".join(user_names)
 
+                    if more_users > 0:
+                        user_names += f" and {more_users} more"
+
                 embed.add_field(name="Old Users", value=user_names, inline=False)
 
                 alt_list = [
                     (
-                        f"[{a.character_name}]({evewho.character_url(a.character_id)}) "
-                        f"*[[{a.corporation_ticker}]({evewho.corporation_url(a.corporation_id)})]*"
+                        f"[{a['character_name']}]({evewho.character_url(a['character_id'])}) "
+                        f"*[[{a['corporation_ticker']}]({evewho.corporation_url(a['corporation_id'])})]*"
                     )
-                    for a in characters
+                    for a in unlinked_data["characters"]
                 ]
 
                 for idx, names in enumerate(
-                    [alt_list[i : i + 6] for i in range(0, len(alt_list), 6)]
+                    [
+                        alt_list[i : i + LOOKUP_ALTS_PER_FIELD]
+                        for i in range(0, len(alt_list), LOOKUP_ALTS_PER_FIELD)
+                    ]
                 ):
-                    if idx < 6:
-                        embed.add_field(
-                            name=f"Found Characters {idx + 1}",
-                            value=", ".join(names),
-                            inline=False,
-                        )
-                    else:
-                        embed.add_field(
-                            name=f"Found Characters {idx} **(Discord Limited. There are More)**",
-                            value=", ".join(names),
-                            inline=False,
+                    embed.add_field(
+                        name=f"Found Characters {idx + 1}",
+                        value=", ".join(names),
+                        inline=False,
+                    )
+
+                if unlinked_data["character_count"] > len(alt_list):
+                    embed.set_footer(
+                        text=(
+                            f"Showing {len(alt_list)} of "
+                            f"{unlinked_data['character_count']} found characters"
                         )
-                        break
+                    )
 
                 return embed
         except EveCharacter.DoesNotExist:
@@ -348,69 +904,607 @@ class Lookup(commands.Cog):
             return embed
 
     @staticmethod
-    def build_corporation_embeds(corporation_name: str) -> list[Any] | None:
+    def _write_export_csv(
+        corporation: str | None = None, alliance: str | None = None
+    ) -> tuple[IO[bytes], int]:
         """
-        Builds embeds for a corporation based on the input name, showing all known alts in that corporation.
-
-        :param corporation_name: The name of the corporation to look up.
-        :type corporation_name: str
-        :return: A list of embeds containing information about the corporation and its members, or None if no members are found.
-        :rtype: list[Any] | None
+        Write a CSV of all characters in a corporation or alliance with their main, state and Discord account.
+
+        The characters are read in chunks and written to a temporary file,
+        so large alliances are never held in memory as a whole.
+        Runs in a worker thread, so it takes care of its own database connections.
+
+        :param corporation: The name of the corporation.
+        :type corporation: str | None
+        :param alliance: The name of the alliance.
+        :type alliance: str | None
+        :return: The CSV file, positioned at its start, and the number of characters.
+        :rtype: tuple[IO[bytes], int]
         """
 
-        chars = EveCharacter.objects.filter(corporation_name=corporation_name)
+        close_old_connections()
 
-        if chars.count():
-            corp_id = 0
-            own_ids = [settings.DISCORD_BOT_MEMBER_ALLIANCES]
-            alts_in_corp = []
-            knowns = 0
+        if corporation:
+            characters = EveCharacter.objects.filter(corporation_name=corporation)
+        else:
+            characters = EveCharacter.objects.filter(alliance_name=alliance)
+
+        profile_field = "character_ownership__user__profile__{}"
+        rows = (
+            characters.order_by("corporation_name", "character_name")
+            .values_list(
+                "character_id",
+                "character_name",
+                "corporation_id",
+                "corporation_name",
+                "alliance_id",
+                "alliance_name",
+                profile_field.format("main_character__character_name"),
+                profile_field.format("state__name"),
+                "character_ownership__user__discord__uid",
+                "character_ownership__user__discord__username",
+            )
+            .iterator(chunk_size=LOOKUP_EXPORT_CHUNK_SIZE)
+        )
 
-            for c in chars:
-                corp_id = c.corporation_id
+        # A real file, spooled temporary files can't be wrapped as text
+        # or attached to a message before Python 3.11
+        export_file = tempfile.TemporaryFile()
+        buffer = io.TextIOWrapper(export_file, encoding="utf-8", newline="")
+        writer = csv.writer(buffer)
+        header = [
+            "Character ID",
+            "Character Name",
+            "Corporation ID",
+            "Corporation Name",
+            "Alliance ID",
+            "Alliance Name",
+            "Main Character",
+            "State",
+            "Discord ID",
+            "Discord Name",
+        ]
+        writer.writerow(header)
 
-                if c.alliance_id not in own_ids:
-                    alts_in_corp.append(c)
+        character_count = 0
 
-            mains = {}
+        for row in rows:
+            writer.writerow(row)
+            character_count += 1
 
-            for a in alts_in_corp:
-                try:
-                    main = a.character_ownership.user.profile.main_character
+        buffer.flush()
+        buffer.detach()
+        export_file.seek(0)
 
-                    if main.character_id not in mains:
-                        mains[main.character_id] = [main, 0]
+        close_old_connections()
 
-                    mains[main.character_id][1] += 1
-                    knowns += 1
-                except Exception:
-                    # logger.error(e)
-                    pass
+        return export_file, character_count
 
-            output = []
-            base_string = "[{}]({}) [[{}]({})] has {} character{}"
+    @staticmethod
+    def _get_export_file(
+        export_file: IO[bytes], filename: str, filesize_limit: int
+    ) -> File | None:
+        """
+        Turn the exported CSV into a Discord attachment, compressed with gzip when it is too large.
+
+        :param export_file: The CSV file as returned by `_write_export_csv`.
+        :type export_file: IO[bytes]
+        :param filename: The filename of the attachment, without extension.
+        :type filename: str
+        :param filesize_limit: The upload limit in bytes.
+        :type filesize_limit: int
+        :return: The attachment or None if it is too large even when compressed.
+        :rtype: File | None
+        """
 
-            for k, m in mains.items():
-                output.append(
-                    base_string.format(
-                        m[0],
-                        evewho.character_url(m[0].character_id),
-                        m[0].corporation_ticker,
-                        evewho.corporation_url(m[0].corporation_id),
-                        m[1],
-                        "s" if m[1] > 1 else "",
+        export_file.seek(0, io.SEEK_END)
+        filesize = export_file.tell()
+        export_file.seek(0)
+
+        if filesize <= filesize_limit:
+            return File(fp=export_file, filename=f"{filename}.csv")
+
+        compressed_file = tempfile.TemporaryFile()
+
+        with gzip.GzipFile(
+            filename=f"{filename}.csv", mode="wb", fileobj=compressed_file
+        ) as gzip_file:
+            shutil.copyfileobj(export_file, gzip_file)
+
+        export_file.close()
+
+        if compressed_file.tell() > filesize_limit:
+            compressed_file.close()
+
+            return None
+
+        compressed_file.seek(0)
+
+        return File(fp=compressed_file, filename=f"{filename}.csv.gz")
+
+    @staticmethod
+    def _fetch_missing_corporation_info(corporation_ids: list[int]) -> int:
+        """
+        Fetch the corporation information that is not cached yet from ESI.
+
+        Runs in a worker thread, so it takes care of its own database connections.
+
+        :param corporation_ids: The corporation IDs.
+        :type corporation_ids: list[int]
+        :return: The number of fetched corporations.
+        :rtype: int
+        """
+
+        close_old_connections()
+
+        cached_ids = set(
+            CorporationInfo.objects.filter(
+                corporation_id__in=corporation_ids
+            ).values_list("corporation_id", flat=True)
+        )
+        fetched = sum(
+            Lookup._fetch_corporation_info(corporation_id=corporation_id) is not None
+            for corporation_id in corporation_ids
+            if corporation_id not in cached_ids
+        )
+
+        close_old_connections()
+
+        return fetched
+
+    @staticmethod
+    def _get_alliance_corporations(alliance_name: str) -> list[dict]:
+        """
+        Get the known characters and distinct mains per corporation of an alliance in one grouped query.
+
+        :param alliance_name: The name of the alliance.
+        :type alliance_name: str
+        :return: One dict per corporation with its ID, name, ticker, number of known characters and distinct mains.
+        :rtype: list[dict]
+        """
+
+        main_field = "character_ownership__user__profile__main_character"
+
+        return list(
+            EveCharacter.objects.filter(alliance_name=alliance_name)
+            .values("corporation_id", "corporation_name", "corporation_ticker")
+            .annotate(
+                known=Count("pk", filter=Q(**{f"{main_field}__isnull": False})),
+                mains=Count(main_field, distinct=True),
+            )
+            .order_by("-known", "corporation_name")
+        )
+
+    @staticmethod
+    def build_alliance_embeds(
+        alliance_name: str,
+    ) -> tuple[list[Embed], list[int]] | None:
+        """
+        Builds embeds for an alliance, showing the known and unknown members and distinct mains per corporation.
+
+        Member counts come from the corporation cache only, corporations
+        that are not cached yet are returned, so they can be fetched afterwards.
+
+        :param alliance_name: The name of the alliance to look up.
+        :type alliance_name: str
+        :return: The embeds and the IDs of corporations without cached information, or None if no characters are found.
+        :rtype: tuple[list[Embed], list[int]] | None
+        """
+
+        corporations = Lookup._get_alliance_corporations(alliance_name=alliance_name)
+
+        if not corporations:
+            return None
+
+        corporation_infos = CorporationInfo.objects.in_bulk(
+            [c["corporation_id"] for c in corporations]
+        )
+        alliance_mains = EveCharacter.objects.filter(
+            alliance_name=alliance_name
+        ).aggregate(
+            mains=Count(
+                "character_ownership__user__profile__main_character",
+                distinct=True,
+            )
+        )[
+            "mains"
+        ]
+
+        missing_ids = []
+        output = []
+        known_total = 0
+        members_total = 0
+        unknown_total = 0
+
+        for c in corporations:
+            corp_info = corporation_infos.get(c["corporation_id"])
+            known_total += c["known"]
+            corp_string = (
+                f"[[{c['corporation_ticker']}]({evewho.corporation_url(c['corporation_id'])})] "
+                f"{c['corporation_name']}: "
+            )
+
+            if corp_info is not None:
+                unknown = max(corp_info.member_count - c["known"], 0)
+                members_total += corp_info.member_count
+                unknown_total += unknown
+                ratio = (
+                    c["known"] / corp_info.member_count if corp_info.member_count else 0
+                )
+                corp_string += (
+                    f"**{c['known']}**/{corp_info.member_count} known ({ratio:.0%}), "
+                    f"{unknown} unknown"
+                )
+            else:
+                missing_ids.append(c["corporation_id"])
+                corp_string += f"**{c['known']}** known, member count not available yet"
+
+            corp_string += f", {c['mains']} main{'s' if c['mains'] != 1 else ''}"
+            output.append(corp_string)
+
+        msg = (
+            f"**{alliance_name}** has {len(corporations)} corporations with "
+            f"characters in Auth and {members_total} members in the corporations "
+            "with a known member count:\n\n"
+            "```diff\n"
+            f"+Known Members     : {known_total}\n"
+            f"-Unknowns          : {unknown_total}\n"
+            f" Distinct Mains    : {alliance_mains}```"
+        )
+
+        embeds = [Embed(title=alliance_name, description=msg)]
+
+        for strings in [
+            output[i : i + LOOKUP_ALLIANCE_CORPORATIONS_PER_EMBED]
+            for i in range(0, len(output), LOOKUP_ALLIANCE_CORPORATIONS_PER_EMBED)
+        ]:
+            embed = Embed(title=alliance_name)
+            embed.colour = Color.blue()
+            embed.description = "\n".join(strings)
+            embeds.append(embed)
+
+        return embeds, missing_ids
+
+    @staticmethod
+    def _parse_local_names(text: str) -> list[str]:
+        """
+        Get the character names from a list pasted from local chat or a fleet window.
+
+        Fleet window rows are tab separated, the name is the first column.
+
+        :param text: The pasted text.
+        :type text: str
+        :return: The unique character names in the order they were pasted.
+        :rtype: list[str]
+        """
+
+        names = {}
+
+        for line in text.splitlines():
+            name = line.split("\t")[0].strip()
+
+            if name and name.lower() not in names:
+                names[name.lower()] = name
+
+        return list(names.values())
+
+    @staticmethod
+    def _classify_local_names(names: list[str]) -> dict:
+        """
+        Classify character names as linked, known but unlinked and unknown in one query.
+
+        :param names: The character names.
+        :type names: list[str]
+        :return: A dict with the linked and unlinked characters (as dicts with name, corporation and main) and the unknown names.
+        :rtype: dict
+        """
+
+        characters = CharacterDirectoryEntry.objects.filter(
+            character_name__in=names
+        ).values(
+            "character_name",
+            "corporation_name",
+            "corporation_ticker",
+            "user_id",
+            "main_corporation_ticker",
+            main_name=F("main_character_name"),
+        )
+
+        linked = []
+        unlinked = []
+        known_names = set()
+
+        for character in characters:
+            known_names.add(character["character_name"].lower())
+
+            if character["user_id"] is not None:
+                linked.append(character)
+            else:
+                unlinked.append(character)
+
+        return {
+            "linked": linked,
+            "unlinked": unlinked,
+            "unknown": [name for name in names if name.lower() not in known_names],
+        }
+
+    @staticmethod
+    def _get_local_corporation_lines(
+        characters: list[dict], with_main: bool
+    ) -> list[str]:
+        """
+        Group characters by corporation, one line per corporation, the largest first.
+
+        :param characters: The characters as returned by `_classify_local_names`.
+        :type characters: list[dict]
+        :param with_main: Whether to show the main of each character.
+        :type with_main: bool
+        :return: The lines.
+        :rtype: list[str]
+        """
+
+        corporations = {}
+
+        for c in characters:
+            corporations.setdefault(
+                (c["corporation_ticker"], c["corporation_name"]), []
+            ).append(
+                f"{c['character_name']} ({c['main_name']} [{c['main_corporation_ticker']}])"
+                if with_main and c["main_name"]
+                else c["character_name"]
+            )
+
+        lines = []
+
+        for (ticker, name), entries in sorted(
+            corporations.items(), key=lambda item: (-len(item[1]), item[0][1])
+        ):
+            line = (
+                f"**[{ticker}] {name}** ({len(entries)}): {', '.join(sorted(entries))}"
+            )
+            lines.append(
+                line
+                if len(line) <= LOOKUP_LOCAL_MAX_LINE_LENGTH
+                else f"{line[: LOOKUP_LOCAL_MAX_LINE_LENGTH - 1]}…"
+            )
+
+        return lines
+
+    @staticmethod
+    def _get_local_embeds(classification: dict, ignored: int = 0) -> list[Embed]:
+        """
+        Builds the embeds for `/lookup local`, linked and unlinked characters are grouped by corporation.
+
+        :param classification: The classification as returned by `_classify_local_names`.
+        :type classification: dict
+        :param ignored: The number of names that were ignored because of the limit.
+        :type ignored: int
+        :return: A summary embed followed by the embeds of each group.
+        :rtype: list[Embed]
+        """
+
+        linked = classification["linked"]
+        unlinked = classification["unlinked"]
+        unknown = classification["unknown"]
+
+        msg = (
+            "```diff\n"
+            f"+Linked            : {len(linked)}\n"
+            f" Known, unlinked   : {len(unlinked)}\n"
+            f"-Unknown           : {len(unknown)}```"
+        )
+
+        if ignored:
+            msg += f"\n{ignored} names were ignored, only the first {LOOKUP_LOCAL_MAX_NAMES} are checked."
+
+        embeds = [Embed(title="Local Lookup", description=msg)]
+
+        groups = [
+            (
+                "Linked",
+                Color.green(),
+                Lookup._get_local_corporation_lines(characters=linked, with_main=True),
+                "\n",
+            ),
+            (
+                "Known, unlinked",
+                Color.orange(),
+                Lookup._get_local_corporation_lines(
+                    characters=unlinked, with_main=False
+                ),
+                "\n",
+            ),
+            ("Unknown", Color.red(), unknown, ", "),
+        ]
+
+        for title, colour, lines, separator in groups:
+            description = ""
+
+            for line in lines:
+                # Embed descriptions are limited to 4096 characters
+                if description and len(description) + len(separator + line) > 4096:
+                    embeds.append(
+                        Embed(title=title, description=description, colour=colour)
                     )
+                    description = ""
+
+                description = f"{description}{separator}{line}" if description else line
+
+            if description:
+                embeds.append(
+                    Embed(title=title, description=description, colour=colour)
                 )
-            embeds = []
 
-            corp_info = EveCorporationInfo.provider.get_corporation(corp_id)
+        return embeds
 
-            msg = (
-                f"**[[{corp_info.ticker}]({evewho.corporation_url(corp_id)})]** has {corp_info.members} members:\n\n"
-                "```diff\n"
-                f"+Known Members     : {knowns}\n"
-                f"-Unknowns          : {corp_info.members - knowns}```"
+    @staticmethod
+    def build_corporation_changes_embeds(
+        corporation_name: str, since: datetime
+    ) -> list[Embed] | None:
+        """
+        Builds embeds with the characters that joined or left a corporation since a point in time.
+
+        :param corporation_name: The name of the corporation.
+        :type corporation_name: str
+        :param since: The point in time.
+        :type since: datetime
+        :return: A summary embed followed by the joined and left characters, or None if the corporation is not tracked.
+        :rtype: list[Embed] | None
+        """
+
+        membership = (
+            CorporationMembership.objects.filter(corporation_name=corporation_name)
+            .only("corporation_id", "created_at")
+            .first()
+        )
+
+        if membership is None:
+            return None
+
+        joined, left = CorporationMembershipChange.get_changes_since(
+            corporation_id=membership.corporation_id, since=since
+        )
+        characters = CharacterDirectoryEntry.objects.in_bulk(id_list=joined + left)
+
+        msg = "```diff\n" f"+Joined : {len(joined)}\n" f"-Left   : {len(left)}```"
+
+        if membership.created_at > since:
+            msg += f"\nTracked since {membership.created_at:%Y-%m-%d %H:%M} (UTC)."
+
+        embeds = [
+            Embed(
+                title=f"Corporation Changes: {corporation_name}",
+                description=msg,
+                colour=Color.blue(),
             )
+        ]
+        embeds[0].set_footer(text=f"Since {since:%Y-%m-%d %H:%M} (UTC)")
+
+        def _get_line(character_id: int, with_corporation: bool) -> str:
+            character = characters.get(character_id)
+
+            if character is None:
+                return f"Unknown character ({character_id})"
+
+            line = f"[{character.character_name}]({evewho.character_url(character_id)})"
+
+            if with_corporation:
+                line += (
+                    f" → [[{character.corporation_ticker}]"
+                    f"({evewho.corporation_url(character.corporation_id)})]"
+                )
+
+            return line
+
+        groups = [
+            ("Joined", Color.green(), [_get_line(c, False) for c in joined]),
+            ("Left", Color.red(), [_get_line(c, True) for c in left]),
+        ]
+
+        for title, colour, lines in groups:
+            description = ""
+
+            for line in lines:
+                # Embed descriptions are limited to 4096 characters
+                if description and len(description) + len(line) + 1 > 4096:
+                    embeds.append(
+                        Embed(title=title, description=description, colour=colour)
+                    )
+                    description = ""
+
+                description = f"{description}\n{line}" if description else line
+
+            if description:
+                embeds.append(
+                    Embed(title=title, description=description, colour=colour)
+                )
+
+        return embeds
+
+    @staticmethod
+    def build_corporation_embeds(
+        corporation_name: str,
+    ) -> tuple[list[Embed], list[int]] | None:
+        """
+        Builds embeds for a corporation based on the input name, showing all known alts in that corporation.
+
+        The member count comes from the corporation cache only, a corporation
+        that is not cached yet is returned, so it can be fetched afterwards.
+
+        :param corporation_name: The name of the corporation to look up.
+        :type corporation_name: str
+        :return: The embeds and the IDs of corporations without cached information, or None if no members are found.
+        :rtype: tuple[list[Embed], list[int]] | None
+        """
+
+        chars = EveCharacter.objects.filter(corporation_name=corporation_name)
+        corp_id = chars.values_list("corporation_id", flat=True).last()
+
+        if corp_id is not None:
+            own_ids = [settings.DISCORD_BOT_MEMBER_ALLIANCES]
+            main_field = "character_ownership__user__profile__main_character__{}"
+
+            # One row per main with the number of their alts in the corporation,
+            # in the order their first alt shows up in the corporation.
+            # `own_ids` only excludes anything when the setting is a single
+            # alliance ID, a list of IDs never matched in the per-character loop
+            # this query replaces, so it is ignored here as well.
+            mains = (
+                chars.exclude(
+                    alliance_id__in=[
+                        alliance_id
+                        for alliance_id in own_ids
+                        if isinstance(alliance_id, int)
+                    ]
+                )
+                .filter(
+                    character_ownership__user__profile__main_character__isnull=False
+                )
+                .values(
+                    main_id=F(main_field.format("character_id")),
+                    main_name=F(main_field.format("character_name")),
+                    main_corporation_id=F(main_field.format("corporation_id")),
+                    main_corporation_ticker=F(main_field.format("corporation_ticker")),
+                )
+                .annotate(alts=Count("pk"), first_alt=Min("pk"))
+                .order_by("first_alt")
+            )
+
+            knowns = 0
+            output = []
+            base_string = "[{}]({}) [[{}]({})] has {} character{}"
+
+            for m in mains:
+                knowns += m["alts"]
+                output.append(
+                    base_string.format(
+                        m["main_name"],
+                        evewho.character_url(m["main_id"]),
+                        m["main_corporation_ticker"],
+                        evewho.corporation_url(m["main_corporation_id"]),
+                        m["alts"],
+                        "s" if m["alts"] > 1 else "",
+                    )
+                )
+
+            embeds = []
+
+            corp_info = CorporationInfo.objects.filter(corporation_id=corp_id).first()
+
+            if corp_info is not None:
+                msg = (
+                    f"**[[{corp_info.ticker}]({evewho.corporation_url(corp_id)})]** has {corp_info.member_count} members:\n\n"
+                    "```diff\n"
+                    f"+Known Members     : {knowns}\n"
+                    f"-Unknowns          : {corp_info.member_count - knowns}```"
+                )
+            else:
+                msg = (
+                    f"**[{corporation_name}]({evewho.corporation_url(corp_id)})** "
+                    "(member count currently not available):\n\n"
+                    "```diff\n"
+                    f"+Known Members     : {knowns}```"
+                )
 
             _header = Embed(title=corporation_name, description=msg)
 
@@ -422,10 +1516,84 @@ class Lookup(commands.Cog):
                 embed.description = "\n".join(strings)
                 embeds.append(embed)
 
-            return embeds
+            return embeds, [] if corp_info is not None else [corp_id]
 
         return None
 
+    @staticmethod
+    def _get_activity_embed(months: int) -> Embed:
+        """
+        Rank the Auth users by their kills in the last 3 or 12 months.
+
+        :param months: The period, 3 or 12 months.
+        :type months: int
+        :return: An embed with the most active users.
+        :rtype: Embed
+        """
+
+        field = f"zk_{months}m"
+        main_field = "user__profile__main_character__{}"
+        users = (
+            UserStatistics.objects.filter(**{f"{field}__gt": 0})
+            .order_by(f"-{field}", "user_id")
+            .values(
+                field,
+                main_name=F(main_field.format("character_name")),
+                main_corporation_ticker=F(main_field.format("corporation_ticker")),
+            )[:LOOKUP_ACTIVITY_MAX_USERS]
+        )
+
+        lines = [
+            f"{position}. [{user['main_corporation_ticker']}] "
+            f"{user['main_name'] or 'No Main Character'}: "
+            f"{user[field]:,} kills"
+            for position, user in enumerate(users, start=1)
+        ]
+
+        return Embed(
+            title=f"Most Active Users (last {months} months)",
+            description=("\n".join(lines) or "No kills found")[:4096],
+            colour=Color.blue(),
+        )
+
+    @lookup_commands.command(
+        name="activity",
+        description="Ranks the Auth users by their zKillboard kills of all their characters.",
+        guild_ids=app_settings.get_all_servers(),
+    )
+    @is_guild_managed()
+    @sender_has_perm(perm="tnnt_discordbot_cogs.lookup")
+    @message_in_channels(channels=_get_lookup_channels())
+    @option(
+        name="months",
+        description="Count the kills of the last 3 or 12 months",
+        choices=[3, 12],
+    )
+    async def slash_lookup_activity(
+        self, ctx, months: int = 12
+    ) -> Coroutine[Any, Any, Interaction | WebhookMessage]:
+        """
+        Ranks the Auth users by their kills, from the summed up zKillboard statistics.
+
+        :param ctx: Discord context for the command.
+        :type ctx:
+        :param months: The period, 3 or 12 months.
+        :type months: int
+        :return: An interaction response with the ranking.
+        :rtype: Coroutine[Any, Any, Interaction | WebhookMessage]
+        """
+
+        if not aastatistics_active():
+            return await ctx.respond(
+                "zKillboard statistics are not available", ephemeral=True
+            )
+
+        await ctx.defer(ephemeral=True)
+
+        return await ctx.respond(
+            embed=self._get_activity_embed(months=months), ephemeral=True
+        )
+
     @lookup_commands.command(
         name="character",
         description="Looks up a character in the Auth system and returns information about them.",
@@ -460,14 +1628,81 @@ class Lookup(commands.Cog):
 
         await ctx.defer(ephemeral=True)
 
-        if gib_csv:
-            file = self.get_csv(character)
+        # Fetch the character and its owner's lookup data once for both the embed and the CSV
+        char = None
+        lookup_data = None
 
-            return await ctx.respond(
-                embed=self.get_lookup_embed(character), file=file, ephemeral=True
+        try:
+            char = self._get_character(character_name=character)
+            lookup_data = self.get_lookup_data(user_id=char.character_ownership.user_id)
+        except ObjectDoesNotExist:
+            # Unknown or unlinked character, `get_lookup_embed` takes care of it
+            pass
+
+        embed = self.get_lookup_embed(
+            character_name=character, char=char, lookup_data=lookup_data
+        )
+
+        kwargs = {}
+
+        if lookup_data is not None:
+            pages = self._get_alt_pages(alts=lookup_data["alts"])
+
+            if pages > 1:
+                kwargs["view"] = LookupPaginationView(page=1, pages=pages)
+
+            if gib_csv:
+                kwargs["file"] = self.get_csv(
+                    character_name=character, alts=lookup_data["alts"]
+                )
+
+        return await ctx.respond(embed=embed, ephemeral=True, **kwargs)
+
+    @lookup_commands.command(
+        name="alliance",
+        description="Looks up an alliance and returns known members and mains per corporation.",
+        guild_ids=app_settings.get_all_servers(),
+    )
+    @is_guild_managed()
+    @sender_has_perm(perm="tnnt_discordbot_cogs.lookup")
+    @message_in_channels(channels=_get_lookup_channels())
+    @option(
+        name="alliance",
+        description="Search for an alliance",
+        autocomplete=search_alliances_on_characters,
+    )
+    async def slash_lookup_alliance(
+        self, ctx, alliance: str
+    ) -> Coroutine[Any, Any, Interaction | WebhookMessage] or None:
+        """
+        Gets Auth data about the corporations of a given alliance.
+
+        :param ctx: Discord context for the command.
+        :type ctx:
+        :param alliance: The name of the alliance to look up.
+        :type alliance: str
+        :return: An interaction response with the alliance's information or a message indicating no members found.
+        :rtype: Coroutine[Any, Any, Interaction | WebhookMessage] or None
+        """
+
+        await ctx.defer(ephemeral=True)
+
+        result = self.build_alliance_embeds(alliance_name=alliance)
+
+        if result is None:
+            return await ctx.respond("No Members Found!", ephemeral=True)
+
+        embeds, missing_ids = result
+
+        await respond_with_embeds(ctx=ctx, embeds=embeds, ephemeral=True)
+
+        # Fetch the member counts that were not available for the next lookup
+        if missing_ids:
+            await asyncio.to_thread(
+                self._fetch_missing_corporation_info, corporation_ids=missing_ids
             )
 
-        return await ctx.respond(embed=self.get_lookup_embed(character), ephemeral=True)
+        return None
 
     @lookup_commands.command(
         name="corporation",
@@ -498,19 +1733,184 @@ class Lookup(commands.Cog):
 
         await ctx.defer(ephemeral=True)
 
-        embeds = self.build_corporation_embeds(corporation_name=corporation)
+        result = self.build_corporation_embeds(corporation_name=corporation)
 
-        if len(embeds):
-            e = embeds.pop(0)
+        if result is None:
+            return await ctx.respond("No Members Found!", ephemeral=True)
 
-            await ctx.respond(embed=e, ephemeral=True)
+        embeds, missing_ids = result
 
-            for e in embeds:
-                await ctx.respond(embed=e, ephemeral=True)
+        await respond_with_embeds(ctx=ctx, embeds=embeds, ephemeral=True)
 
-            return None
+        # Fetch the member count that was not available for the next lookup
+        if missing_ids:
+            await asyncio.to_thread(
+                self._fetch_missing_corporation_info, corporation_ids=missing_ids
+            )
+
+        return None
+
+    @lookup_commands.command(
+        name="corporation_changes",
+        description="Shows who joined or left a corporation since a given date.",
+        guild_ids=app_settings.get_all_servers(),
+    )
+    @is_guild_managed()
+    @sender_has_perm(perm="tnnt_discordbot_cogs.lookup")
+    @message_in_channels(channels=_get_lookup_channels())
+    @option(
+        name="corporation",
+        description="Search for a corporation",
+        autocomplete=search_corporations_on_characters,
+    )
+    @option(
+        name="since",
+        description=f"Date as YYYY-MM-DD, defaults to {LOOKUP_CORPORATION_CHANGES_DEFAULT_DAYS} days ago",
+        required=False,
+    )
+    async def slash_lookup_corporation_changes(
+        self, ctx, corporation: str, since: str = None
+    ) -> Coroutine[Any, Any, Interaction | WebhookMessage] or None:
+        """
+        Shows who joined or left a corporation since a given date, from the membership snapshots.
+
+        :param ctx: Discord context for the command.
+        :type ctx:
+        :param corporation: The name of the corporation.
+        :type corporation: str
+        :param since: The date as YYYY-MM-DD.
+        :type since: str
+        :return: An interaction response with the changes or a message indicating the corporation is not tracked.
+        :rtype: Coroutine[Any, Any, Interaction | WebhookMessage] or None
+        """
+
+        if since:
+            try:
+                since_datetime = datetime.combine(
+                    date=date.fromisoformat(since.strip()),
+                    time=time.min,
+                    tzinfo=dt_timezone.utc,
+                )
+            except ValueError:
+                return await ctx.respond(
+                    f"**{since}** is not a valid date, please use YYYY-MM-DD",
+                    ephemeral=True,
+                )
         else:
-            return await ctx.respond("No Members Found!", ephemeral=True)
+            since_datetime = timezone.now() - timedelta(
+                days=LOOKUP_CORPORATION_CHANGES_DEFAULT_DAYS
+            )
+
+        await ctx.defer(ephemeral=True)
+
+        embeds = self.build_corporation_changes_embeds(
+            corporation_name=corporation, since=since_datetime
+        )
+
+        if embeds is None:
+            return await ctx.respond(
+                f"**{corporation}** is not tracked yet", ephemeral=True
+            )
+
+        await respond_with_embeds(ctx=ctx, embeds=embeds, ephemeral=True)
+
+        return None
+
+    @lookup_commands.command(
+        name="local",
+        description="Checks a pasted list of character names from local chat or a fleet window.",
+        guild_ids=app_settings.get_all_servers(),
+    )
+    @is_guild_managed()
+    @sender_has_perm(perm="tnnt_discordbot_cogs.lookup")
+    @message_in_channels(channels=_get_lookup_channels())
+    async def slash_lookup_local(self, ctx) -> None:
+        """
+        Opens a modal to paste character names, which are classified as linked, known but unlinked and unknown.
+
+        :param ctx: Discord context for the command.
+        :type ctx:
+        :return: None
+        :rtype: None
+        """
+
+        await ctx.send_modal(LookupLocalModal())
+
+    @lookup_commands.command(
+        name="export",
+        description="Exports all characters of a corporation or alliance with their main, state and Discord as CSV.",
+        guild_ids=app_settings.get_all_servers(),
+    )
+    @is_guild_managed()
+    @sender_has_perm(perm="tnnt_discordbot_cogs.lookup")
+    @message_in_channels(channels=_get_lookup_channels())
+    @option(
+        name="corporation",
+        description="Search for a corporation",
+        autocomplete=search_corporations_on_characters,
+        required=False,
+    )
+    @option(
+        name="alliance",
+        description="Search for an alliance",
+        autocomplete=search_alliances_on_characters,
+        required=False,
+    )
+    async def slash_lookup_export(
+        self, ctx, corporation: str = None, alliance: str = None
+    ) -> Coroutine[Any, Any, Interaction | WebhookMessage]:
+        """
+        Exports all characters of a corporation or alliance as CSV.
+
+        :param ctx: Discord context for the command.
+        :type ctx:
+        :param corporation: The name of the corporation to export.
+        :type corporation: str
+        :param alliance: The name of the alliance to export.
+        :type alliance: str
+        :return: An interaction response with the CSV file or a message why there is none.
+        :rtype: Coroutine[Any, Any, Interaction | WebhookMessage]
+        """
+
+        if bool(corporation) == bool(alliance):
+            return await ctx.respond(
+                "Please select either a corporation or an alliance", ephemeral=True
+            )
+
+        await ctx.defer(ephemeral=True)
+
+        name = corporation or alliance
+        export_file, character_count = await asyncio.to_thread(
+            self._write_export_csv, corporation=corporation, alliance=alliance
+        )
+
+        if character_count == 0:
+            export_file.close()
+
+            return await ctx.respond(
+                f"No characters found for **{name}**", ephemeral=True
+            )
+
+        file = await asyncio.to_thread(
+            self._get_export_file,
+            export_file=export_file,
+            filename=slugify(f"{name} characters"),
+            filesize_limit=(
+                ctx.guild.filesize_limit
+                if ctx.guild
+                else DISCORD_DEFAULT_FILESIZE_LIMIT
+            ),
+        )
+
+        if file is None:
+            return await ctx.respond(
+                f"The export of **{name}** is too large to upload, even compressed",
+                ephemeral=True,
+            )
+
+        return await ctx.respond(
+            f"**{name}**: {character_count:,} characters", file=file, ephemeral=True
+        )
 
 
 def setup(bot: commands.Bot) -> None:
@@ -3,208 +3,1468 @@ Market Price Checks cog for discordbot - https://github.com/pvyParts/allianceaut
 """
 
 # Standard Library
+import asyncio
+import heapq
+import io
 import locale
-from enum import Enum
+import re
+from collections.abc import Iterable
+from datetime import datetime, timedelta
 
 # Third Party
-import requests
-from discord import AutocompleteContext, Color, Embed, SlashCommandGroup, option
-from discord.ext import commands
+import aiohttp
+from discord import (
+    Attachment,
+    AutocompleteContext,
+    Color,
+    Embed,
+    InputTextStyle,
+    Interaction,
+    SlashCommandGroup,
+    option,
+    ui,
+)
+from discord.ext import commands, tasks
 from eve_sde.models import ItemType
 
+# Django
+from django.core.cache import cache
+from django.utils import timezone
+
 # Alliance Auth
 from allianceauth.eveonline.evelinks import eveimageserver
 from allianceauth.services.hooks import get_extension_logger
 
-# Alliance Auth Discord Bot
-from aadiscordbot import app_settings
+# Alliance Auth Discord Bot
+from aadiscordbot import app_settings
+
+# Terra Nanotech Discordbot Cogs
+from tnnt_discordbot_cogs import __user_agent__
+from tnnt_discordbot_cogs.cache import PRICE_CACHE_TIMEOUT, get_price_cache_key
+from tnnt_discordbot_cogs.helper import (
+    get_market_item_types,
+    respond_with_embeds,
+    unload_cog,
+)
+from tnnt_discordbot_cogs.models.price import PriceSnapshot
+from tnnt_discordbot_cogs.models.setting import Setting
+from tnnt_discordbot_cogs.providers.applogger import AppLogger
+from tnnt_discordbot_cogs.providers.fuzzwork import (
+    FUZZWORK_AGGREGATES_URL,
+    FUZZWORK_REQUEST_TIMEOUT,
+    FUZZWORK_TYPES_PER_REQUEST,
+    MarketRegion,
+    MarketSystem,
+)
+
+logger = AppLogger(my_logger=get_extension_logger(name=__name__))
+
+# Connections to Fuzzwork are pooled and kept alive between price checks
+FUZZWORK_CONNECTION_LIMIT = 10
+FUZZWORK_KEEPALIVE_TIMEOUT = 60.0
+
+# The most requested prices are refreshed before they go stale. Requests are
+# counted for a bounded number of types, halved every hour so demand can shift.
+PRICE_DEMAND_CAPACITY = 500
+PRICE_PREWARM_TOP_ITEMS = 100
+PRICE_PREWARM_MINUTES = 5
+PRICE_DEMAND_DECAY_LOOPS = 12
+
+# `/price multi` checks up to 100 pasted item names
+PRICE_MULTI_MAX_ITEMS = 100
+PRICE_MULTI_TEXT_INPUT_MAX_LENGTH = 4000
+
+# `/price appraise` takes pasted text in up to 5 text inputs, or a text file
+PRICE_APPRAISE_TEXT_INPUTS = 5
+PRICE_APPRAISE_MAX_FILE_SIZE = 2 * 1024 * 1024
+PRICE_APPRAISE_TOP_ITEMS = 15
+
+# "10 x Tritanium" (contracts) and "Tritanium x10" (fittings, cargo)
+PRICE_APPRAISE_QUANTITY_FIRST = re.compile(
+    r"^(?P<quantity>\d[\d.,' ]*?)\s*x\s+(?P<name>.+)$", re.IGNORECASE
+)
+PRICE_APPRAISE_QUANTITY_LAST = re.compile(
+    r"^(?P<name>.+?)\s+x\s*(?P<quantity>\d[\d.,']*)$", re.IGNORECASE
+)
+
+# EFT fits, sections in the order they are shown
+PRICE_FIT_HULL = "Hull"
+PRICE_FIT_MODULES = "Modules"
+PRICE_FIT_CHARGES = "Charges"
+PRICE_FIT_DRONES_AND_CARGO = "Drones and cargo"
+PRICE_FIT_SECTIONS = (
+    PRICE_FIT_HULL,
+    PRICE_FIT_MODULES,
+    PRICE_FIT_CHARGES,
+    PRICE_FIT_DRONES_AND_CARGO,
+)
+
+# "[Rifter, My Rifter]", "Warrior II x5" and "Stasis Webifier II /OFFLINE"
+PRICE_FIT_HEADER = re.compile(r"^\[(?P<hull>[^,\]]+),\s*(?P<name>.*)\]$")
+PRICE_FIT_QUANTITY = re.compile(r"^(?P<name>.+?)\s+x(?P<quantity>\d+)$")
+PRICE_FIT_OFFLINE = re.compile(r"\s*/offline$", flags=re.IGNORECASE)
+
+# Width of the item name column in price tables
+PRICE_TABLE_NAME_WIDTH = 28
+
+
+class PriceDemandTracker:
+    """
+    Counts how often prices are requested, for a bounded number of keys.
+
+    Uses the space-saving algorithm: when all slots are taken, a new key
+    replaces the least requested one and takes over its count. Frequently
+    requested keys stay, while one-off requests replace each other, so the
+    top keys are found with constant memory.
+
+    The least requested key is found with a min-heap. Outdated heap entries
+    are skipped when popped, and the heap is rebuilt when they pile up.
+    """
+
+    def __init__(self, capacity: int):
+        """
+        Initialize the PriceDemandTracker
+
+        :param capacity: The number of keys that are counted.
+        :type capacity: int
+        """
+
+        self.capacity = capacity
+        self._counts: dict[tuple, int] = {}
+        self._heap: list[tuple[int, tuple]] = []
+
+    def __len__(self):
+        """
+        The number of counted keys.
+
+        :return:
+        :rtype:
+        """
+
+        return len(self._counts)
+
+    def _rebuild_heap(self) -> None:
+        """
+        Rebuild the heap from the current counts, dropping outdated entries.
+
+        :return:
+        :rtype:
+        """
+
+        self._heap = [(count, key) for key, count in self._counts.items()]
+        heapq.heapify(self._heap)
+
+    def _evict(self) -> int:
+        """
+        Forget the least requested key.
+
+        :return: The count of the forgotten key
+        :rtype: int
+        """
+
+        while True:
+            count, key = heapq.heappop(self._heap)
+
+            # Counts only grow between rebuilds, so an entry is current
+            # when it still matches the count of its key
+            if self._counts.get(key) == count:
+                del self._counts[key]
+
+                return count
+
+    def record(self, keys: Iterable[tuple]) -> None:
+        """
+        Count one request for the prices of a command, once per distinct key.
+
+        :param keys: The market IDs and type IDs.
+        :type keys: Iterable[tuple[int, str]]
+        :return:
+        :rtype:
+        """
+
+        for key in dict.fromkeys(keys):
+            if key in self._counts:
+                count = self._counts[key] + 1
+            elif len(self._counts) < self.capacity:
+                count = 1
+            else:
+                count = self._evict() + 1
+
+            self._counts[key] = count
+            heapq.heappush(self._heap, (count, key))
+
+        if len(self._heap) > 4 * self.capacity:
+            self._rebuild_heap()
+
+    def top(self, count: int) -> list[tuple]:
+        """
+        The most requested keys.
+
+        :param count: The number of keys.
+        :type count: int
+        :return: The keys, the most requested first
+        :rtype: list[tuple[int, str]]
+        """
+
+        return heapq.nlargest(count, self._counts, key=self._counts.__getitem__)
+
+    def decay(self) -> None:
+        """
+        Halve all counts, keys that drop to zero are forgotten.
+
+        :return:
+        :rtype:
+        """
+
+        self._counts = {
+            key: count // 2 for key, count in self._counts.items() if count > 1
+        }
+        self._rebuild_heap()
+
+
+class PriceMultiModal(ui.Modal):
+    """
+    Modal to paste a list of item names to check the prices for.
+    """
+
+    def __init__(self, cog: "PriceCheck", market_name: str):
+        """
+        Initialize the PriceMultiModal
+
+        :param cog: The PriceCheck cog, its HTTP session and price cache are used.
+        :type cog: PriceCheck
+        :param market_name: The name of the market hub to check the prices on.
+        :type market_name: str
+        """
+
+        super().__init__(title=f"Price Check: {market_name}")
+
+        self.cog = cog
+        self.market_name = market_name
+
+        self.add_item(
+            ui.InputText(
+                label="Item names, one per line",
+                style=InputTextStyle.long,
+                max_length=PRICE_MULTI_TEXT_INPUT_MAX_LENGTH,
+            )
+        )
+
+    async def callback(self, interaction: Interaction):
+        """
+        Check the prices of the pasted items and respond with a price table
+
+        :param interaction:
+        :type interaction:
+        :return:
+        :rtype:
+        """
+
+        await interaction.response.defer(ephemeral=True)
+
+        await respond_with_embeds(
+            ctx=interaction,
+            embeds=await self.cog._multi_price_check(
+                market=PriceCheck._get_market_hubs()[self.market_name],
+                names=PriceCheck._parse_item_names(text=self.children[0].value or ""),
+            ),
+            ephemeral=True,
+        )
+
+
+class PriceAppraiseModal(ui.Modal):
+    """
+    Modal to paste an inventory, cargo scan or contract to appraise.
+    """
+
+    def __init__(self, cog: "PriceCheck", market_name: str):
+        """
+        Initialize the PriceAppraiseModal
+
+        :param cog: The PriceCheck cog, its HTTP session and price cache are used.
+        :type cog: PriceCheck
+        :param market_name: The name of the market hub to appraise on.
+        :type market_name: str
+        """
+
+        super().__init__(title=f"Appraisal: {market_name}")
+
+        self.cog = cog
+        self.market_name = market_name
+
+        for idx in range(PRICE_APPRAISE_TEXT_INPUTS):
+            self.add_item(
+                ui.InputText(
+                    label=(
+                        "Inventory, cargo scan or contract"
+                        if idx == 0
+                        else f"More items ({idx + 1})"
+                    ),
+                    style=InputTextStyle.long,
+                    max_length=PRICE_MULTI_TEXT_INPUT_MAX_LENGTH,
+                    required=idx == 0,
+                )
+            )
+
+    async def callback(self, interaction: Interaction):
+        """
+        Appraise the pasted items and respond with the totals
+
+        :param interaction:
+        :type interaction:
+        :return:
+        :rtype:
+        """
+
+        await interaction.response.defer(ephemeral=True)
+
+        lines = (
+            line for child in self.children for line in (child.value or "").splitlines()
+        )
+
+        await respond_with_embeds(
+            ctx=interaction,
+            embeds=await self.cog._appraise(
+                market=PriceCheck._get_market_hubs()[self.market_name],
+                items=PriceCheck._parse_appraisal(lines=lines),
+                title=f"Appraisal: {self.market_name}",
+            ),
+            ephemeral=True,
+        )
+
+
+class PriceFitModal(ui.Modal):
+    """
+    Modal to paste an EFT fit to price.
+    """
+
+    def __init__(self, cog: "PriceCheck", market_name: str):
+        """
+        Initialize the PriceFitModal
+
+        :param cog: The PriceCheck cog, its HTTP session and price cache are used.
+        :type cog: PriceCheck
+        :param market_name: The name of the market hub to price the fit on.
+        :type market_name: str
+        """
+
+        super().__init__(title=f"Fit Price Check: {market_name}")
+
+        self.cog = cog
+        self.market_name = market_name
+
+        self.add_item(
+            ui.InputText(
+                label="EFT fit",
+                placeholder="[Rifter, My Rifter]\nDamage Control II\n…",
+                style=InputTextStyle.long,
+                max_length=PRICE_MULTI_TEXT_INPUT_MAX_LENGTH,
+            )
+        )
+
+    async def callback(self, interaction: Interaction):
+        """
+        Price the pasted fit and respond with the totals
+
+        :param interaction:
+        :type interaction:
+        :return:
+        :rtype:
+        """
+
+        await interaction.response.defer(ephemeral=True)
+
+        await respond_with_embeds(
+            ctx=interaction,
+            embeds=await self.cog._fit_price_check(
+                market=PriceCheck._get_market_hubs()[self.market_name],
+                fit=self.children[0].value,
+            ),
+            ephemeral=True,
+        )
+
+
+class PriceCheck(commands.Cog):
+    """
+    Price checks on Jita, Amarr, Rens, Hek and Dodixie markets
+    """
+
+    price_commands = SlashCommandGroup(
+        "price", "Price Checks", guild_ids=app_settings.get_all_servers()
+    )
+
+    def __init__(self, bot):
+        """
+        Initialize the PriceCheck cog
+
+        :param bot:
+        :type bot:
+        """
+
+        self.bot = bot
+        self._http_session: aiohttp.ClientSession | None = None
+
+        # Background refreshes of stale prices and the cache keys they refresh
+        self._price_refresh_tasks: set[asyncio.Task] = set()
+        self._price_refresh_keys: set[str] = set()
+
+        # Market item names and type IDs by lower case name, built on first use
+        self._item_types: dict[str, tuple[str, str]] | None = None
+
+        # The most requested prices, kept warm by `prewarm_prices`
+        self._price_demand = PriceDemandTracker(capacity=PRICE_DEMAND_CAPACITY)
+
+        self.prewarm_prices.start()
+
+    def cog_unload(self):
+        """
+        Stop the background tasks and close the HTTP session when the cog is unloaded.
+
+        :return:
+        :rtype:
+        """
+
+        self.prewarm_prices.cancel()
+
+        for task in self._price_refresh_tasks:
+            task.cancel()
+
+        if self._http_session is not None and not self._http_session.closed:
+            self.bot.loop.create_task(self._http_session.close())
+
+    async def _get_http_session(self) -> aiohttp.ClientSession:
+        """
+        Get the HTTP session shared by all price checks.
+
+        The session has to be created inside the running event loop,
+        so it is created with the first price check after the cog is loaded.
+
+        :return: The HTTP session.
+        :rtype: aiohttp.ClientSession
+        """
+
+        if self._http_session is None or self._http_session.closed:
+            self._http_session = aiohttp.ClientSession(
+                headers={"User-Agent": __user_agent__},
+                timeout=aiohttp.ClientTimeout(total=FUZZWORK_REQUEST_TIMEOUT),
+                connector=aiohttp.TCPConnector(
+                    limit=FUZZWORK_CONNECTION_LIMIT,
+                    keepalive_timeout=FUZZWORK_KEEPALIVE_TIMEOUT,
+                ),
+            )
+
+        return self._http_session
+
+    @staticmethod
+    def _get_market_hubs() -> dict[str, dict]:
+        """
+        Get the major market hubs
+
+        :return: The market dictionaries by hub name
+        :rtype: dict[str, dict]
+        """
+
+        return {
+            "Jita": {"name": "Jita Market", "system_id": MarketSystem.JITA.value},
+            "Amarr": {"name": "Amarr Market", "system_id": MarketSystem.AMARR.value},
+            "Rens": {"name": "Rens Market", "system_id": MarketSystem.RENS.value},
+            "Hek": {"name": "Hek Market", "system_id": MarketSystem.HEK.value},
+            "Dodixie": {
+                "name": "Dodixie Market",
+                "system_id": MarketSystem.DODIXIE.value,
+            },
+        }
+
+    @staticmethod
+    def _get_plex_market():
+        """
+        Get the PLEX market data
+
+        :return:
+        :rtype:
+        """
+
+        return [
+            {"name": "Global PLEX Market", "region_id": MarketRegion.PLEXMARKET.value}
+        ]
+
+    async def _get_market_data(
+        self, market: dict, eve_type_ids: list[str]
+    ) -> dict | None:
+        """
+        Get the market data for a specific system and item types
+        This method fetches market data from the Fuzzwork API.
+        The Fuzzwork API provides aggregated market data for EVE Online.
+        https://market.fuzzwork.co.uk/aggregates/
+
+        :param market: The market dictionary containing system ID and name
+        :type market: dict
+        :param eve_type_ids: The EVE type IDs of the items to fetch data for
+        :type eve_type_ids: list[str]
+        :return: Market data as a json or None if the request fails
+        :rtype: Optional[dict]
+        """
+
+        market_system_id = market.get("system_id", None)
+        market_region_id = market.get("region_id", None)
+
+        url_params = {
+            "region" if market_region_id else "system": market_region_id
+            or market_system_id,
+            "types": ",".join(eve_type_ids),
+        }
+
+        http_session = await self._get_http_session()
+
+        try:
+            async with http_session.get(
+                url=FUZZWORK_AGGREGATES_URL, params=url_params
+            ) as response:
+                response.raise_for_status()
+
+                return await response.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            logger.error(f"Failed to fetch market data: {e}")
+
+            return None
+
+    @staticmethod
+    def _get_market_id(market: dict) -> int:
+        """
+        Get the ID of the region or system of a market.
+
+        :param market: The market dictionary containing system or region ID and name
+        :type market: dict
+        :return: The region or system ID.
+        :rtype: int
+        """
+
+        return market.get("region_id", None) or market.get("system_id", None)
+
+    async def _refresh_market_data(self, market: dict, eve_type_ids: list[str]) -> None:
+        """
+        Fetch the market data of item types and store it in the price cache.
+
+        The types are requested in batches, all batches at once. A failing
+        batch is logged and skipped, so it doesn't lose the others.
+
+        :param market: The market dictionary containing system ID and name
+        :type market: dict
+        :param eve_type_ids: The EVE type IDs of the items to fetch data for
+        :type eve_type_ids: list[str]
+        :return:
+        :rtype:
+        """
+
+        batches = await asyncio.gather(
+            *(
+                self._get_market_data(
+                    market=market,
+                    eve_type_ids=eve_type_ids[i : i + FUZZWORK_TYPES_PER_REQUEST],
+                )
+                for i in range(0, len(eve_type_ids), FUZZWORK_TYPES_PER_REQUEST)
+            ),
+            return_exceptions=True,
+        )
+
+        for batch in batches:
+            if isinstance(batch, Exception):
+                logger.error(f"Failed to fetch market data: {batch}", exc_info=batch)
+
+        market_id = self._get_market_id(market=market)
+        updated_at = timezone.now()
+
+        cache.set_many(
+            data={
+                get_price_cache_key(market_id=market_id, eve_type_id=eve_type_id): {
+                    "data": data,
+                    "updated_at": updated_at,
+                }
+                for batch in batches
+                if isinstance(batch, dict)
+                for eve_type_id, data in batch.items()
+            },
+            timeout=PRICE_CACHE_TIMEOUT,
+        )
+
+    def _refresh_market_data_in_background(
+        self, market: dict, eve_type_ids: list[str]
+    ) -> None:
+        """
+        Refresh the market data of item types in the background,
+        unless a refresh of them is already running.
+
+        :param market: The market dictionary containing system ID and name
+        :type market: dict
+        :param eve_type_ids: The EVE type IDs of the items to refresh
+        :type eve_type_ids: list[str]
+        :return:
+        :rtype:
+        """
+
+        market_id = self._get_market_id(market=market)
+        cache_keys = {
+            eve_type_id: get_price_cache_key(
+                market_id=market_id, eve_type_id=eve_type_id
+            )
+            for eve_type_id in eve_type_ids
+        }
+        eve_type_ids = [
+            eve_type_id
+            for eve_type_id, cache_key in cache_keys.items()
+            if cache_key not in self._price_refresh_keys
+        ]
+
+        if not eve_type_ids:
+            return
+
+        refresh_keys = {cache_keys[eve_type_id] for eve_type_id in eve_type_ids}
+        task = asyncio.create_task(
+            self._refresh_market_data(market=market, eve_type_ids=eve_type_ids)
+        )
+
+        def _done(finished_task: asyncio.Task) -> None:
+            self._price_refresh_tasks.discard(finished_task)
+            self._price_refresh_keys.difference_update(refresh_keys)
+
+        self._price_refresh_keys.update(refresh_keys)
+        self._price_refresh_tasks.add(task)
+        task.add_done_callback(_done)
+
+    async def _get_cached_market_data(
+        self, market: dict, eve_type_ids: list[str]
+    ) -> tuple[dict, dict]:
+        """
+        Get the market data of item types from the price cache.
+
+        Prices older than the configured TTL are served right away and
+        refreshed in the background, only prices that are not cached at all
+        are fetched before returning.
+
+        :param market: The market dictionary containing system ID and name
+        :type market: dict
+        :param eve_type_ids: The EVE type IDs of the items to fetch data for
+        :type eve_type_ids: list[str]
+        :return: The market data and when it was fetched, both by type ID, types that could not be fetched are missing
+        :rtype: tuple[dict, dict]
+        """
+
+        market_id = self._get_market_id(market=market)
+        cache_keys = {
+            eve_type_id: get_price_cache_key(
+                market_id=market_id, eve_type_id=eve_type_id
+            )
+            for eve_type_id in eve_type_ids
+        }
+
+        self._price_demand.record(
+            keys=[(market_id, eve_type_id) for eve_type_id in cache_keys]
+        )
+
+        cached = cache.get_many(keys=list(cache_keys.values()))
+        missing = [
+            eve_type_id
+            for eve_type_id, cache_key in cache_keys.items()
+            if cache_key not in cached
+        ]
+
+        if missing:
+            await self._refresh_market_data(market=market, eve_type_ids=missing)
+
+            cached.update(
+                cache.get_many(
+                    keys=[cache_keys[eve_type_id] for eve_type_id in missing]
+                )
+            )
+
+        stale_before = timezone.now() - timedelta(
+            minutes=Setting.get_setting(Setting.Field.PRICE_CACHE_TTL.value)
+        )
+        market_data = {}
+        updated_at = {}
+
+        for eve_type_id, cache_key in cache_keys.items():
+            if cache_key in cached:
+                market_data[eve_type_id] = cached[cache_key]["data"]
+                updated_at[eve_type_id] = cached[cache_key]["updated_at"]
+
+        # Stale prices are served anyway and refreshed in the background
+        stale = [
+            eve_type_id
+            for eve_type_id, fetched_at in updated_at.items()
+            if fetched_at < stale_before
+        ]
+
+        if stale:
+            self._refresh_market_data_in_background(market=market, eve_type_ids=stale)
+
+        return market_data, updated_at
+
+    @tasks.loop(minutes=PRICE_PREWARM_MINUTES)
+    async def prewarm_prices(self):
+        """
+        Refresh the most requested prices before they go stale.
+
+        :return:
+        :rtype:
+        """
+
+        try:
+            # Prices that go stale before the next run are refreshed now
+            refresh_before = timezone.now() - timedelta(
+                minutes=Setting.get_setting(Setting.Field.PRICE_CACHE_TTL.value)
+                - PRICE_PREWARM_MINUTES
+            )
+            top = self._price_demand.top(count=PRICE_PREWARM_TOP_ITEMS)
+            cache_keys = {
+                key: get_price_cache_key(market_id=key[0], eve_type_id=key[1])
+                for key in top
+            }
+            cached = cache.get_many(keys=list(cache_keys.values()))
+            markets = {
+                self._get_market_id(market=market): market
+                for market in (
+                    *self._get_market_hubs().values(),
+                    *self._get_plex_market(),
+                )
+            }
+            due = {}
+
+            for (market_id, eve_type_id), cache_key in cache_keys.items():
+                if (
+                    cache_key not in cached
+                    or cached[cache_key]["updated_at"] < refresh_before
+                ):
+                    due.setdefault(market_id, []).append(eve_type_id)
+
+            for market_id, eve_type_ids in due.items():
+                self._refresh_market_data_in_background(
+                    market=markets[market_id], eve_type_ids=eve_type_ids
+                )
+
+            loop_count = self.prewarm_prices.current_loop
+
+            if loop_count and loop_count % PRICE_DEMAND_DECAY_LOOPS == 0:
+                self._price_demand.decay()
+
+            logger.debug(
+                f"Prewarming {sum(map(len, due.values()))} of the "
+                f"{len(top)} most requested prices"
+            )
+        except Exception:
+            logger.exception("Failed to prewarm prices")
+
+    @prewarm_prices.before_loop
+    async def before_prewarm_prices(self):
+        """
+        Wait for the bot to be ready before prewarming prices.
+
+        :return:
+        :rtype:
+        """
+
+        await self.bot.wait_until_ready()
+
+    @staticmethod
+    def _set_data_age_footer(embed: Embed, updated_at: list[datetime]) -> None:
+        """
+        Show the age of the oldest shown price in the embed footer.
+
+        :param embed: The price embed.
+        :type embed: Embed
+        :param updated_at: When the shown prices were fetched.
+        :type updated_at: list[datetime]
+        :return:
+        :rtype:
+        """
+
+        if not updated_at:
+            return
+
+        age_minutes = int((timezone.now() - min(updated_at)).total_seconds() // 60)
+
+        embed.set_footer(
+            text=(
+                "Prices from Fuzzwork, up to date"
+                if age_minutes < 1
+                else f"Prices from Fuzzwork, {age_minutes} min old"
+            )
+        )
+
+    @staticmethod
+    def _build_market_price_embed(
+        embed: Embed,
+        market: dict,
+        item_name: str,
+        eve_type_id: str,
+        market_data: dict | None,
+    ) -> None:
+        """
+        Build the price embed for the selected market
+
+        :param embed:
+        :type embed:
+        :param market:
+        :type market:
+        :param item_name:
+        :type item_name:
+        :param eve_type_id:
+        :type eve_type_id:
+        :param market_data: The market data by type ID, None or without the type if the request failed
+        :type market_data: dict | None
+        :return:
+        :rtype:
+        """
+
+        market_name = market["name"]
+
+        embed.add_field(
+            name=f"{market_name}",
+            value=f"Prices for {item_name} on the {market_name}.",
+            inline=False,
+        )
+
+        if market_data and eve_type_id in market_data:
+            sell_min = market_data[eve_type_id]["sell"]["min"]
+            sell_order_count = int(market_data[eve_type_id]["sell"]["orderCount"])
+            buy_max = market_data[eve_type_id]["buy"]["max"]
+            buy_order_count = int(market_data[eve_type_id]["buy"]["orderCount"])
+            thumbnail_url = eveimageserver.type_icon_url(
+                type_id=int(eve_type_id), size=64
+            )
+
+            # Set the Embed thumbnail
+            embed.set_thumbnail(url=thumbnail_url)
+
+            locale.setlocale(category=locale.LC_ALL, locale="")
+
+            # Sell order price
+            market_min_sell_order_price = locale.format_string(
+                f="%.2f", val=float(sell_min), grouping=True
+            )
+
+            sell_orders_string = f"{sell_order_count} Orders"
+            if sell_order_count == 0:
+                market_min_sell_order_price = "No sell orders found"
+                sell_orders_string = "No Orders"
+
+            if 0 < sell_order_count < 2:
+                sell_orders_string = f"{sell_order_count} Order"
+
+            embed.add_field(
+                name=f"Sell Order Price ({sell_orders_string})",
+                value=f"{market_min_sell_order_price} ISK",
+                inline=True,
+            )
+
+            # Buy order price
+            market_max_buy_order_price = locale.format_string(
+                f="%.2f", val=float(buy_max), grouping=True
+            )
+
+            buy_orders_string = f"{buy_order_count} Orders"
+            if buy_order_count == 0:
+                market_max_buy_order_price = "No buy orders found"
+                buy_orders_string = "No Orders"
+
+            if 0 < buy_order_count < 2:
+                buy_orders_string = f"{buy_order_count} Order"
+
+            embed.add_field(
+                name=f"Buy Order Price ({buy_orders_string})",
+                value=f"{market_max_buy_order_price} ISK",
+                inline=True,
+            )
+        else:
+            embed.add_field(
+                name="API Error",
+                value=f"Could not not fetch the price for the {market_name} market.",
+                inline=False,
+            )
+
+    @staticmethod
+    def _parse_item_names(text: str) -> list[str]:
+        """
+        Parse pasted item names, one per line, without duplicates.
+
+        :param text: The pasted text.
+        :type text: str
+        :return: The item names in the order they were pasted.
+        :rtype: list[str]
+        """
+
+        names = {}
+
+        for line in text.splitlines():
+            name = line.strip()
+
+            if name:
+                names.setdefault(name.lower(), name)
+
+        return list(names.values())
+
+    def _resolve_item_names(
+        self, names: list[str]
+    ) -> tuple[dict[str, tuple], list[str]]:
+        """
+        Resolve item names to EVE type IDs, case-insensitive and limited to published market items.
+
+        :param names: The item names.
+        :type names: list[str]
+        :return: The item names and type IDs by lower case name as pasted, and the names that could not be found
+        :rtype: tuple[dict[str, tuple[str, str]], list[str]]
+        """
+
+        item_types = self._get_item_types()
+
+        return (
+            {
+                name.lower(): item_types[name.lower()]
+                for name in names
+                if name.lower() in item_types
+            },
+            [name for name in names if name.lower() not in item_types],
+        )
+
+    @staticmethod
+    def _get_prices(market_data: dict, eve_type_id: str) -> tuple:
+        """
+        Get the lowest sell and highest buy price of an item type from the market data.
+
+        :param market_data: The market data by type ID.
+        :type market_data: dict
+        :param eve_type_id: The EVE type ID.
+        :type eve_type_id: str
+        :return: The sell and buy price, None if there are no orders or no data
+        :rtype: tuple[float | None, float | None]
+        """
+
+        data = market_data.get(eve_type_id)
+
+        if not data:
+            return None, None
+
+        return (
+            float(data["sell"]["min"]) if int(data["sell"]["orderCount"]) else None,
+            float(data["buy"]["max"]) if int(data["buy"]["orderCount"]) else None,
+        )
+
+    @staticmethod
+    def _get_price_table_embeds(
+        title: str, header: tuple, rows: list[tuple], summary: str = ""
+    ) -> list[Embed]:
+        """
+        Builds embeds with a price table, split over as many embeds as needed.
+
+        :param title: The title of the embeds.
+        :type title: str
+        :param header: The column names, the item name first.
+        :type header: tuple[str, ...]
+        :param rows: The rows, the item name first, followed by prices or other values (None if not available).
+        :type rows: list[tuple]
+        :param summary: Text shown above the table.
+        :type summary: str
+        :return: The embeds.
+        :rtype: list[Embed]
+        """
+
+        def _format_row(row: tuple) -> str:
+            name = str(row[0])
+
+            if len(name) > PRICE_TABLE_NAME_WIDTH:
+                name = name[: PRICE_TABLE_NAME_WIDTH - 1] + "…"
+
+            columns = [
+                (
+                    "-"
+                    if value is None
+                    else f"{value:,.2f}" if isinstance(value, float) else str(value)
+                )
+                for value in row[1:]
+            ]
+
+            # The space keeps columns apart when a value outgrows its width
+            return name.ljust(PRICE_TABLE_NAME_WIDTH) + "".join(
+                " " + column.rjust(17) for column in columns
+            )
+
+        header_line = _format_row(header)
+        prefix = f"{summary}\n" if summary else ""
+        embeds = []
+        description = f"{prefix}```\n{header_line}"
+
+        for row in rows:
+            line = _format_row(row)
+
+            # Embed descriptions are limited to 4096 characters, including the closing fence
+            if len(description) + len(line) + 5 > 4096:
+                embeds.append(description + "\n```")
+                description = f"```\n{header_line}"
+
+            description += f"\n{line}"
+
+        embeds.append(description + "\n```")
+
+        return [
+            Embed(title=title, description=description, color=Color.green())
+            for description in embeds
+        ]
+
+    async def _multi_price_check(self, market: dict, names: list[str]) -> list[Embed]:
+        """
+        Check the prices of a list of items on a market, with the total of all items.
+
+        :param market: The market dictionary containing system ID and name
+        :type market: dict
+        :param names: The item names.
+        :type names: list[str]
+        :return: The embeds with the price table.
+        :rtype: list[Embed]
+        """
+
+        title = f"Price Check: {market['name']}"
+
+        if not names:
+            return [
+                Embed(
+                    title=title,
+                    description="You forgot to enter the items you want to check the prices for ...",
+                    color=Color.red(),
+                )
+            ]
+
+        ignored = names[PRICE_MULTI_MAX_ITEMS:]
+        items, not_found = self._resolve_item_names(names=names[:PRICE_MULTI_MAX_ITEMS])
+        market_data, updated_at = await self._get_cached_market_data(
+            market=market,
+            eve_type_ids=list({eve_type_id for _, eve_type_id in items.values()}),
+        )
+
+        rows = []
+        total_sell = 0.0
+        total_buy = 0.0
+
+        for item_name, eve_type_id in items.values():
+            sell, buy = self._get_prices(
+                market_data=market_data, eve_type_id=eve_type_id
+            )
+            total_sell += sell or 0.0
+            total_buy += buy or 0.0
+            rows.append((item_name, sell, buy))
+
+        rows.append(("Total", total_sell, total_buy))
+
+        summary = ""
+
+        if not_found:
+            summary += f"Not found: {', '.join(not_found)}"[:1000] + "\n"
+
+        if ignored:
+            summary += (
+                f"{len(ignored)} items were ignored, only the first "
+                f"{PRICE_MULTI_MAX_ITEMS} are checked.\n"
+            )
+
+        summary = summary.strip()
+
+        embeds = self._get_price_table_embeds(
+            title=title,
+            header=("Item", "Sell", "Buy"),
+            rows=rows,
+            summary=summary,
+        )
+        self._set_data_age_footer(
+            embed=embeds[-1], updated_at=list(updated_at.values())
+        )
+
+        return embeds
+
+    @staticmethod
+    def _parse_quantity(text: str) -> int | None:
+        """
+        Parse a quantity with thousands separators, like "1,000" or "1.000".
+
+        :param text: The quantity.
+        :type text: str
+        :return: The quantity, or None if it is not a number
+        :rtype: int | None
+        """
+
+        digits = text.strip().translate(str.maketrans("", "", ".,' \xa0"))
+
+        return int(digits) if digits.isdigit() else None
+
+    @staticmethod
+    def _parse_appraisal(lines: Iterable[str]) -> dict[str, list]:
+        """
+        Parse an inventory, cargo scan or contract line by line and sum up the quantities per item.
+
+        Understood are "Name<TAB>Quantity<TAB>…" (inventory and cargo scans),
+        "10 x Name" (contracts), "Name x10" and plain names (quantity 1).
+        Each line is looked at once, so large hangars are parsed in linear time.
+
+        :param lines: The pasted lines.
+        :type lines: Iterable[str]
+        :return: The item name as pasted and the quantity, by lower case name
+        :rtype: dict[str, list]
+        """
+
+        items = {}
+
+        for line in lines:
+            line = line.strip()
+
+            if not line:
+                continue
+
+            quantity = 1
+
+            if "\t" in line:
+                columns = line.split("\t")
+                name = columns[0].strip()
+
+                if len(columns) > 1 and columns[1].strip():
+                    quantity = PriceCheck._parse_quantity(text=columns[1]) or 1
+            elif match := PRICE_APPRAISE_QUANTITY_FIRST.match(line):
+                name = match["name"].strip()
+                quantity = PriceCheck._parse_quantity(text=match["quantity"]) or 1
+            elif match := PRICE_APPRAISE_QUANTITY_LAST.match(line):
+                name = match["name"].strip()
+                quantity = PriceCheck._parse_quantity(text=match["quantity"]) or 1
+            else:
+                name = line
+
+            if not name:
+                continue
+
+            item = items.setdefault(name.lower(), [name, 0])
+            item[1] += quantity
+
+        return items
 
-# Terra Nanotech Discordbot Cogs
-from tnnt_discordbot_cogs import __user_agent__
-from tnnt_discordbot_cogs.helper import unload_cog
-from tnnt_discordbot_cogs.providers.applogger import AppLogger
+    async def _appraise(
+        self, market: dict, items: dict[str, list], title: str, summary: str = ""
+    ) -> list[Embed]:
+        """
+        Appraise items on a market, with the quantity-weighted totals and the most valuable items.
 
-logger = AppLogger(my_logger=get_extension_logger(name=__name__))
+        :param market: The market dictionary containing system ID and name
+        :type market: dict
+        :param items: The item name and quantity, by lower case name, as returned by `_parse_appraisal`.
+        :type items: dict[str, list]
+        :param title: The title of the embeds.
+        :type title: str
+        :param summary: Text shown above the totals.
+        :type summary: str
+        :return: The embeds with the totals and the most valuable items.
+        :rtype: list[Embed]
+        """
 
+        if not items:
+            return [
+                Embed(
+                    title=title,
+                    description="No items found to appraise ...",
+                    color=Color.red(),
+                )
+            ]
 
-class MarketRegion(Enum):
-    """
-    Market Region Enum
-    """
+        resolved, not_found = self._resolve_item_names(
+            names=[name for name, _ in items.values()]
+        )
+        market_data, updated_at = await self._get_cached_market_data(
+            market=market,
+            eve_type_ids=list({eve_type_id for _, eve_type_id in resolved.values()}),
+        )
+
+        rows = []
+        total_quantity = 0
+        total_sell = 0.0
+        total_buy = 0.0
 
-    PLEXMARKET = 19000001
+        for key, (item_name, eve_type_id) in resolved.items():
+            quantity = items[key][1]
+            sell, buy = self._get_prices(
+                market_data=market_data, eve_type_id=eve_type_id
+            )
+            sell_value = (sell or 0.0) * quantity
+            buy_value = (buy or 0.0) * quantity
 
+            total_quantity += quantity
+            total_sell += sell_value
+            total_buy += buy_value
+            rows.append((item_name, f"{quantity:,}", sell_value, buy_value))
 
-class MarketSystem(Enum):
-    """
-    Market System Enum
-    """
+        rows.sort(key=lambda row: row[2], reverse=True)
 
-    JITA = 30000142
-    AMARR = 60008494
-    RENS = 60004588
-    HEK = 60005686
-    DODIXIE = 30002659
+        summary_lines = [summary] if summary else []
+        summary_lines.append(
+            f"**{total_quantity:,}** items of **{len(resolved)}** types\n"
+            f"Sell: **{total_sell:,.2f} ISK**\n"
+            f"Buy: **{total_buy:,.2f} ISK**"
+        )
 
+        if not_found:
+            summary_lines.append(f"Not found: {', '.join(not_found)}"[:1000])
 
-class PriceCheck(commands.Cog):
-    """
-    Price checks on Jita, Amarr, Rens, Hek and Dodixie markets
-    """
+        if len(rows) > PRICE_APPRAISE_TOP_ITEMS:
+            summary_lines.append(f"The {PRICE_APPRAISE_TOP_ITEMS} most valuable items:")
 
-    price_commands = SlashCommandGroup(
-        "price", "Price Checks", guild_ids=app_settings.get_all_servers()
-    )
+        embeds = self._get_price_table_embeds(
+            title=title,
+            header=("Item", "Quantity", "Sell", "Buy"),
+            rows=[
+                *rows[:PRICE_APPRAISE_TOP_ITEMS],
+                ("Total", f"{total_quantity:,}", total_sell, total_buy),
+            ],
+            summary="\n".join(summary_lines),
+        )
+        self._set_data_age_footer(
+            embed=embeds[-1], updated_at=list(updated_at.values())
+        )
 
-    def __init__(self, bot):
+        return embeds
+
+    def _get_item_types(self) -> dict[str, tuple[str, str]]:
         """
-        Initialize the PriceCheck cog
+        Get the names and type IDs of all published market items, by lower case name.
 
-        :param bot:
-        :type bot:
+        The map is built with one query on first use and kept for the lifetime of the cog.
+
+        :return: The item name and type ID, by lower case name
+        :rtype: dict[str, tuple[str, str]]
         """
 
-        self.bot = bot
+        if self._item_types is None:
+            self._item_types = get_market_item_types()
+
+            logger.debug(f"Item type map built with {len(self._item_types)} types")
+
+        return self._item_types
 
     @staticmethod
-    def _get_plex_market():
+    def _parse_eft(text: str) -> tuple[str | None, str, dict[str, dict[str, list]]]:
         """
-        Get the PLEX market data
+        Parse an EFT fit into its hull, modules, loaded charges, drones and cargo.
 
-        :return:
-        :rtype:
+        Loaded charges are counted once per module, empty slots are skipped.
+
+        :param text: The EFT fit.
+        :type text: str
+        :return: The hull, the name of the fit and the item names as pasted with their quantity by lower case name, per section
+        :rtype: tuple[str | None, str, dict[str, dict[str, list]]]
         """
 
-        return [
-            {"name": "Global PLEX Market", "region_id": MarketRegion.PLEXMARKET.value}
-        ]
+        sections = {section: {} for section in PRICE_FIT_SECTIONS}
+        lines = (line.strip() for line in text.splitlines())
+        header = next((line for line in lines if line), "")
+        header_match = PRICE_FIT_HEADER.match(header)
 
-    @staticmethod
-    def _get_market_data(market: dict, eve_type_id: str) -> dict | None:
+        if not header_match:
+            return None, "", sections
+
+        def _add(section: str, name: str, quantity: int = 1) -> None:
+            name = name.strip()
+
+            if name:
+                item = sections[section].setdefault(name.lower(), [name, 0])
+                item[1] += quantity
+
+        hull = header_match["hull"].strip()
+        _add(section=PRICE_FIT_HULL, name=hull)
+
+        for line in lines:
+            # Blank lines separate the racks, "[Empty High slot]" marks an empty one
+            if not line or line.startswith("["):
+                continue
+
+            if match := PRICE_FIT_QUANTITY.match(line):
+                _add(
+                    section=PRICE_FIT_DRONES_AND_CARGO,
+                    name=match["name"],
+                    quantity=int(match["quantity"]),
+                )
+
+                continue
+
+            module, _, charge = PRICE_FIT_OFFLINE.sub("", line).partition(",")
+            _add(section=PRICE_FIT_MODULES, name=module)
+
+            if charge:
+                _add(section=PRICE_FIT_CHARGES, name=charge)
+
+        return hull, header_match["name"].strip(), sections
+
+    async def _fit_price_check(self, market: dict, fit: str) -> list[Embed]:
         """
-        Get the market data for a specific system and item type
-        This method fetches market data from the Fuzzwork API.
-        The Fuzzwork API provides aggregated market data for EVE Online.
-        https://market.fuzzwork.co.uk/aggregates/
+        Price an EFT fit on a market, with the totals of the hull, modules, charges, drones and cargo.
 
         :param market: The market dictionary containing system ID and name
         :type market: dict
-        :param eve_type_id: The EVE type ID of the item to fetch data for
-        :type eve_type_id: str
-        :return: Market data as a json or None if the request fails
-        :rtype: Optional[dict]
+        :param fit: The EFT fit.
+        :type fit: str
+        :return: The embeds with the totals and the price table.
+        :rtype: list[Embed]
         """
 
-        market_system_id = market.get("system_id", None)
-        market_region_id = market.get("region_id", None)
+        hull, fit_name, sections = self._parse_eft(text=fit)
 
-        url = "https://market.fuzzwork.co.uk/aggregates/"
+        if hull is None:
+            return [
+                Embed(
+                    title=f"Fit Price Check: {market['name']}",
+                    description=(
+                        "This doesn't look like an EFT fit, it should start "
+                        "with a line like `[Rifter, My Rifter]` ..."
+                    ),
+                    color=Color.red(),
+                )
+            ]
+
+        item_types = self._get_item_types()
+        not_found = [
+            name
+            for items in sections.values()
+            for key, (name, _) in items.items()
+            if key not in item_types
+        ]
+        market_data, updated_at = await self._get_cached_market_data(
+            market=market,
+            eve_type_ids=list(
+                {
+                    item_types[key][1]
+                    for items in sections.values()
+                    for key in items
+                    if key in item_types
+                }
+            ),
+        )
 
-        url_params = {
-            "region" if market_region_id else "system": market_region_id
-            or market_system_id,
-            "types": eve_type_id,
-        }
+        rows = []
+        summary_lines = []
+        total_sell = 0.0
+        total_buy = 0.0
 
-        request_headers = {"User-Agent": __user_agent__}
+        for section, items in sections.items():
+            section_sell = 0.0
+            section_buy = 0.0
 
-        try:
-            response = requests.get(
-                url=url, params=url_params, headers=request_headers, timeout=5.00
-            )
-            response.raise_for_status()
+            for key, (_, quantity) in items.items():
+                if key not in item_types:
+                    continue
 
-            return response.json()
-        except requests.RequestException as e:
-            logger.error(f"Failed to fetch market data: {e}")
+                item_name, eve_type_id = item_types[key]
+                sell, buy = self._get_prices(
+                    market_data=market_data, eve_type_id=eve_type_id
+                )
+                section_sell += (sell or 0.0) * quantity
+                section_buy += (buy or 0.0) * quantity
+                rows.append(
+                    (
+                        item_name,
+                        f"{quantity:,}",
+                        (sell or 0.0) * quantity,
+                        (buy or 0.0) * quantity,
+                    )
+                )
 
-            return None
+            if items:
+                summary_lines.append(
+                    f"{section}: **{section_sell:,.2f} ISK** sell, "
+                    f"**{section_buy:,.2f} ISK** buy"
+                )
 
-    @classmethod
-    def _build_market_price_embed(
-        cls, embed: Embed, market: dict, item_name: str, eve_type_id: str
-    ) -> None:
-        """
-        Build the price embed for the selected market
+            total_sell += section_sell
+            total_buy += section_buy
 
-        :param embed:
-        :type embed:
-        :param market:
-        :type market:
-        :param item_name:
-        :type item_name:
-        :param eve_type_id:
-        :type eve_type_id:
-        :return:
-        :rtype:
-        """
+        summary_lines.append(
+            f"Total: **{total_sell:,.2f} ISK** sell, **{total_buy:,.2f} ISK** buy"
+        )
 
-        market_name = market["name"]
-        market_data = cls._get_market_data(market=market, eve_type_id=eve_type_id)
+        if not_found:
+            summary_lines.append(f"Not found: {', '.join(not_found)}"[:1000])
 
-        embed.add_field(
-            name=f"{market_name}",
-            value=f"Prices for {item_name} on the {market_name}.",
-            inline=False,
+        embeds = self._get_price_table_embeds(
+            title=f"{hull}: {fit_name}" if fit_name else hull,
+            header=("Item", "Quantity", "Sell", "Buy"),
+            rows=[*rows, ("Total", "", total_sell, total_buy)],
+            summary=f"Priced on the {market['name']}\n" + "\n".join(summary_lines),
+        )
+        self._set_data_age_footer(
+            embed=embeds[-1], updated_at=list(updated_at.values())
         )
 
-        if market_data:
-            sell_min = market_data[eve_type_id]["sell"]["min"]
-            sell_order_count = int(market_data[eve_type_id]["sell"]["orderCount"])
-            buy_max = market_data[eve_type_id]["buy"]["max"]
-            buy_order_count = int(market_data[eve_type_id]["buy"]["orderCount"])
-            thumbnail_url = eveimageserver.type_icon_url(
-                type_id=int(eve_type_id), size=64
-            )
+        return embeds
 
-            # Set the Embed thumbnail
-            embed.set_thumbnail(url=thumbnail_url)
+    def _price_trend(self, market_name: str, item_name: str) -> Embed:
+        """
+        Build the embed with the price trend of an item from the stored price history.
+
+        :param market_name: The name of the market hub.
+        :type market_name: str
+        :param item_name: The item name.
+        :type item_name: str
+        :return: The price trend embed
+        :rtype: Embed
+        """
 
-            locale.setlocale(category=locale.LC_ALL, locale="")
+        item_name, eve_type_id = self._get_item_types().get(
+            item_name.strip().lower(), (item_name, None)
+        )
+        trend = (
+            PriceSnapshot.get_trend(
+                eve_type_id=int(eve_type_id),
+                market_id=self._get_market_id(
+                    market=self._get_market_hubs()[market_name]
+                ),
+            )
+            if eve_type_id
+            else {}
+        )
 
-            # Sell order price
-            market_min_sell_order_price = locale.format_string(
-                f="%.2f", val=float(sell_min), grouping=True
+        embed = Embed(title=f"Price Trend: {item_name} ({market_name})")
+
+        if not trend:
+            embed.color = Color.orange()
+            embed.description = (
+                f"There is no price history for {item_name} on the {market_name} "
+                "market. Items and market hubs can be added to the price history "
+                "watch list in the settings."
             )
 
-            sell_orders_string = f"{sell_order_count} Orders"
-            if sell_order_count == 0:
-                market_min_sell_order_price = "No sell orders found"
-                sell_orders_string = "No Orders"
+            return embed
 
-            if 0 < sell_order_count < 2:
-                sell_orders_string = f"{sell_order_count} Order"
+        embed.color = Color.green()
+        embed.set_thumbnail(
+            url=eveimageserver.type_icon_url(type_id=int(eve_type_id), size=64)
+        )
 
-            embed.add_field(
-                name=f"Sell Order Price ({sell_orders_string})",
-                value=f"{market_min_sell_order_price} ISK",
-                inline=True,
-            )
+        for days, prices in trend.items():
+            lines = []
 
-            # Buy order price
-            market_max_buy_order_price = locale.format_string(
-                f="%.2f", val=float(buy_max), grouping=True
-            )
+            for price, label in (("sell", "Sell"), ("buy", "Buy")):
+                stats = prices[price]
 
-            buy_orders_string = f"{buy_order_count} Orders"
-            if buy_order_count == 0:
-                market_max_buy_order_price = "No buy orders found"
-                buy_orders_string = "No Orders"
+                if stats is None:
+                    lines.append(f"{label}: no orders")
 
-            if 0 < buy_order_count < 2:
-                buy_orders_string = f"{buy_order_count} Order"
+                    continue
 
-            embed.add_field(
-                name=f"Buy Order Price ({buy_orders_string})",
-                value=f"{market_max_buy_order_price} ISK",
-                inline=True,
-            )
-        else:
-            embed.add_field(
-                name="API Error",
-                value=f"Could not not fetch the price for the {market_name} market.",
-                inline=False,
-            )
+                change = (
+                    f" ({stats['change']:+.2f} %)"
+                    if stats["change"] is not None
+                    else ""
+                )
+                lines.append(
+                    f"{label}: **{stats['last']:,.2f} ISK**{change}\n"
+                    f"Min {stats['min']:,.2f} / Max {stats['max']:,.2f}"
+                )
+
+            embed.add_field(name=f"{days} Days", value="\n".join(lines), inline=True)
+
+        embed.set_footer(text="Daily prices from Fuzzwork")
+
+        return embed
 
     @staticmethod
     async def _search_item(ctx: AutocompleteContext) -> list:
@@ -228,8 +1488,7 @@ class PriceCheck(commands.Cog):
             ).values_list("name", flat=True)[:10]
         )
 
-    @classmethod
-    def _price_check(cls, markets, item_name: str = None) -> Embed:
+    async def _price_check(self, markets, item_name: str = None) -> Embed:
         """
         Check the price of an item on the specified markets
 
@@ -245,7 +1504,7 @@ class PriceCheck(commands.Cog):
             # Special case: PLEX market
             if item_name.lower() == "plex":
                 item_name = "PLEX"
-                markets = cls._get_plex_market()
+                markets = self._get_plex_market()
 
             try:
                 eve_type_id = str(
@@ -273,13 +1532,45 @@ class PriceCheck(commands.Cog):
                     color=Color.green(),
                 )
 
-                for market in markets:
-                    cls._build_market_price_embed(
+                # Fetch all markets at once, each request has its own timeout,
+                # so a slow or failing market doesn't hold up the others
+                markets_data = await asyncio.gather(
+                    *(
+                        self._get_cached_market_data(
+                            market=market, eve_type_ids=[eve_type_id]
+                        )
+                        for market in markets
+                    ),
+                    return_exceptions=True,
+                )
+
+                # A market that failed is shown as an API error
+                for index, (market, result) in enumerate(zip(markets, markets_data)):
+                    if isinstance(result, Exception):
+                        logger.error(
+                            f"Failed to get market data for the {market['name']}: {result}",
+                            exc_info=result,
+                        )
+
+                        markets_data[index] = (None, {})
+
+                for market, (market_data, _) in zip(markets, markets_data):
+                    self._build_market_price_embed(
                         embed=embed,
                         market=market,
                         item_name=item_name,
                         eve_type_id=eve_type_id,
+                        market_data=market_data,
                     )
+
+                self._set_data_age_footer(
+                    embed=embed,
+                    updated_at=[
+                        fetched_at
+                        for _, updated_at in markets_data
+                        for fetched_at in updated_at.values()
+                    ],
+                )
         else:
             embed = Embed(
                 title="Price Lookup",
@@ -315,15 +1606,13 @@ class PriceCheck(commands.Cog):
         :rtype:
         """
 
+        # The slowest market can take up to the request timeout, longer than
+        # Discord waits for a response
+        await ctx.defer(ephemeral=True)
+
         return await ctx.respond(
-            embed=self._price_check(
-                markets=[
-                    {"name": "Jita Market", "system_id": MarketSystem.JITA.value},
-                    {"name": "Amarr Market", "system_id": MarketSystem.AMARR.value},
-                    {"name": "Rens Market", "system_id": MarketSystem.RENS.value},
-                    {"name": "Hek Market", "system_id": MarketSystem.HEK.value},
-                    {"name": "Dodixie Market", "system_id": MarketSystem.DODIXIE.value},
-                ],
+            embed=await self._price_check(
+                markets=list(self._get_market_hubs().values()),
                 item_name=item_name,
             ),
             ephemeral=True,
@@ -349,7 +1638,7 @@ class PriceCheck(commands.Cog):
         """
 
         return await ctx.respond(
-            embed=self._price_check(
+            embed=await self._price_check(
                 markets=[{"name": "Jita Market", "system_id": MarketSystem.JITA.value}],
                 item_name=item_name,
             ),
@@ -376,7 +1665,7 @@ class PriceCheck(commands.Cog):
         """
 
         return await ctx.respond(
-            embed=self._price_check(
+            embed=await self._price_check(
                 markets=[
                     {"name": "Amarr Market", "system_id": MarketSystem.AMARR.value}
                 ],
@@ -405,7 +1694,7 @@ class PriceCheck(commands.Cog):
         """
 
         return await ctx.respond(
-            embed=self._price_check(
+            embed=await self._price_check(
                 markets=[{"name": "Rens Market", "system_id": MarketSystem.RENS.value}],
                 item_name=item_name,
             ),
@@ -432,7 +1721,7 @@ class PriceCheck(commands.Cog):
         """
 
         return await ctx.respond(
-            embed=self._price_check(
+            embed=await self._price_check(
                 markets=[{"name": "Hek Market", "system_id": MarketSystem.HEK.value}],
                 item_name=item_name,
             ),
@@ -459,7 +1748,7 @@ class PriceCheck(commands.Cog):
         """
 
         return await ctx.respond(
-            embed=self._price_check(
+            embed=await self._price_check(
                 markets=[
                     {"name": "Dodixie Market", "system_id": MarketSystem.DODIXIE.value}
                 ],
@@ -468,6 +1757,148 @@ class PriceCheck(commands.Cog):
             ephemeral=True,
         )
 
+    @price_commands.command(
+        name="multi",
+        description="Check the prices of a list of items on a market hub",
+    )
+    @option(
+        name="market",
+        description="The market hub",
+        choices=["Jita", "Amarr", "Rens", "Hek", "Dodixie"],
+        required=False,
+    )
+    async def multi(self, ctx, market: str = "Jita"):
+        """
+        Check the prices of a list of items on a market hub
+
+        :param ctx:
+        :type ctx:
+        :param market:
+        :type market:
+        :return:
+        :rtype:
+        """
+
+        await ctx.send_modal(PriceMultiModal(cog=self, market_name=market))
+
+    @price_commands.command(
+        name="appraise",
+        description="Appraise a pasted inventory, cargo scan or contract on a market hub",
+    )
+    @option(
+        name="market",
+        description="The market hub",
+        choices=["Jita", "Amarr", "Rens", "Hek", "Dodixie"],
+        required=False,
+    )
+    @option(
+        name="file",
+        input_type=Attachment,
+        description="A text file with the items, for hangars too large to paste",
+        required=False,
+    )
+    async def appraise(self, ctx, market: str = "Jita", file: Attachment = None):
+        """
+        Appraise a pasted inventory, cargo scan or contract on a market hub
+
+        :param ctx:
+        :type ctx:
+        :param market:
+        :type market:
+        :param file:
+        :type file:
+        :return:
+        :rtype:
+        """
+
+        if file is None:
+            return await ctx.send_modal(
+                PriceAppraiseModal(cog=self, market_name=market)
+            )
+
+        if file.size > PRICE_APPRAISE_MAX_FILE_SIZE:
+            return await ctx.respond(
+                f"The file is too large, it can be up to "
+                f"{PRICE_APPRAISE_MAX_FILE_SIZE // 1024 // 1024} MB",
+                ephemeral=True,
+            )
+
+        await ctx.defer(ephemeral=True)
+
+        content = await file.read()
+
+        await respond_with_embeds(
+            ctx=ctx,
+            embeds=await self._appraise(
+                market=self._get_market_hubs()[market],
+                items=self._parse_appraisal(
+                    lines=io.StringIO(
+                        content.decode(encoding="utf-8", errors="replace")
+                    )
+                ),
+                title=f"Appraisal: {market}",
+            ),
+            ephemeral=True,
+        )
+
+        return None
+
+    @price_commands.command(
+        name="fit",
+        description="Price an EFT fit on a market hub, with hull, module, charge and drone totals",
+    )
+    @option(
+        name="market",
+        description="The market hub",
+        choices=["Jita", "Amarr", "Rens", "Hek", "Dodixie"],
+        required=False,
+    )
+    async def fit(self, ctx, market: str = "Jita"):
+        """
+        Price an EFT fit on a market hub
+
+        :param ctx:
+        :type ctx:
+        :param market:
+        :type market:
+        :return:
+        :rtype:
+        """
+
+        await ctx.send_modal(PriceFitModal(cog=self, market_name=market))
+
+    @price_commands.command(
+        name="trend",
+        description="Show how an item price changed over the last 7, 30 and 90 days",
+    )
+    @option(
+        name="item_name", description="Search for an item…", autocomplete=_search_item
+    )
+    @option(
+        name="market",
+        description="The market hub",
+        choices=["Jita", "Amarr", "Rens", "Hek", "Dodixie"],
+        required=False,
+    )
+    async def trend(self, ctx, item_name: str, market: str = "Jita"):
+        """
+        Show how an item price changed over the last 7, 30 and 90 days
+
+        :param ctx:
+        :type ctx:
+        :param item_name:
+        :type item_name:
+        :param market:
+        :type market:
+        :return:
+        :rtype:
+        """
+
+        return await ctx.respond(
+            embed=self._price_trend(market_name=market, item_name=item_name),
+            ephemeral=True,
+        )
+
     @price_commands.command(
         name="plex",
         description="Check the PLEX price on the global PLEX market",
@@ -483,7 +1914,7 @@ class PriceCheck(commands.Cog):
         """
 
         return await ctx.respond(
-            embed=self._price_check(
+            embed=await self._price_check(
                 markets=[],  # PLEX market is a special case, so keep it empty, it will be set later in the method
                 item_name="PLEX",
             ),
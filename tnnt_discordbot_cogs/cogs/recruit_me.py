@@ -11,7 +11,6 @@ from discord import ButtonStyle, ChannelType, Embed, Guild, Interaction, Member,
 from discord.ext import commands
 
 # Django
-from django.core.exceptions import ObjectDoesNotExist
 from django.utils import timezone
 
 # Alliance Auth
@@ -25,6 +24,7 @@ from aadiscordbot.utils import auth
 
 # Terra Nanotech Discordbot Cogs
 from tnnt_discordbot_cogs.helper import reverse_absolute, unload_cog
+from tnnt_discordbot_cogs.models.directory import CharacterDirectoryEntry
 from tnnt_discordbot_cogs.models.setting import Setting
 from tnnt_discordbot_cogs.providers.applogger import AppLogger
 
@@ -167,22 +167,14 @@ def _check_compliance(auth_user: User) -> tuple[bool, Any]:
     :rtype:
     """
 
-    character_ownerships = auth_user.character_ownerships.all().select_related(
-        "character", "character__characteraudit"
-    )
-    characters = []
-
-    for character in character_ownerships:
-        # if character.user.id not in characters:
-        #     characters[character.user.id] = []
+    CharacterDirectoryEntry.ensure_user(user_id=auth_user.pk)
 
-        try:
-            # if not character.character.characteraudit.is_active():
-            if not character.character.characteraudit:
-                # characters[character.user.id].append(character.character.character_name)
-                characters.append(character.character.character_name)
-        except ObjectDoesNotExist:
-            characters.append(character.character.character_name)
+    characters = list(
+        CharacterDirectoryEntry.objects.of_user(user_id=auth_user.pk)
+        .without_audit()
+        .order_by("character_name")
+        .values_list("character_name", flat=True)
+    )
 
     return True if len(characters) == 0 else False, characters
 
@@ -6,12 +6,26 @@ Helper functions for the TNNT Discord bot.
 from urllib.parse import urljoin
 
 # Third Party
+from discord import ApplicationContext, AutocompleteContext, Embed
 from discord.ext import commands
+from eve_sde.models import ItemType
 
 # Django
 from django.conf import settings
 from django.urls import reverse
 
+# Alliance Auth
+from allianceauth.authentication.models import State
+from allianceauth.eveonline.models import EveCharacter
+
+# Discord message limits, see https://discord.com/developers/docs/resources/message#embed-object-embed-limits
+DISCORD_MAX_EMBEDS_PER_MESSAGE = 10
+DISCORD_MAX_EMBED_CHARACTERS_PER_MESSAGE = 6000
+DISCORD_MAX_FIELDS_PER_EMBED = 25
+
+# Upload limit of guilds without boosts, used when there is no guild to ask
+DISCORD_DEFAULT_FILESIZE_LIMIT = 10 * 1024 * 1024
+
 
 def unload_cog(bot: commands.Bot, cog_name: str) -> None:
     """
@@ -39,3 +53,149 @@ def reverse_absolute(viewname: str, args: list | None = None) -> str:
     """
 
     return urljoin(base=settings.SITE_URL, url=reverse(viewname=viewname, args=args))
+
+
+def get_market_item_types() -> dict[str, tuple[str, str]]:
+    """
+    Get the names and type IDs of all published market items, by lower case name.
+
+    Names are matched case-insensitively, the lowest type ID wins
+    when names are not unique.
+
+    :return: The item name and type ID, by lower case name
+    :rtype: dict[str, tuple[str, str]]
+    """
+
+    # Descending, so the lowest type ID is written last
+    return {
+        name.lower(): (name, str(type_id))
+        for type_id, name in ItemType.objects.filter(
+            published=True, market_group__isnull=False
+        )
+        .order_by("-id")
+        .values_list("id", "name")
+    }
+
+
+def _split_embed_fields(embed: Embed) -> list[Embed]:
+    """
+    Split an embed into several embeds so none of them exceeds the field limit.
+
+    Title, description and colour are carried over to every part.
+
+    :param embed: The embed to split.
+    :type embed: discord.Embed
+    :return: A list of embeds with at most `DISCORD_MAX_FIELDS_PER_EMBED` fields each.
+    :rtype: list[discord.Embed]
+    """
+
+    if len(embed.fields) <= DISCORD_MAX_FIELDS_PER_EMBED:
+        return [embed]
+
+    fields = embed.fields
+    parts = []
+
+    for i in range(0, len(fields), DISCORD_MAX_FIELDS_PER_EMBED):
+        part = embed.copy()
+        part.clear_fields()
+
+        for field in fields[i : i + DISCORD_MAX_FIELDS_PER_EMBED]:
+            part.add_field(name=field.name, value=field.value, inline=field.inline)
+
+        parts.append(part)
+
+    return parts
+
+
+def pack_embeds(embeds: list[Embed]) -> list[list[Embed]]:
+    """
+    Group embeds into as few messages as possible.
+
+    Each group holds at most `DISCORD_MAX_EMBEDS_PER_MESSAGE` embeds with a combined
+    length of at most `DISCORD_MAX_EMBED_CHARACTERS_PER_MESSAGE` characters.
+    Embeds with more than `DISCORD_MAX_FIELDS_PER_EMBED` fields are split first.
+    The order of the embeds is preserved.
+
+    :param embeds: The embeds to pack.
+    :type embeds: list[discord.Embed]
+    :return: A list of embed groups, one group per message.
+    :rtype: list[list[discord.Embed]]
+    """
+
+    messages = []
+    current = []
+    current_length = 0
+
+    for embed in (part for e in embeds for part in _split_embed_fields(e)):
+        embed_length = len(embed)
+
+        if current and (
+            len(current) >= DISCORD_MAX_EMBEDS_PER_MESSAGE
+            or current_length + embed_length > DISCORD_MAX_EMBED_CHARACTERS_PER_MESSAGE
+        ):
+            messages.append(current)
+            current = []
+            current_length = 0
+
+        current.append(embed)
+        current_length += embed_length
+
+    if current:
+        messages.append(current)
+
+    return messages
+
+
+async def respond_with_embeds(
+    ctx: ApplicationContext, embeds: list[Embed], ephemeral: bool = True
+) -> None:
+    """
+    Respond with a list of embeds, using as few messages as possible.
+
+    :param ctx: The context of the command.
+    :type ctx: discord.ApplicationContext
+    :param embeds: The embeds to send.
+    :type embeds: list[discord.Embed]
+    :param ephemeral: Whether the messages should be ephemeral.
+    :type ephemeral: bool
+    :return: None
+    :rtype: None
+    """
+
+    for message_embeds in pack_embeds(embeds=embeds):
+        await ctx.respond(embeds=message_embeds, ephemeral=ephemeral)
+
+
+async def search_alliances_on_characters(ctx: AutocompleteContext) -> list:
+    """
+    Returns a list of alliances that contain the characters entered so far.
+    Sourced from known characters.
+
+    :param ctx: The autocomplete context.
+    :type ctx: discord.AutocompleteContext
+    :return: A list of up to 10 alliance names.
+    :rtype: list
+    """
+
+    return list(
+        EveCharacter.objects.filter(alliance_name__icontains=ctx.value)
+        .values_list("alliance_name", flat=True)
+        .distinct()[:10]
+    )
+
+
+async def search_states(ctx: AutocompleteContext) -> list:
+    """
+    Returns a list of Auth states that contain the characters entered so far.
+
+    :param ctx: The autocomplete context.
+    :type ctx: discord.AutocompleteContext
+    :return: A list of up to 10 state names.
+    :rtype: list
+    """
+
+    return list(
+        State.objects.filter(name__icontains=ctx.value).values_list("name", flat=True)[
+            :10
+        ]
+    )
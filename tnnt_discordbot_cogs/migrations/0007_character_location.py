@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:06
+
+# Django
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("eveonline", "0025_remove_evecharacter_last_updated_and_more"),
+        ("tnnt_discordbot_cogs", "0006_honeypot"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CharacterLocation",
+            fields=[
+                (
+                    "character",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="+",
+                        serialize=False,
+                        to="eveonline.evecharacter",
+                        verbose_name="Character",
+                    ),
+                ),
+                (
+                    "solar_system_id",
+                    models.PositiveIntegerField(
+                        db_index=True, verbose_name="Solar system ID"
+                    ),
+                ),
+                (
+                    "ship_type_id",
+                    models.PositiveIntegerField(
+                        default=None, null=True, verbose_name="Ship type ID"
+                    ),
+                ),
+                ("online", models.BooleanField(default=False, verbose_name="Online")),
+                (
+                    "updated_at",
+                    models.DateTimeField(db_index=True, verbose_name="Updated at"),
+                ),
+            ],
+            options={
+                "verbose_name": "Character location",
+                "verbose_name_plural": "Character locations",
+                "default_permissions": (),
+            },
+        ),
+    ]
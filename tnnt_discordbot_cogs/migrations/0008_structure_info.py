@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:08
+
+# Django
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tnnt_discordbot_cogs", "0007_character_location"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StructureInfo",
+            fields=[
+                (
+                    "structure_id",
+                    models.BigIntegerField(
+                        primary_key=True, serialize=False, verbose_name="Structure ID"
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(default="", max_length=255, verbose_name="Name"),
+                ),
+                (
+                    "solar_system_id",
+                    models.PositiveIntegerField(
+                        default=None, null=True, verbose_name="Solar system ID"
+                    ),
+                ),
+                (
+                    "is_accessible",
+                    models.BooleanField(default=True, verbose_name="Accessible"),
+                ),
+                ("updated_at", models.DateTimeField(verbose_name="Updated at")),
+            ],
+            options={
+                "verbose_name": "Structure information",
+                "verbose_name_plural": "Structure information",
+                "default_permissions": (),
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:09
+
+# Django
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tnnt_discordbot_cogs", "0008_structure_info"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="permission",
+            options={
+                "default_permissions": (),
+                "managed": False,
+                "permissions": (
+                    ("locate", "Can run the `/locate` command"),
+                    ("locate_coverage", "Can run the `/locate coverage` command"),
+                    ("lookup", "Can run the `/lookup` command"),
+                ),
+                "verbose_name": "Command Permission",
+            },
+        ),
+    ]
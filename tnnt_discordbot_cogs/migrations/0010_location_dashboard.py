@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:10
+
+# Django
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("aadiscordbot", "0017_alter_authbotconfiguration_options_and_more"),
+        ("tnnt_discordbot_cogs", "0009_permission_locate_coverage"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LocationDashboardMessage",
+            fields=[
+                (
+                    "channel_id",
+                    models.PositiveBigIntegerField(
+                        primary_key=True, serialize=False, verbose_name="Channel ID"
+                    ),
+                ),
+                (
+                    "message_id",
+                    models.PositiveBigIntegerField(verbose_name="Message ID"),
+                ),
+                (
+                    "content_hash",
+                    models.CharField(max_length=64, verbose_name="Content hash"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Updated at"),
+                ),
+            ],
+            options={
+                "verbose_name": "Location dashboard message",
+                "verbose_name_plural": "Location dashboard messages",
+                "default_permissions": (),
+            },
+        ),
+        migrations.AddField(
+            model_name="setting",
+            name="location_dashboard_channels",
+            field=models.ManyToManyField(
+                blank=True,
+                help_text="Channels in which a pinned dashboard with the online characters per solar system and ship class is kept up to date.",
+                related_name="location_dashboard_channels",
+                to="aadiscordbot.channels",
+                verbose_name="Location Dashboard Channels",
+            ),
+        ),
+    ]
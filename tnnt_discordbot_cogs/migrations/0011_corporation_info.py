@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:16
+
+# Django
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tnnt_discordbot_cogs", "0010_location_dashboard"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CorporationInfo",
+            fields=[
+                (
+                    "corporation_id",
+                    models.PositiveIntegerField(
+                        primary_key=True, serialize=False, verbose_name="Corporation ID"
+                    ),
+                ),
+                ("ticker", models.CharField(max_length=5, verbose_name="Ticker")),
+                (
+                    "member_count",
+                    models.PositiveIntegerField(default=0, verbose_name="Member count"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(db_index=True, verbose_name="Updated at"),
+                ),
+            ],
+            options={
+                "verbose_name": "Corporation information",
+                "verbose_name_plural": "Corporation information",
+                "default_permissions": (),
+            },
+        ),
+    ]
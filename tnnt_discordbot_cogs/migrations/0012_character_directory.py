@@ -0,0 +1,134 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:28
+
+# Django
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tnnt_discordbot_cogs", "0011_corporation_info"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CharacterDirectoryEntry",
+            fields=[
+                (
+                    "character_id",
+                    models.PositiveIntegerField(
+                        primary_key=True, serialize=False, verbose_name="Character ID"
+                    ),
+                ),
+                (
+                    "character_name",
+                    models.CharField(
+                        db_index=True, max_length=254, verbose_name="Character name"
+                    ),
+                ),
+                (
+                    "corporation_id",
+                    models.PositiveIntegerField(
+                        db_index=True, verbose_name="Corporation ID"
+                    ),
+                ),
+                (
+                    "corporation_name",
+                    models.CharField(
+                        db_index=True, max_length=254, verbose_name="Corporation name"
+                    ),
+                ),
+                (
+                    "corporation_ticker",
+                    models.CharField(max_length=5, verbose_name="Corporation ticker"),
+                ),
+                (
+                    "alliance_id",
+                    models.PositiveIntegerField(
+                        db_index=True,
+                        default=None,
+                        null=True,
+                        verbose_name="Alliance ID",
+                    ),
+                ),
+                (
+                    "alliance_name",
+                    models.CharField(
+                        db_index=True,
+                        default=None,
+                        max_length=254,
+                        null=True,
+                        verbose_name="Alliance name",
+                    ),
+                ),
+                (
+                    "user_id",
+                    models.PositiveIntegerField(
+                        db_index=True, default=None, null=True, verbose_name="User ID"
+                    ),
+                ),
+                (
+                    "state_name",
+                    models.CharField(
+                        db_index=True,
+                        default=None,
+                        max_length=32,
+                        null=True,
+                        verbose_name="State name",
+                    ),
+                ),
+                (
+                    "main_character_id",
+                    models.PositiveIntegerField(
+                        db_index=True,
+                        default=None,
+                        null=True,
+                        verbose_name="Main character ID",
+                    ),
+                ),
+                (
+                    "main_character_name",
+                    models.CharField(
+                        default=None,
+                        max_length=254,
+                        null=True,
+                        verbose_name="Main character name",
+                    ),
+                ),
+                (
+                    "main_corporation_ticker",
+                    models.CharField(
+                        default=None,
+                        max_length=5,
+                        null=True,
+                        verbose_name="Main corporation ticker",
+                    ),
+                ),
+                (
+                    "discord_uid",
+                    models.PositiveBigIntegerField(
+                        db_index=True,
+                        default=None,
+                        null=True,
+                        verbose_name="Discord user ID",
+                    ),
+                ),
+                (
+                    "has_audit",
+                    models.BooleanField(default=False, verbose_name="In audit"),
+                ),
+                (
+                    "has_location_token",
+                    models.BooleanField(
+                        default=False, verbose_name="Has location token"
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(verbose_name="Updated at")),
+            ],
+            options={
+                "verbose_name": "Character directory entry",
+                "verbose_name_plural": "Character directory entries",
+                "default_permissions": (),
+            },
+        ),
+    ]
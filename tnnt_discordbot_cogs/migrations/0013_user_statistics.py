@@ -0,0 +1,71 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:33
+
+# Django
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("tnnt_discordbot_cogs", "0012_character_directory"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserStatistics",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="+",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="User",
+                    ),
+                ),
+                (
+                    "zk_12m",
+                    models.PositiveIntegerField(
+                        db_index=True, default=0, verbose_name="Kills last 12 months"
+                    ),
+                ),
+                (
+                    "zk_3m",
+                    models.PositiveIntegerField(
+                        db_index=True, default=0, verbose_name="Kills last 3 months"
+                    ),
+                ),
+                (
+                    "ships_destroyed",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Ships destroyed"
+                    ),
+                ),
+                (
+                    "ships_lost",
+                    models.PositiveIntegerField(default=0, verbose_name="Ships lost"),
+                ),
+                (
+                    "isk_destroyed",
+                    models.PositiveBigIntegerField(
+                        default=0, verbose_name="ISK destroyed"
+                    ),
+                ),
+                (
+                    "isk_lost",
+                    models.PositiveBigIntegerField(default=0, verbose_name="ISK lost"),
+                ),
+                ("updated_at", models.DateTimeField(verbose_name="Updated at")),
+            ],
+            options={
+                "verbose_name": "User statistics",
+                "verbose_name_plural": "User statistics",
+                "default_permissions": (),
+            },
+        ),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:36
+
+# Django
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tnnt_discordbot_cogs", "0013_user_statistics"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CorporationMembership",
+            fields=[
+                (
+                    "corporation_id",
+                    models.PositiveIntegerField(
+                        primary_key=True, serialize=False, verbose_name="Corporation ID"
+                    ),
+                ),
+                (
+                    "corporation_name",
+                    models.CharField(
+                        db_index=True, max_length=254, verbose_name="Corporation name"
+                    ),
+                ),
+                (
+                    "character_ids",
+                    models.JSONField(default=list, verbose_name="Character IDs"),
+                ),
+                ("created_at", models.DateTimeField(verbose_name="Tracked since")),
+                ("updated_at", models.DateTimeField(verbose_name="Updated at")),
+            ],
+            options={
+                "verbose_name": "Corporation membership",
+                "verbose_name_plural": "Corporation memberships",
+                "default_permissions": (),
+            },
+        ),
+        migrations.CreateModel(
+            name="CorporationMembershipChange",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "corporation_id",
+                    models.PositiveIntegerField(verbose_name="Corporation ID"),
+                ),
+                (
+                    "joined",
+                    models.JSONField(default=list, verbose_name="Joined character IDs"),
+                ),
+                (
+                    "left",
+                    models.JSONField(default=list, verbose_name="Left character IDs"),
+                ),
+                ("created_at", models.DateTimeField(verbose_name="Created at")),
+            ],
+            options={
+                "verbose_name": "Corporation membership change",
+                "verbose_name_plural": "Corporation membership changes",
+                "default_permissions": (),
+                "indexes": [
+                    models.Index(
+                        fields=["corporation_id", "created_at"],
+                        name="tnnt_discor_corpora_11daa4_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:40
+
+# Django
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tnnt_discordbot_cogs", "0014_corporation_membership"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="setting",
+            name="price_cache_ttl",
+            field=models.PositiveIntegerField(
+                default=30,
+                help_text="Minutes market prices are considered current. Older prices are still shown right away, while they are refreshed in the background. Fuzzwork updates its prices about every 30 minutes.",
+                verbose_name="Price Cache TTL",
+            ),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:50
+
+# Django
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tnnt_discordbot_cogs", "0015_setting_price_cache_ttl"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="setting",
+            name="price_history_items",
+            field=models.TextField(
+                blank=True,
+                default="Tritanium, Pyerite, Mexallon, Isogen, Nocxium, Zydrine, Megacyte, Morphite",
+                help_text="Comma-separated list of item names whose prices are stored daily for `/price trend`.",
+                verbose_name="Price History Items",
+            ),
+        ),
+        migrations.AddField(
+            model_name="setting",
+            name="price_history_markets",
+            field=models.CharField(
+                default="Jita",
+                help_text="Comma-separated list of market hubs the price history is stored for. Possible values: Jita, Amarr, Rens, Hek, Dodixie",
+                max_length=255,
+                verbose_name="Price History Markets",
+            ),
+        ),
+        migrations.CreateModel(
+            name="PriceSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "eve_type_id",
+                    models.PositiveIntegerField(verbose_name="EVE type ID"),
+                ),
+                ("market_id", models.PositiveIntegerField(verbose_name="Market ID")),
+                ("date", models.DateField(verbose_name="Date")),
+                (
+                    "sell",
+                    models.FloatField(default=None, null=True, verbose_name="Sell"),
+                ),
+                ("buy", models.FloatField(default=None, null=True, verbose_name="Buy")),
+            ],
+            options={
+                "verbose_name": "Price snapshot",
+                "verbose_name_plural": "Price snapshots",
+                "default_permissions": (),
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("eve_type_id", "market_id", "date"),
+                        name="unique_price_snapshot",
+                    )
+                ],
+            },
+        ),
+    ]
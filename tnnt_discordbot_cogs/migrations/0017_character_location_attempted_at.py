@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:58
+
+# Django
+from django.db import migrations, models
+from django.db.models import F
+
+
+def set_attempted_at(apps, schema_editor):
+    """
+    Existing snapshots were attempted when they were taken.
+
+    :param apps:
+    :type apps:
+    :param schema_editor:
+    :type schema_editor:
+    :return:
+    :rtype:
+    """
+
+    CharacterLocation = apps.get_model("tnnt_discordbot_cogs", "CharacterLocation")
+    CharacterLocation.objects.update(attempted_at=F("updated_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tnnt_discordbot_cogs", "0016_price_snapshot"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="characterlocation",
+            name="attempted_at",
+            field=models.DateTimeField(
+                db_index=True, default=None, null=True, verbose_name="Attempted at"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="characterlocation",
+            name="solar_system_id",
+            field=models.PositiveIntegerField(
+                db_index=True, default=None, null=True, verbose_name="Solar system ID"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="characterlocation",
+            name="updated_at",
+            field=models.DateTimeField(
+                db_index=True, default=None, null=True, verbose_name="Updated at"
+            ),
+        ),
+        migrations.RunPython(set_attempted_at, migrations.RunPython.noop),
+    ]
@@ -5,4 +5,11 @@ Initialization file for the models package.
 # flake8: noqa
 
 # Terra Nanotech Discordbot Cogs
-from tnnt_discordbot_cogs.models import permission, setting
+from tnnt_discordbot_cogs.models import (
+    directory,
+    location,
+    lookup,
+    permission,
+    price,
+    setting,
+)
@@ -0,0 +1,364 @@
+"""
+Character directory model for the TNNT Discord bot.
+"""
+
+# Standard Library
+from collections.abc import Iterable
+
+# Django
+from django.apps import apps
+from django.db import models
+from django.db.models import Exists, OuterRef, Value
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+# Alliance Auth
+from allianceauth.authentication.models import CharacterOwnership
+from allianceauth.eveonline.models import EveCharacter
+from esi.models import Token
+
+# Terra Nanotech Discordbot Cogs
+from tnnt_discordbot_cogs.models.location import LOCATION_SCOPES
+
+# Characters are rebuilt in chunks of this size
+CHARACTER_DIRECTORY_CHUNK_SIZE = 1000
+
+
+class CharacterDirectoryQuerySet(models.QuerySet):
+    """
+    Queries on the character directory.
+    """
+
+    def linked(self) -> "CharacterDirectoryQuerySet":
+        """
+        Characters that are linked to an Auth user.
+
+        :return:
+        :rtype:
+        """
+
+        return self.filter(user_id__isnull=False)
+
+    def unlinked(self) -> "CharacterDirectoryQuerySet":
+        """
+        Characters that are known to Auth, but not linked to an Auth user.
+
+        :return:
+        :rtype:
+        """
+
+        return self.filter(user_id__isnull=True)
+
+    def of_user(self, user_id: int) -> "CharacterDirectoryQuerySet":
+        """
+        All characters of an Auth user.
+
+        :param user_id: The ID of the Auth user.
+        :type user_id: int
+        :return:
+        :rtype:
+        """
+
+        return self.filter(user_id=user_id)
+
+    def without_audit(self) -> "CharacterDirectoryQuerySet":
+        """
+        Characters that are not added to the character audit.
+
+        :return:
+        :rtype:
+        """
+
+        return self.filter(has_audit=False)
+
+    def with_location_token(self) -> "CharacterDirectoryQuerySet":
+        """
+        Characters with a token that has all location scopes.
+
+        :return:
+        :rtype:
+        """
+
+        return self.filter(has_location_token=True)
+
+
+class CharacterDirectoryEntry(models.Model):
+    """
+    A denormalized entry per known character, with its owner, main and Discord account.
+
+    The directory answers the questions the cogs ask again and again
+    (who owns this character, what are the alts, are they in the audit)
+    from one indexed table instead of walking
+    `EveCharacter → character_ownership → user → profile/discord`.
+    It is kept in sync by signals (see `tnnt_discordbot_cogs.signals`)
+    and rebuilt periodically by `tnnt_discordbot_cogs.tasks.rebuild_character_directory`.
+    """
+
+    character_id = models.PositiveIntegerField(
+        primary_key=True, verbose_name=_("Character ID")
+    )
+
+    character_name = models.CharField(
+        max_length=254, db_index=True, verbose_name=_("Character name")
+    )
+
+    corporation_id = models.PositiveIntegerField(
+        db_index=True, verbose_name=_("Corporation ID")
+    )
+
+    corporation_name = models.CharField(
+        max_length=254, db_index=True, verbose_name=_("Corporation name")
+    )
+
+    corporation_ticker = models.CharField(
+        max_length=5, verbose_name=_("Corporation ticker")
+    )
+
+    alliance_id = models.PositiveIntegerField(
+        null=True, default=None, db_index=True, verbose_name=_("Alliance ID")
+    )
+
+    alliance_name = models.CharField(
+        max_length=254,
+        null=True,
+        default=None,
+        db_index=True,
+        verbose_name=_("Alliance name"),
+    )
+
+    user_id = models.PositiveIntegerField(
+        null=True, default=None, db_index=True, verbose_name=_("User ID")
+    )
+
+    state_name = models.CharField(
+        max_length=32,
+        null=True,
+        default=None,
+        db_index=True,
+        verbose_name=_("State name"),
+    )
+
+    main_character_id = models.PositiveIntegerField(
+        null=True, default=None, db_index=True, verbose_name=_("Main character ID")
+    )
+
+    main_character_name = models.CharField(
+        max_length=254, null=True, default=None, verbose_name=_("Main character name")
+    )
+
+    main_corporation_ticker = models.CharField(
+        max_length=5,
+        null=True,
+        default=None,
+        verbose_name=_("Main corporation ticker"),
+    )
+
+    discord_uid = models.PositiveBigIntegerField(
+        null=True, default=None, db_index=True, verbose_name=_("Discord user ID")
+    )
+
+    has_audit = models.BooleanField(default=False, verbose_name=_("In audit"))
+
+    has_location_token = models.BooleanField(
+        default=False, verbose_name=_("Has location token")
+    )
+
+    updated_at = models.DateTimeField(verbose_name=_("Updated at"))
+
+    objects = CharacterDirectoryQuerySet.as_manager()
+
+    class Meta:
+        """
+        Meta options for the CharacterDirectoryEntry model.
+        """
+
+        default_permissions = ()
+        verbose_name = _("Character directory entry")
+        verbose_name_plural = _("Character directory entries")
+
+    def __str__(self):
+        """
+        String representation of the CharacterDirectoryEntry model.
+
+        :return:
+        :rtype:
+        """
+
+        return self.character_name
+
+    @classmethod
+    def refresh(cls, characters: models.QuerySet) -> int:
+        """
+        Rebuild the entries of the given characters in one query and one upsert.
+
+        :param characters: The characters to rebuild the entries for.
+        :type characters: QuerySet[EveCharacter]
+        :return: The number of rebuilt entries.
+        :rtype: int
+        """
+
+        if apps.is_installed("corptools"):
+            has_audit = Exists(
+                apps.get_model("corptools", "CharacterAudit").objects.filter(
+                    character=OuterRef("pk")
+                )
+            )
+        else:
+            has_audit = Value(False)
+
+        profile_field = "character_ownership__user__profile__{}"
+        now = timezone.now()
+        rows = characters.annotate(
+            has_audit=has_audit,
+            has_location_token=Exists(
+                Token.objects.filter(character_id=OuterRef("character_id"))
+                .require_scopes(LOCATION_SCOPES)
+                .values("pk")
+            ),
+        ).values_list(
+            "character_id",
+            "character_name",
+            "corporation_id",
+            "corporation_name",
+            "corporation_ticker",
+            "alliance_id",
+            "alliance_name",
+            "character_ownership__user_id",
+            profile_field.format("state__name"),
+            profile_field.format("main_character__character_id"),
+            profile_field.format("main_character__character_name"),
+            profile_field.format("main_character__corporation_ticker"),
+            "character_ownership__user__discord__uid",
+            "has_audit",
+            "has_location_token",
+        )
+
+        entries = [
+            cls(
+                character_id=row[0],
+                character_name=row[1],
+                corporation_id=row[2],
+                corporation_name=row[3],
+                corporation_ticker=row[4],
+                alliance_id=row[5],
+                alliance_name=row[6],
+                user_id=row[7],
+                state_name=row[8],
+                main_character_id=row[9],
+                main_character_name=row[10],
+                main_corporation_ticker=row[11],
+                discord_uid=row[12],
+                has_audit=row[13],
+                has_location_token=row[14],
+                updated_at=now,
+            )
+            for row in rows
+        ]
+
+        if entries:
+            cls.objects.bulk_create(
+                objs=entries,
+                update_conflicts=True,
+                unique_fields=["character_id"],
+                update_fields=[
+                    field.name
+                    for field in cls._meta.concrete_fields
+                    if not field.primary_key
+                ],
+            )
+
+        return len(entries)
+
+    @classmethod
+    def refresh_users(cls, user_ids: Iterable[int]) -> int:
+        """
+        Rebuild the entries of all characters of the given Auth users.
+
+        :param user_ids: The IDs of the Auth users.
+        :type user_ids: Iterable[int]
+        :return: The number of rebuilt entries.
+        :rtype: int
+        """
+
+        return cls.refresh(
+            characters=EveCharacter.objects.filter(
+                character_ownership__user_id__in=list(user_ids)
+            )
+        )
+
+    @classmethod
+    def ensure_user(cls, user_id: int) -> None:
+        """
+        Rebuild the entries of an Auth user when they don't match the characters the user owns.
+
+        The directory is only complete after the first rebuild, and bulk
+        updates bypass the signals. Checks that must not pass on missing
+        rows call this first.
+
+        :param user_id: The ID of the Auth user.
+        :type user_id: int
+        :return:
+        :rtype:
+        """
+
+        if (
+            cls.objects.of_user(user_id=user_id).count()
+            != CharacterOwnership.objects.filter(user_id=user_id).count()
+        ):
+            cls.refresh_users(user_ids=[user_id])
+
+    @classmethod
+    def get_by_name(cls, character_name: str) -> "CharacterDirectoryEntry | None":
+        """
+        Get the entry of a character by name.
+
+        Missing or unlinked entries are rebuilt from Auth first, in case
+        the directory hasn't caught up with the character yet.
+
+        :param character_name: The character name.
+        :type character_name: str
+        :return: The entry, None if Auth doesn't know the character
+        :rtype: CharacterDirectoryEntry | None
+        """
+
+        entry = cls.objects.filter(character_name=character_name).first()
+
+        if entry is None or entry.user_id is None:
+            cls.refresh(
+                characters=EveCharacter.objects.filter(character_name=character_name)
+            )
+
+            entry = cls.objects.filter(character_name=character_name).first()
+
+        return entry
+
+    @classmethod
+    def rebuild(cls) -> int:
+        """
+        Rebuild the whole directory in chunks and remove entries of characters that no longer exist.
+
+        :return: The number of rebuilt entries.
+        :rtype: int
+        """
+
+        rebuilt = 0
+        last_pk = 0
+
+        while True:
+            pks = list(
+                EveCharacter.objects.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:CHARACTER_DIRECTORY_CHUNK_SIZE]
+            )
+
+            if not pks:
+                break
+
+            rebuilt += cls.refresh(characters=EveCharacter.objects.filter(pk__in=pks))
+            last_pk = pks[-1]
+
+        cls.objects.exclude(
+            character_id__in=EveCharacter.objects.values("character_id")
+        ).delete()
+
+        return rebuilt
@@ -0,0 +1,225 @@
+"""
+Location models for the TNNT Discord bot.
+"""
+
+# Standard Library
+from collections.abc import Iterable
+from datetime import datetime
+
+# Django
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+# Alliance Auth
+from allianceauth.eveonline.models import EveCharacter
+
+# ESI scopes needed to locate a character
+LOCATION_SCOPES = [
+    "esi-location.read_location.v1",
+    "esi-location.read_online.v1",
+    "esi-location.read_ship_type.v1",
+]
+
+
+class CharacterLocation(models.Model):
+    """
+    The latest known location of a character.
+
+    One row per character, updated in place whenever a new location snapshot
+    arrives. The index on `solar_system_id` makes this table the reverse
+    index "solar system → characters" used by `/locate system`.
+
+    Failed refreshes only update `attempted_at`, so characters that can't
+    be located move to the back of the refresh queue. Characters that were
+    never located have a row without location.
+    """
+
+    character = models.OneToOneField(
+        to=EveCharacter,
+        primary_key=True,
+        related_name="+",
+        on_delete=models.CASCADE,
+        verbose_name=_("Character"),
+    )
+
+    solar_system_id = models.PositiveIntegerField(
+        null=True, default=None, db_index=True, verbose_name=_("Solar system ID")
+    )
+
+    ship_type_id = models.PositiveIntegerField(
+        null=True, default=None, verbose_name=_("Ship type ID")
+    )
+
+    online = models.BooleanField(default=False, verbose_name=_("Online"))
+
+    updated_at = models.DateTimeField(
+        null=True, default=None, db_index=True, verbose_name=_("Updated at")
+    )
+
+    attempted_at = models.DateTimeField(
+        null=True, default=None, db_index=True, verbose_name=_("Attempted at")
+    )
+
+    class Meta:
+        """
+        Meta options for the CharacterLocation model.
+        """
+
+        default_permissions = ()
+        verbose_name = _("Character location")
+        verbose_name_plural = _("Character locations")
+
+    def __str__(self):
+        """
+        String representation of the CharacterLocation model.
+
+        :return:
+        :rtype:
+        """
+
+        return f"{self.character_id} @ {self.solar_system_id}"
+
+    @classmethod
+    def update_snapshots(cls, snapshots: Iterable["CharacterLocation"]) -> None:
+        """
+        Insert or update the given location snapshots in one query.
+
+        Only the rows of the given characters are touched, so the reverse
+        index is updated incrementally.
+
+        :param snapshots: The location snapshots to store.
+        :type snapshots: Iterable[CharacterLocation]
+        :return: None
+        :rtype: None
+        """
+
+        snapshots = list(snapshots)
+
+        if not snapshots:
+            return
+
+        for snapshot in snapshots:
+            snapshot.attempted_at = snapshot.updated_at
+
+        cls.objects.bulk_create(
+            objs=snapshots,
+            update_conflicts=True,
+            unique_fields=["character"],
+            update_fields=[
+                "solar_system_id",
+                "ship_type_id",
+                "online",
+                "updated_at",
+                "attempted_at",
+            ],
+        )
+
+    @classmethod
+    def update_attempts(
+        cls, character_ids: Iterable[int], attempted_at: datetime
+    ) -> None:
+        """
+        Record failed refreshes in one query, keeping the last known locations.
+
+        :param character_ids: The primary keys of the characters that couldn't be located.
+        :type character_ids: Iterable[int]
+        :param attempted_at: When the refresh was attempted.
+        :type attempted_at: datetime
+        :return: None
+        :rtype: None
+        """
+
+        attempts = [
+            cls(character_id=character_id, attempted_at=attempted_at)
+            for character_id in character_ids
+        ]
+
+        if not attempts:
+            return
+
+        cls.objects.bulk_create(
+            objs=attempts,
+            update_conflicts=True,
+            unique_fields=["character"],
+            update_fields=["attempted_at"],
+        )
+
+
+class StructureInfo(models.Model):
+    """
+    Cached information about player-owned structures characters can dock in.
+
+    Structures the bot has no access to are cached as well (negative caching),
+    so they are not looked up again on every `/locate`.
+    """
+
+    structure_id = models.BigIntegerField(
+        primary_key=True, verbose_name=_("Structure ID")
+    )
+
+    name = models.CharField(max_length=255, default="", verbose_name=_("Name"))
+
+    solar_system_id = models.PositiveIntegerField(
+        null=True, default=None, verbose_name=_("Solar system ID")
+    )
+
+    is_accessible = models.BooleanField(default=True, verbose_name=_("Accessible"))
+
+    updated_at = models.DateTimeField(verbose_name=_("Updated at"))
+
+    class Meta:
+        """
+        Meta options for the StructureInfo model.
+        """
+
+        default_permissions = ()
+        verbose_name = _("Structure information")
+        verbose_name_plural = _("Structure information")
+
+    def __str__(self):
+        """
+        String representation of the StructureInfo model.
+
+        :return:
+        :rtype:
+        """
+
+        return self.name or str(self.structure_id)
+
+
+class LocationDashboardMessage(models.Model):
+    """
+    The pinned location dashboard message of a channel.
+
+    The hash of the rendered content is kept, so the message is only edited
+    when its content actually changed.
+    """
+
+    channel_id = models.PositiveBigIntegerField(
+        primary_key=True, verbose_name=_("Channel ID")
+    )
+
+    message_id = models.PositiveBigIntegerField(verbose_name=_("Message ID"))
+
+    content_hash = models.CharField(max_length=64, verbose_name=_("Content hash"))
+
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_("Updated at"))
+
+    class Meta:
+        """
+        Meta options for the LocationDashboardMessage model.
+        """
+
+        default_permissions = ()
+        verbose_name = _("Location dashboard message")
+        verbose_name_plural = _("Location dashboard messages")
+
+    def __str__(self):
+        """
+        String representation of the LocationDashboardMessage model.
+
+        :return:
+        :rtype:
+        """
+
+        return f"{self.channel_id}/{self.message_id}"
@@ -0,0 +1,424 @@
+"""
+Lookup models for the TNNT Discord bot.
+"""
+
+# Standard Library
+from collections.abc import Iterable
+from datetime import datetime
+from itertools import groupby
+
+# Django
+from django.contrib.auth.models import User
+from django.db import models
+from django.db.models import Exists, OuterRef, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+# Alliance Auth
+from allianceauth.authentication.models import CharacterOwnership
+
+# Terra Nanotech Discordbot Cogs
+from tnnt_discordbot_cogs.models.directory import CharacterDirectoryEntry
+
+# zKillboard statistics summed up per user, as stored by `aastatistics` per character
+USER_STATISTICS_FIELDS = (
+    "zk_12m",
+    "zk_3m",
+    "ships_destroyed",
+    "ships_lost",
+    "isk_destroyed",
+    "isk_lost",
+)
+
+# Users are rebuilt in chunks of this size
+USER_STATISTICS_CHUNK_SIZE = 500
+
+# Corporation membership snapshots are written in batches of this size
+CORPORATION_MEMBERSHIP_BATCH_SIZE = 500
+
+
+class CorporationInfo(models.Model):
+    """
+    Cached public information about corporations shown by `/lookup corporation`.
+
+    Entries are served even when they are outdated and refreshed in the
+    background, so a lookup does not have to wait for ESI.
+    """
+
+    corporation_id = models.PositiveIntegerField(
+        primary_key=True, verbose_name=_("Corporation ID")
+    )
+
+    ticker = models.CharField(max_length=5, verbose_name=_("Ticker"))
+
+    member_count = models.PositiveIntegerField(
+        default=0, verbose_name=_("Member count")
+    )
+
+    updated_at = models.DateTimeField(db_index=True, verbose_name=_("Updated at"))
+
+    class Meta:
+        """
+        Meta options for the CorporationInfo model.
+        """
+
+        default_permissions = ()
+        verbose_name = _("Corporation information")
+        verbose_name_plural = _("Corporation information")
+
+    def __str__(self):
+        """
+        String representation of the CorporationInfo model.
+
+        :return:
+        :rtype:
+        """
+
+        return f"[{self.ticker}] ({self.corporation_id})"
+
+
+class UserStatistics(models.Model):
+    """
+    The zKillboard statistics of all characters of an Auth user, summed up.
+
+    Refreshed per user when the statistics of one of their characters change
+    and rebuilt periodically by `tnnt_discordbot_cogs.tasks.rebuild_user_statistics`,
+    so a lookup reads one row and users can be ranked by activity.
+    Only used when `aastatistics` is installed.
+    """
+
+    user = models.OneToOneField(
+        User,
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name=_("User"),
+    )
+
+    zk_12m = models.PositiveIntegerField(
+        default=0, db_index=True, verbose_name=_("Kills last 12 months")
+    )
+
+    zk_3m = models.PositiveIntegerField(
+        default=0, db_index=True, verbose_name=_("Kills last 3 months")
+    )
+
+    ships_destroyed = models.PositiveIntegerField(
+        default=0, verbose_name=_("Ships destroyed")
+    )
+
+    ships_lost = models.PositiveIntegerField(default=0, verbose_name=_("Ships lost"))
+
+    isk_destroyed = models.PositiveBigIntegerField(
+        default=0, verbose_name=_("ISK destroyed")
+    )
+
+    isk_lost = models.PositiveBigIntegerField(default=0, verbose_name=_("ISK lost"))
+
+    updated_at = models.DateTimeField(verbose_name=_("Updated at"))
+
+    class Meta:
+        """
+        Meta options for the UserStatistics model.
+        """
+
+        default_permissions = ()
+        verbose_name = _("User statistics")
+        verbose_name_plural = _("User statistics")
+
+    def __str__(self):
+        """
+        String representation of the UserStatistics model.
+
+        :return:
+        :rtype:
+        """
+
+        return f"User statistics ({self.user_id})"
+
+    @classmethod
+    def refresh(cls, user_ids: Iterable[int]) -> int:
+        """
+        Sum up the statistics of the given Auth users in one grouped query and one upsert.
+
+        Rows of users without characters are removed.
+
+        :param user_ids: The IDs of the Auth users.
+        :type user_ids: Iterable[int]
+        :return: The number of refreshed users.
+        :rtype: int
+        """
+
+        user_ids = [user_id for user_id in set(user_ids) if user_id is not None]
+
+        if not user_ids:
+            return 0
+
+        now = timezone.now()
+        rows = (
+            CharacterOwnership.objects.filter(user_id__in=user_ids)
+            .values("user_id")
+            .annotate(
+                **{
+                    key: Coalesce(Sum(f"character__character_stats__{key}"), 0)
+                    for key in USER_STATISTICS_FIELDS
+                }
+            )
+            .order_by()
+        )
+
+        entries = [
+            cls(
+                user_id=row["user_id"],
+                updated_at=now,
+                **{key: row[key] for key in USER_STATISTICS_FIELDS},
+            )
+            for row in rows
+        ]
+
+        if entries:
+            cls.objects.bulk_create(
+                objs=entries,
+                update_conflicts=True,
+                unique_fields=["user"],
+                update_fields=[*USER_STATISTICS_FIELDS, "updated_at"],
+            )
+
+        cls.objects.filter(user_id__in=user_ids).exclude(
+            user_id__in=[entry.user_id for entry in entries]
+        ).delete()
+
+        return len(entries)
+
+    @classmethod
+    def rebuild(cls) -> int:
+        """
+        Refresh the statistics of all Auth users with characters in chunks.
+
+        :return: The number of refreshed users.
+        :rtype: int
+        """
+
+        refreshed = 0
+        last_pk = 0
+
+        while True:
+            user_ids = list(
+                User.objects.filter(pk__gt=last_pk, character_ownerships__isnull=False)
+                .distinct()
+                .order_by("pk")
+                .values_list("pk", flat=True)[:USER_STATISTICS_CHUNK_SIZE]
+            )
+
+            if not user_ids:
+                break
+
+            refreshed += cls.refresh(user_ids=user_ids)
+            last_pk = user_ids[-1]
+
+        cls.objects.exclude(
+            Exists(CharacterOwnership.objects.filter(user_id=OuterRef("user_id")))
+        ).delete()
+
+        return refreshed
+
+
+class CorporationMembership(models.Model):
+    """
+    The character IDs known in a corporation at the last snapshot, as a sorted list.
+
+    Only the latest member list is kept per corporation, each snapshot
+    that changes it adds a `CorporationMembershipChange` with the
+    difference, so the storage grows with the changes, not the snapshots.
+    """
+
+    corporation_id = models.PositiveIntegerField(
+        primary_key=True, verbose_name=_("Corporation ID")
+    )
+
+    corporation_name = models.CharField(
+        max_length=254, db_index=True, verbose_name=_("Corporation name")
+    )
+
+    character_ids = models.JSONField(default=list, verbose_name=_("Character IDs"))
+
+    created_at = models.DateTimeField(verbose_name=_("Tracked since"))
+
+    updated_at = models.DateTimeField(verbose_name=_("Updated at"))
+
+    class Meta:
+        """
+        Meta options for the CorporationMembership model.
+        """
+
+        default_permissions = ()
+        verbose_name = _("Corporation membership")
+        verbose_name_plural = _("Corporation memberships")
+
+    def __str__(self):
+        """
+        String representation of the CorporationMembership model.
+
+        :return:
+        :rtype:
+        """
+
+        return f"{self.corporation_name} ({self.corporation_id})"
+
+    @classmethod
+    def take_snapshots(cls) -> int:
+        """
+        Compare the known members of all corporations with the last snapshot and store the changes.
+
+        The current members are read from the character directory in one
+        query, new member lists and changes are written in bulk.
+
+        :return: The number of corporations that changed.
+        :rtype: int
+        """
+
+        now = timezone.now()
+        current = {}
+        names = {}
+
+        rows = (
+            CharacterDirectoryEntry.objects.order_by("corporation_id", "character_id")
+            .values_list("corporation_id", "corporation_name", "character_id")
+            .iterator(chunk_size=CORPORATION_MEMBERSHIP_BATCH_SIZE * 10)
+        )
+
+        for corporation_id, members in groupby(rows, key=lambda row: row[0]):
+            members = list(members)
+            names[corporation_id] = members[0][1]
+            current[corporation_id] = [row[2] for row in members]
+
+        snapshots = cls.objects.in_bulk()
+        memberships = []
+        changes = []
+
+        for corporation_id in current.keys() | snapshots.keys():
+            character_ids = current.get(corporation_id, [])
+            snapshot = snapshots.get(corporation_id)
+
+            if snapshot is None:
+                # First snapshot of the corporation, nothing to compare with
+                memberships.append(
+                    cls(
+                        corporation_id=corporation_id,
+                        corporation_name=names[corporation_id],
+                        character_ids=character_ids,
+                        created_at=now,
+                        updated_at=now,
+                    )
+                )
+
+                continue
+
+            if snapshot.character_ids == character_ids:
+                continue
+
+            previous_ids = set(snapshot.character_ids)
+            current_ids = set(character_ids)
+
+            changes.append(
+                CorporationMembershipChange(
+                    corporation_id=corporation_id,
+                    joined=sorted(current_ids - previous_ids),
+                    left=sorted(previous_ids - current_ids),
+                    created_at=now,
+                )
+            )
+
+            snapshot.corporation_name = names.get(
+                corporation_id, snapshot.corporation_name
+            )
+            snapshot.character_ids = character_ids
+            snapshot.updated_at = now
+            memberships.append(snapshot)
+
+        cls.objects.bulk_create(
+            objs=memberships,
+            batch_size=CORPORATION_MEMBERSHIP_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=["corporation_id"],
+            update_fields=["corporation_name", "character_ids", "updated_at"],
+        )
+        CorporationMembershipChange.objects.bulk_create(
+            objs=changes, batch_size=CORPORATION_MEMBERSHIP_BATCH_SIZE
+        )
+
+        return len(changes)
+
+
+class CorporationMembershipChange(models.Model):
+    """
+    The characters that joined or left a corporation between two snapshots.
+    """
+
+    corporation_id = models.PositiveIntegerField(verbose_name=_("Corporation ID"))
+
+    joined = models.JSONField(default=list, verbose_name=_("Joined character IDs"))
+
+    left = models.JSONField(default=list, verbose_name=_("Left character IDs"))
+
+    created_at = models.DateTimeField(verbose_name=_("Created at"))
+
+    class Meta:
+        """
+        Meta options for the CorporationMembershipChange model.
+        """
+
+        default_permissions = ()
+        indexes = [models.Index(fields=["corporation_id", "created_at"])]
+        verbose_name = _("Corporation membership change")
+        verbose_name_plural = _("Corporation membership changes")
+
+    def __str__(self):
+        """
+        String representation of the CorporationMembershipChange model.
+
+        :return:
+        :rtype:
+        """
+
+        return (
+            f"{self.corporation_id}: +{len(self.joined)} -{len(self.left)} "
+            f"({self.created_at})"
+        )
+
+    @classmethod
+    def get_changes_since(cls, corporation_id: int, since: datetime) -> tuple:
+        """
+        Sum up the changes of a corporation since a point in time.
+
+        Characters that left and came back (or the other way around)
+        in that time cancel out.
+
+        :param corporation_id: The corporation ID.
+        :type corporation_id: int
+        :param since: The point in time.
+        :type since: datetime
+        :return: The sorted IDs of the characters that joined and that left.
+        :rtype: tuple[list[int], list[int]]
+        """
+
+        joined = set()
+        left = set()
+
+        for change in cls.objects.filter(
+            corporation_id=corporation_id, created_at__gte=since
+        ).order_by("created_at"):
+            for character_id in change.joined:
+                if character_id in left:
+                    left.remove(character_id)
+                else:
+                    joined.add(character_id)
+
+            for character_id in change.left:
+                if character_id in joined:
+                    joined.remove(character_id)
+                else:
+                    left.add(character_id)
+
+        return sorted(joined), sorted(left)
@@ -21,6 +21,10 @@ class Permission(models.Model):
         default_permissions = ()
         permissions = (
             ("locate", _("Can run the `/locate` command")),
+            (
+                "locate_coverage",
+                _("Can run the `/locate coverage` command"),
+            ),
             ("lookup", _("Can run the `/lookup` command")),
         )
         verbose_name = _("Command Permission")
@@ -0,0 +1,189 @@
+"""
+Price history models for the TNNT Discord bot.
+"""
+
+# Standard Library
+from bisect import bisect_left
+from collections.abc import Iterable
+from datetime import date, timedelta
+
+# Django
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+# Days of price history that are kept
+PRICE_SNAPSHOT_RETENTION_DAYS = 365
+
+# Periods `/price trend` reports on, in days
+PRICE_TREND_PERIODS = (7, 30, 90)
+
+
+class PriceSnapshot(models.Model):
+    """
+    The lowest sell and highest buy price of an item type in a market hub on one day.
+
+    Snapshots taken on the same day overwrite each other, so there is
+    one row per type, hub and day.
+    """
+
+    eve_type_id = models.PositiveIntegerField(verbose_name=_("EVE type ID"))
+
+    market_id = models.PositiveIntegerField(verbose_name=_("Market ID"))
+
+    date = models.DateField(verbose_name=_("Date"))
+
+    sell = models.FloatField(null=True, default=None, verbose_name=_("Sell"))
+
+    buy = models.FloatField(null=True, default=None, verbose_name=_("Buy"))
+
+    class Meta:
+        """
+        Meta options for the PriceSnapshot model.
+        """
+
+        default_permissions = ()
+        constraints = [
+            models.UniqueConstraint(
+                fields=["eve_type_id", "market_id", "date"],
+                name="unique_price_snapshot",
+            )
+        ]
+        verbose_name = _("Price snapshot")
+        verbose_name_plural = _("Price snapshots")
+
+    def __str__(self):
+        """
+        String representation of the PriceSnapshot model.
+
+        :return:
+        :rtype:
+        """
+
+        return f"{self.eve_type_id} @ {self.market_id} ({self.date})"
+
+    @classmethod
+    def store(cls, market_id: int, market_data: dict) -> int:
+        """
+        Store today's prices from Fuzzwork market data in one upsert.
+
+        :param market_id: The ID of the market hub.
+        :type market_id: int
+        :param market_data: The Fuzzwork market data by type ID.
+        :type market_data: dict
+        :return: The number of stored snapshots.
+        :rtype: int
+        """
+
+        today = timezone.now().date()
+        snapshots = [
+            cls(
+                eve_type_id=int(eve_type_id),
+                market_id=market_id,
+                date=today,
+                sell=(
+                    float(data["sell"]["min"])
+                    if int(data["sell"]["orderCount"])
+                    else None
+                ),
+                buy=(
+                    float(data["buy"]["max"])
+                    if int(data["buy"]["orderCount"])
+                    else None
+                ),
+            )
+            for eve_type_id, data in market_data.items()
+        ]
+
+        if snapshots:
+            cls.objects.bulk_create(
+                objs=snapshots,
+                update_conflicts=True,
+                unique_fields=["eve_type_id", "market_id", "date"],
+                update_fields=["sell", "buy"],
+            )
+
+        return len(snapshots)
+
+    @classmethod
+    def prune(cls) -> int:
+        """
+        Remove snapshots older than the retention period.
+
+        :return: The number of removed snapshots.
+        :rtype: int
+        """
+
+        return cls.objects.filter(
+            date__lt=timezone.now().date()
+            - timedelta(days=PRICE_SNAPSHOT_RETENTION_DAYS)
+        ).delete()[0]
+
+    @classmethod
+    def get_trend(
+        cls,
+        eve_type_id: int,
+        market_id: int,
+        periods: Iterable[int] = PRICE_TREND_PERIODS,
+    ) -> dict[int, dict[str, dict]]:
+        """
+        Get the change and the range of the sell and buy price over periods up to today.
+
+        The series of the longest period is read with one query, the shorter
+        periods are slices of it.
+
+        :param eve_type_id: The EVE type ID.
+        :type eve_type_id: int
+        :param market_id: The ID of the market hub.
+        :type market_id: int
+        :param periods: The periods in days.
+        :type periods: Iterable[int]
+        :return: The first, last, lowest and highest price and the change in percent,
+                 by price ("sell" and "buy") by period, empty if there is no history
+        :rtype: dict[int, dict[str, dict]]
+        """
+
+        periods = sorted(periods)
+        today = timezone.now().date()
+        rows = list(
+            cls.objects.filter(
+                eve_type_id=eve_type_id,
+                market_id=market_id,
+                date__gt=today - timedelta(days=periods[-1]),
+            )
+            .order_by("date")
+            .values_list("date", "sell", "buy")
+        )
+
+        if not rows:
+            return {}
+
+        dates: list[date] = [row[0] for row in rows]
+        series = {"sell": [row[1] for row in rows], "buy": [row[2] for row in rows]}
+        trend = {}
+
+        for days in periods:
+            start = bisect_left(dates, today - timedelta(days=days - 1))
+            trend[days] = {}
+
+            for price, values in series.items():
+                values = [value for value in values[start:] if value is not None]
+
+                if not values:
+                    trend[days][price] = None
+
+                    continue
+
+                trend[days][price] = {
+                    "first": values[0],
+                    "last": values[-1],
+                    "min": min(values),
+                    "max": max(values),
+                    "change": (
+                        (values[-1] - values[0]) / values[0] * 100
+                        if values[0]
+                        else None
+                    ),
+                }
+
+        return trend
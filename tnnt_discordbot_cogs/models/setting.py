@@ -45,9 +45,15 @@ class Setting(SingletonModel):
         WELCOME_ROLES_EXCLUDED = "welcome_roles_excluded", _("Roles Excluded")
         LOOKUP_CHANNELS = "lookup_channels", _("Lookup Channels")
         LOCATE_CHANNELS = "locate_channels", _("Locate Channels")
+        LOCATION_DASHBOARD_CHANNELS = "location_dashboard_channels", _(
+            "Location Dashboard Channels"
+        )
         ADMIN_GOD_GROUP = "admin_god_group", _("Admin God Group")
         ADMIN_GODS = "admin_gods", _("Admin Gods")
         HONEYPOT_CHANNELS = "honeypot_channels", _("Honeypot Channels")
+        PRICE_CACHE_TTL = "price_cache_ttl", _("Price Cache TTL")
+        PRICE_HISTORY_ITEMS = "price_history_items", _("Price History Items")
+        PRICE_HISTORY_MARKETS = "price_history_markets", _("Price History Markets")
 
     # Recruitment Cog Settings
     applicant_role_name = models.CharField(
@@ -135,6 +141,17 @@ class Setting(SingletonModel):
         help_text=_("Channels in which the `/locate` command can be used."),
     )
 
+    location_dashboard_channels = models.ManyToManyField(
+        to=Channels,
+        related_name="location_dashboard_channels",
+        blank=True,
+        verbose_name=Field.LOCATION_DASHBOARD_CHANNELS.label,  # pylint: disable=no-member
+        help_text=_(
+            "Channels in which a pinned dashboard with the online characters per "
+            "solar system and ship class is kept up to date."
+        ),
+    )
+
     admin_god_group = models.OneToOneField(
         to=Group,
         related_name="admin_god_group",
@@ -170,6 +187,37 @@ class Setting(SingletonModel):
         ),
     )
 
+    # Price Check Cog Settings
+    price_cache_ttl = models.PositiveIntegerField(
+        default=30,
+        verbose_name=Field.PRICE_CACHE_TTL.label,  # pylint: disable=no-member
+        help_text=_(
+            "Minutes market prices are considered current. Older prices are still "
+            "shown right away, while they are refreshed in the background. "
+            "Fuzzwork updates its prices about every 30 minutes."
+        ),
+    )
+
+    price_history_items = models.TextField(
+        blank=True,
+        default="Tritanium, Pyerite, Mexallon, Isogen, Nocxium, Zydrine, Megacyte, Morphite",
+        verbose_name=Field.PRICE_HISTORY_ITEMS.label,  # pylint: disable=no-member
+        help_text=_(
+            "Comma-separated list of item names whose prices are stored daily "
+            "for `/price trend`."
+        ),
+    )
+
+    price_history_markets = models.CharField(
+        max_length=255,
+        default="Jita",
+        verbose_name=Field.PRICE_HISTORY_MARKETS.label,  # pylint: disable=no-member
+        help_text=_(
+            "Comma-separated list of market hubs the price history is stored for. "
+            "Possible values: Jita, Amarr, Rens, Hek, Dodixie"
+        ),
+    )
+
     class Meta:
         """
         Meta options for the Setting model.
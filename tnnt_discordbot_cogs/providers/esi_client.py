@@ -22,9 +22,13 @@ esi = ESIClientProvider(
     ua_version=__version__,
     ua_url=__github_url__,
     operations=[
+        # Corporation
+        "GetCorporationsCorporationId",
         # Location
         "GetCharactersCharacterIdOnline",
         "GetCharactersCharacterIdLocation",
         "GetCharactersCharacterIdShip",
+        # Universe
+        "GetUniverseStructuresStructureId",
     ],
 )
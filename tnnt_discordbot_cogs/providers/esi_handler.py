@@ -29,6 +29,8 @@ if typing.TYPE_CHECKING:
         CharactersCharacterIdLocationGet,
         CharactersCharacterIdOnlineGet,
         CharactersCharacterIdShipGet,
+        CorporationsDetail,
+        UniverseStructuresStructureIdGet,
     )
 
 
@@ -121,6 +123,30 @@ class ESIHandler:
 
         return esi_result
 
+    @classmethod
+    def get_corporations_corporation_id(
+        cls, corporation_id: int, use_etag: bool = True
+    ) -> "CorporationsDetail | None":
+        """
+        Get public corporation information from ESI.
+
+        :param corporation_id: The corporation ID to look up
+        :type corporation_id: int
+        :param use_etag: Whether to use ETag for caching.
+        :type use_etag: bool
+        :return: The corporation information or None if an error occurred.
+        :rtype: CorporationsDetail | None
+        """
+
+        logger.debug(f"Fetching corporation ID {corporation_id} from ESI…")
+
+        return cls.result(
+            operation=esi.client.Corporation.GetCorporationsCorporationId(
+                corporation_id=corporation_id
+            ),
+            use_etag=use_etag,
+        )
+
     @classmethod
     def get_characters_character_id_online(
         cls, character_id: int, token: Token, use_etag: bool = True
@@ -188,3 +214,29 @@ class ESIHandler:
             ),
             use_etag=use_etag,
         )
+
+    @classmethod
+    def get_universe_structures_structure_id(
+        cls, structure_id: int, token: Token, use_etag: bool = True
+    ) -> "UniverseStructuresStructureIdGet | None":
+        """
+        Get structure information from ESI.
+
+        :param structure_id: The structure ID to look up
+        :type structure_id: int
+        :param token: A token with the `esi-universe.read_structures.v1` scope of a character with access to the structure
+        :type token: Token
+        :param use_etag: Whether to use ETag for caching.
+        :type use_etag: bool
+        :return: The structure information or None if an error occurred (e.g. no access).
+        :rtype: UniverseStructuresStructureIdGet | None
+        """
+
+        logger.debug(f"Fetching structure ID {structure_id} from ESI…")
+
+        return cls.result(
+            operation=esi.client.Universe.GetUniverseStructuresStructureId(
+                structure_id=structure_id, token=token
+            ),
+            use_etag=use_etag,
+        )
@@ -0,0 +1,82 @@
+"""
+Fuzzwork Market Provider
+"""
+
+# Standard Library
+from collections.abc import Iterable
+from enum import Enum
+
+# Third Party
+import requests
+
+# Alliance Auth
+from allianceauth.services.hooks import get_extension_logger
+
+# Terra Nanotech Discordbot Cogs
+from tnnt_discordbot_cogs import __user_agent__
+from tnnt_discordbot_cogs.providers.applogger import AppLogger
+
+logger = AppLogger(my_logger=get_extension_logger(name=__name__))
+
+# Fuzzwork market aggregates, https://market.fuzzwork.co.uk/api/
+FUZZWORK_AGGREGATES_URL = "https://market.fuzzwork.co.uk/aggregates/"
+FUZZWORK_REQUEST_TIMEOUT = 5.0
+
+# Number of types requested from Fuzzwork at once
+FUZZWORK_TYPES_PER_REQUEST = 100
+
+
+class MarketRegion(Enum):
+    """
+    Market Region Enum
+    """
+
+    PLEXMARKET = 19000001
+
+
+class MarketSystem(Enum):
+    """
+    Market System Enum
+    """
+
+    JITA = 30000142
+    AMARR = 60008494
+    RENS = 60004588
+    HEK = 60005686
+    DODIXIE = 30002659
+
+
+def get_market_aggregates(market_id: int, eve_type_ids: Iterable[str]) -> dict:
+    """
+    Get the market aggregates of item types in a market hub, in batches.
+
+    Used outside the bot, the price check cog has its own pooled async client.
+
+    :param market_id: The ID of the market hub, see `MarketSystem`.
+    :type market_id: int
+    :param eve_type_ids: The EVE type IDs of the items to fetch data for
+    :type eve_type_ids: Iterable[str]
+    :return: The market data by type ID, types of failed batches are missing
+    :rtype: dict
+    """
+
+    eve_type_ids = list(eve_type_ids)
+    market_data = {}
+
+    for i in range(0, len(eve_type_ids), FUZZWORK_TYPES_PER_REQUEST):
+        try:
+            response = requests.get(
+                url=FUZZWORK_AGGREGATES_URL,
+                params={
+                    "system": market_id,
+                    "types": ",".join(eve_type_ids[i : i + FUZZWORK_TYPES_PER_REQUEST]),
+                },
+                headers={"User-Agent": __user_agent__},
+                timeout=FUZZWORK_REQUEST_TIMEOUT,
+            )
+            response.raise_for_status()
+            market_data.update(response.json())
+        except requests.RequestException as e:
+            logger.error(f"Failed to fetch market data: {e}")
+
+    return market_data
@@ -0,0 +1,426 @@
+"""
+Signals for the TNNT Discord bot.
+"""
+
+# Django
+from django.apps import apps
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+# Alliance Auth
+from allianceauth.authentication.models import CharacterOwnership, User, UserProfile
+from allianceauth.eveonline.models import EveCharacter
+from allianceauth.services.hooks import get_extension_logger
+from allianceauth.services.modules.discord.models import DiscordUser
+from esi.models import Token
+
+# Terra Nanotech Discordbot Cogs
+from tnnt_discordbot_cogs.cache import invalidate_lookup_cache
+from tnnt_discordbot_cogs.models.directory import CharacterDirectoryEntry
+from tnnt_discordbot_cogs.models.lookup import UserStatistics
+from tnnt_discordbot_cogs.providers.applogger import AppLogger
+
+logger = AppLogger(my_logger=get_extension_logger(name=__name__))
+
+
+@receiver(signal=[post_save, post_delete], sender=CharacterOwnership)
+def character_ownership_changed(
+    sender, instance: CharacterOwnership, **kwargs  # pylint: disable=unused-argument
+) -> None:
+    """
+    Invalidate the lookup cache of a user when one of their characters is added or removed.
+
+    :param sender:
+    :type sender:
+    :param instance:
+    :type instance:
+    :param kwargs:
+    :type kwargs:
+    :return:
+    :rtype:
+    """
+
+    logger.debug(f"Character ownership changed for user ID {instance.user_id}")
+
+    invalidate_lookup_cache(user_ids=[instance.user_id])
+
+
+@receiver(signal=post_save, sender=UserProfile)
+def user_profile_changed(
+    sender,  # pylint: disable=unused-argument
+    instance: UserProfile,
+    update_fields: frozenset | None = None,
+    **kwargs,  # pylint: disable=unused-argument
+) -> None:
+    """
+    Invalidate the lookup cache of a user when their main character or state changes.
+
+    :param sender:
+    :type sender:
+    :param instance:
+    :type instance:
+    :param update_fields:
+    :type update_fields:
+    :param kwargs:
+    :type kwargs:
+    :return:
+    :rtype:
+    """
+
+    if update_fields is not None and not {"main_character", "state"} & set(
+        update_fields
+    ):
+        return
+
+    logger.debug(f"Main character or state changed for user ID {instance.user_id}")
+
+    invalidate_lookup_cache(user_ids=[instance.user_id])
+
+
+@receiver(signal=m2m_changed, sender=User.groups.through)
+def user_groups_changed(
+    sender,  # pylint: disable=unused-argument
+    instance,
+    action: str,
+    reverse: bool,
+    pk_set: set | None,
+    **kwargs,  # pylint: disable=unused-argument
+) -> None:
+    """
+    Invalidate the lookup cache of users whose group memberships change.
+
+    The signal is sent from both sides of the relation, `instance` is a user
+    when `reverse` is False and a group when it is True.
+
+    :param sender:
+    :type sender:
+    :param instance:
+    :type instance:
+    :param action:
+    :type action:
+    :param reverse:
+    :type reverse:
+    :param pk_set:
+    :type pk_set:
+    :param kwargs:
+    :type kwargs:
+    :return:
+    :rtype:
+    """
+
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            invalidate_lookup_cache(user_ids=[instance.pk])
+
+        return
+
+    if action in ("post_add", "post_remove"):
+        invalidate_lookup_cache(user_ids=pk_set)
+    elif action == "pre_clear":
+        # After clearing, the members of the group are gone, so collect them before
+        invalidate_lookup_cache(user_ids=instance.user_set.values_list("pk", flat=True))
+
+
+@receiver(signal=[post_save, post_delete], sender=DiscordUser)
+def discord_user_changed(
+    sender, instance: DiscordUser, **kwargs  # pylint: disable=unused-argument
+) -> None:
+    """
+    Invalidate the lookup cache of a user when their Discord account is linked or unlinked.
+
+    :param sender:
+    :type sender:
+    :param instance:
+    :type instance:
+    :param kwargs:
+    :type kwargs:
+    :return:
+    :rtype:
+    """
+
+    invalidate_lookup_cache(user_ids=[instance.user_id])
+
+
+def _refresh_directory_characters(character_ids) -> None:
+    """
+    Rebuild the character directory entries of the given characters.
+
+    :param character_ids: The EVE character IDs.
+    :type character_ids: Iterable[int]
+    :return:
+    :rtype:
+    """
+
+    CharacterDirectoryEntry.refresh(
+        characters=EveCharacter.objects.filter(character_id__in=list(character_ids))
+    )
+
+
+@receiver(signal=post_save, sender=EveCharacter)
+def directory_character_saved(
+    sender, instance: EveCharacter, **kwargs  # pylint: disable=unused-argument
+) -> None:
+    """
+    Update the directory entry of a character, and of the alts it is the main of.
+
+    The main's corporation ticker is stored with every alt, so those entries
+    change along with the main.
+
+    :param sender:
+    :type sender:
+    :param instance:
+    :type instance:
+    :param kwargs:
+    :type kwargs:
+    :return:
+    :rtype:
+    """
+
+    CharacterDirectoryEntry.refresh(
+        characters=EveCharacter.objects.filter(pk=instance.pk)
+    )
+    CharacterDirectoryEntry.refresh_users(
+        user_ids=CharacterDirectoryEntry.objects.filter(
+            main_character_id=instance.character_id
+        )
+        .exclude(character_id=instance.character_id)
+        .values_list("user_id", flat=True)
+        .distinct()
+    )
+
+
+@receiver(signal=post_delete, sender=EveCharacter)
+def directory_character_deleted(
+    sender, instance: EveCharacter, **kwargs  # pylint: disable=unused-argument
+) -> None:
+    """
+    Remove the directory entry of a deleted character.
+
+    :param sender:
+    :type sender:
+    :param instance:
+    :type instance:
+    :param kwargs:
+    :type kwargs:
+    :return:
+    :rtype:
+    """
+
+    CharacterDirectoryEntry.objects.filter(character_id=instance.character_id).delete()
+
+
+@receiver(signal=[post_save, post_delete], sender=CharacterOwnership)
+def directory_ownership_changed(
+    sender, instance: CharacterOwnership, **kwargs  # pylint: disable=unused-argument
+) -> None:
+    """
+    Update the directory entry of a character when it is linked to or unlinked from a user.
+
+    :param sender:
+    :type sender:
+    :param instance:
+    :type instance:
+    :param kwargs:
+    :type kwargs:
+    :return:
+    :rtype:
+    """
+
+    CharacterDirectoryEntry.refresh(
+        characters=EveCharacter.objects.filter(pk=instance.character_id)
+    )
+
+
+@receiver(signal=post_save, sender=UserProfile)
+def directory_profile_changed(
+    sender,  # pylint: disable=unused-argument
+    instance: UserProfile,
+    update_fields: frozenset | None = None,
+    **kwargs,  # pylint: disable=unused-argument
+) -> None:
+    """
+    Update the directory entries of a user when their main character or state changes.
+
+    :param sender:
+    :type sender:
+    :param instance:
+    :type instance:
+    :param update_fields:
+    :type update_fields:
+    :param kwargs:
+    :type kwargs:
+    :return:
+    :rtype:
+    """
+
+    if update_fields is not None and not {"main_character", "state"} & set(
+        update_fields
+    ):
+        return
+
+    CharacterDirectoryEntry.refresh_users(user_ids=[instance.user_id])
+
+
+@receiver(signal=[post_save, post_delete], sender=DiscordUser)
+def directory_discord_user_changed(
+    sender, instance: DiscordUser, **kwargs  # pylint: disable=unused-argument
+) -> None:
+    """
+    Update the directory entries of a user when their Discord account is linked or unlinked.
+
+    :param sender:
+    :type sender:
+    :param instance:
+    :type instance:
+    :param kwargs:
+    :type kwargs:
+    :return:
+    :rtype:
+    """
+
+    CharacterDirectoryEntry.refresh_users(user_ids=[instance.user_id])
+
+
+@receiver(signal=post_delete, sender=Token)
+def directory_token_deleted(
+    sender, instance: Token, **kwargs  # pylint: disable=unused-argument
+) -> None:
+    """
+    Update the location token flag of a character when one of its tokens is removed.
+
+    Scopes are added to a new token after it has been saved,
+    so new tokens are handled by `directory_token_scopes_changed`.
+
+    :param sender:
+    :type sender:
+    :param instance:
+    :type instance:
+    :param kwargs:
+    :type kwargs:
+    :return:
+    :rtype:
+    """
+
+    _refresh_directory_characters(character_ids=[instance.character_id])
+
+
+@receiver(signal=m2m_changed, sender=Token.scopes.through)
+def directory_token_scopes_changed(
+    sender,  # pylint: disable=unused-argument
+    instance,
+    action: str,
+    reverse: bool,
+    **kwargs,  # pylint: disable=unused-argument
+) -> None:
+    """
+    Update the location token flag of a character when the scopes of a token change.
+
+    :param sender:
+    :type sender:
+    :param instance:
+    :type instance:
+    :param action:
+    :type action:
+    :param reverse:
+    :type reverse:
+    :param kwargs:
+    :type kwargs:
+    :return:
+    :rtype:
+    """
+
+    if reverse or action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    _refresh_directory_characters(character_ids=[instance.character_id])
+
+
+def directory_audit_changed(
+    sender, instance, **kwargs  # pylint: disable=unused-argument
+) -> None:
+    """
+    Update the audit flag of a character when it is added to or removed from the audit.
+
+    :param sender:
+    :type sender:
+    :param instance:
+    :type instance:
+    :param kwargs:
+    :type kwargs:
+    :return:
+    :rtype:
+    """
+
+    CharacterDirectoryEntry.refresh(
+        characters=EveCharacter.objects.filter(pk=instance.character_id)
+    )
+
+
+# The character audit is optional, only listen to it when it is installed
+if apps.is_installed("corptools"):
+    for _signal in (post_save, post_delete):
+        _signal.connect(
+            receiver=directory_audit_changed,
+            sender="corptools.CharacterAudit",
+            dispatch_uid="tnnt_discordbot_cogs:directory_audit_changed",
+        )
+
+
+def statistics_changed(
+    sender, instance, **kwargs  # pylint: disable=unused-argument
+) -> None:
+    """
+    Refresh the summed up statistics of a user when the statistics of one of their characters change.
+
+    :param sender:
+    :type sender:
+    :param instance:
+    :type instance:
+    :param kwargs:
+    :type kwargs:
+    :return:
+    :rtype:
+    """
+
+    user_ids = list(
+        CharacterOwnership.objects.filter(
+            character_id=instance.character_id
+        ).values_list("user_id", flat=True)
+    )
+
+    UserStatistics.refresh(user_ids=user_ids)
+    invalidate_lookup_cache(user_ids=user_ids)
+
+
+def statistics_ownership_changed(
+    sender, instance: CharacterOwnership, **kwargs  # pylint: disable=unused-argument
+) -> None:
+    """
+    Refresh the summed up statistics of a user when one of their characters is added or removed.
+
+    :param sender:
+    :type sender:
+    :param instance:
+    :type instance:
+    :param kwargs:
+    :type kwargs:
+    :return:
+    :rtype:
+    """
+
+    UserStatistics.refresh(user_ids=[instance.user_id])
+
+
+# zKillboard statistics are optional, only listen to them when they are installed
+if apps.is_installed("aastatistics"):
+    for _signal in (post_save, post_delete):
+        _signal.connect(
+            receiver=statistics_changed,
+            sender="aastatistics.StatsCharacter",
+            dispatch_uid="tnnt_discordbot_cogs:statistics_changed",
+        )
+        _signal.connect(
+            receiver=statistics_ownership_changed,
+            sender=CharacterOwnership,
+            dispatch_uid="tnnt_discordbot_cogs:statistics_ownership_changed",
+        )
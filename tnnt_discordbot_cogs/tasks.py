@@ -0,0 +1,140 @@
+"""
+Celery tasks for the TNNT Discord bot.
+"""
+
+# Third Party
+from celery import shared_task
+
+# Django
+from django.apps import apps
+
+# Alliance Auth
+from allianceauth.services.hooks import get_extension_logger
+
+# Terra Nanotech Discordbot Cogs
+from tnnt_discordbot_cogs.helper import get_market_item_types
+from tnnt_discordbot_cogs.models.directory import CharacterDirectoryEntry
+from tnnt_discordbot_cogs.models.lookup import CorporationMembership, UserStatistics
+from tnnt_discordbot_cogs.models.price import PriceSnapshot
+from tnnt_discordbot_cogs.models.setting import Setting
+from tnnt_discordbot_cogs.providers.applogger import AppLogger
+from tnnt_discordbot_cogs.providers.fuzzwork import MarketSystem, get_market_aggregates
+
+logger = AppLogger(my_logger=get_extension_logger(name=__name__))
+
+
+@shared_task
+def rebuild_character_directory() -> None:
+    """
+    Rebuild the character directory.
+
+    The signals keep the directory up to date, this catches what they
+    don't see, like corporation changes written by bulk updates.
+
+    :return:
+    :rtype:
+    """
+
+    rebuilt = CharacterDirectoryEntry.rebuild()
+
+    logger.info(f"Character directory rebuilt with {rebuilt} characters")
+
+
+@shared_task
+def rebuild_user_statistics() -> None:
+    """
+    Sum up the zKillboard statistics of all users.
+
+    Saved character statistics are summed up right away by the signals,
+    this catches the ones `aastatistics` updates in bulk.
+
+    :return:
+    :rtype:
+    """
+
+    if not apps.is_installed("aastatistics"):
+        logger.debug("aastatistics is not installed, nothing to do")
+
+        return
+
+    rebuilt = UserStatistics.rebuild()
+
+    logger.info(f"zKillboard statistics summed up for {rebuilt} users")
+
+
+@shared_task
+def snapshot_corporation_memberships() -> None:
+    """
+    Store who joined or left the corporations known to the character directory.
+
+    :return:
+    :rtype:
+    """
+
+    changed = CorporationMembership.take_snapshots()
+
+    logger.info(
+        f"Corporation memberships snapshot taken, {changed} corporations changed"
+    )
+
+
+@shared_task
+def snapshot_prices() -> None:
+    """
+    Store today's prices of the items and market hubs on the price history watch list.
+
+    :return:
+    :rtype:
+    """
+
+    item_names = [
+        name.strip()
+        for name in Setting.get_setting(Setting.Field.PRICE_HISTORY_ITEMS.value).split(
+            ","
+        )
+        if name.strip()
+    ]
+    item_types = get_market_item_types()
+    eve_type_ids = list(
+        dict.fromkeys(
+            item_types[name.lower()][1]
+            for name in item_names
+            if name.lower() in item_types
+        )
+    )
+    unknown = [name for name in item_names if name.lower() not in item_types]
+
+    if unknown:
+        logger.warning(
+            f"Unknown items on the price history watch list: {', '.join(unknown)}"
+        )
+
+    if not eve_type_ids:
+        logger.debug("No items on the price history watch list, nothing to do")
+
+        return
+
+    for market_name in Setting.get_setting(
+        Setting.Field.PRICE_HISTORY_MARKETS.value
+    ).split(","):
+        market_name = market_name.strip()
+
+        try:
+            market_id = MarketSystem[market_name.upper()].value
+        except KeyError:
+            logger.warning(
+                f"Unknown market hub on the price history watch list: {market_name}"
+            )
+
+            continue
+
+        stored = PriceSnapshot.store(
+            market_id=market_id,
+            market_data=get_market_aggregates(
+                market_id=market_id, eve_type_ids=eve_type_ids
+            ),
+        )
+
+        logger.info(f"{stored} prices stored for {market_name}")
+
+    PriceSnapshot.prune()